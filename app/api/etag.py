@@ -0,0 +1,90 @@
+"""
+УСЛОВНЫЕ HTTP-ЗАПРОСЫ (ETag)
+
+ETag — «отпечаток» версии ресурса, который сервер отдаёт в заголовке ответа.
+1. If-None-Match (GET): клиент присылает ETag, который у него уже есть.
+   Если данные не изменились — отвечаем 304 Not Modified без тела:
+   ни сериализации, ни трафика.
+2. If-Match (PUT/DELETE): клиент присылает ETag версии, которую он редактировал.
+   Если с тех пор запчасть кто-то изменил — 412 Precondition Failed,
+   и изменение не «затирает» чужое (оптимистическая блокировка).
+"""
+
+import hashlib
+from typing import Iterable, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def part_etag(part_id: int, version: int) -> str:
+    """
+    Сильный ETag запчасти: меняется при каждом изменении строки (version).
+    Уникален, пока id не используются повторно (parts — AUTOINCREMENT).
+    """
+    return f'"{part_id}-{version}"'
+
+
+def list_etag(query: str, rows: Iterable[Tuple[int, int]], total: Optional[int]) -> str:
+    """
+    ETag страницы списка: хэш от параметров запроса, пар (id, version)
+    всех запчастей страницы и total. Считается без сериализации ответа.
+    """
+    digest = hashlib.sha1(query.encode("utf-8"))
+    for part_id, version in rows:
+        digest.update(f"{part_id}:{version};".encode("ascii"))
+    digest.update(f"total:{total}".encode("ascii"))
+    return f'"{digest.hexdigest()}"'
+
+
+def _parse_etags(header: str) -> Tuple[str, ...]:
+    """'"a", W/"b"' -> ('"a"', '"b"'). Признак слабого ETag W/ отбрасываем."""
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tuple(tags)
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Если ETag из If-None-Match совпал — готовый ответ 304, иначе None.
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+    tags = _parse_etags(header)
+    if "*" in tags or etag in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def if_match_version(request: Request, part_id: int) -> Optional[int]:
+    """
+    Версия запчасти из заголовка If-Match (ETag вида "<id>-<version>").
+    Нет заголовка или "*" — None (изменение без проверки версии, как и раньше).
+    Версия передаётся в хранилище, и оно проверяет её тем же запросом, что
+    и меняет строку (UPDATE ... WHERE version = :version) — без гонки между
+    проверкой и записью. Чужой или битый ETag — сразу 412.
+    """
+    header = request.headers.get("if-match")
+    if header is None:
+        return None
+    tags = [tag.strip() for tag in header.split(",")]
+    if "*" in tags:
+        return None
+    # Для If-Match слабые ETag не подходят (RFC 9110, сильное сравнение)
+    prefix = f'"{part_id}-'
+    for tag in tags:
+        if tag.startswith(prefix) and tag.endswith('"') and tag[len(prefix) : -1].isdigit():
+            return int(tag[len(prefix) : -1])
+    raise precondition_failed()
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Запчасть была изменена другим запросом. Перечитайте её и повторите.",
+    )
@@ -0,0 +1,72 @@
+"""
+GET /metrics — метрики процесса в текстовом формате Prometheus.
+Подключается вместе с профилированием (PROFILING_ENABLED=true).
+"""
+
+from typing import Dict, Tuple
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.db.database import get_async_engine, get_replica_set
+from app.db.pool import pool_status
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter(tags=["metrics"])
+
+# Версия текстового формата, которую ожидает Prometheus
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+POOL_FIELDS = (
+    "size",
+    "checked_out",
+    "checked_in",
+    "overflow",
+    "checkouts",
+    "timeouts",
+    "wait_avg_ms",
+    "wait_max_ms",
+)
+
+
+def _pool_values() -> Dict[Tuple[str, ...], float]:
+    """Числовые поля pool_status() → значения метки field."""
+    if get_settings().parts_backend == "memory":
+        return {}  # БД не используется — не создаём движок ради метрики
+    status = pool_status(get_async_engine().pool)
+    return {(field,): status[field] for field in POOL_FIELDS if field in status}
+
+
+registry.gauge(
+    "garage_db_pool",
+    "Состояние пула соединений (size, checked_out, overflow, ожидание)",
+    _pool_values,
+    ("field",),
+)
+
+
+def _replica_values() -> Dict[Tuple[str, ...], float]:
+    """Реплики для чтения: доступность, отставание и число чтений по каждой."""
+    if get_settings().parts_backend == "memory":
+        return {}
+    replicas = get_replica_set()
+    values: Dict[Tuple[str, ...], float] = {}
+    for replica in replicas.replicas if replicas is not None else ():
+        values[(replica.name, "healthy")] = float(replica.healthy)
+        values[(replica.name, "reads")] = replica.reads
+        if replica.lag is not None:
+            values[(replica.name, "lag_seconds")] = replica.lag
+    return values
+
+
+registry.gauge(
+    "garage_db_replica",
+    "Реплики для чтения: healthy (1/0), lag_seconds, reads",
+    _replica_values,
+    ("replica", "field"),
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,25 +1,113 @@
 # 2026.03.19 18:57 IMM (ОБНОВЛЕНО: теперь с БД)
 
-# РОУТЕР ДЛЯ ЗАПЧАСТЕЙ — работа с базой данных SQLite через SQLAlchemy
+# РОУТЕР ДЛЯ ЗАПЧАСТЕЙ — работа с хранилищем запчастей через PartRepository
+# Все обработчики асинхронные: обращения к хранилищу не блокируют event loop.
+# Какое хранилище используется (ORM, Core или память) — решает настройка
+# PARTS_BACKEND (см. app/services/repository.py); обработчики от неё не зависят.
 
-from typing import Any, Dict  # List понадобится для аннотаций
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 
-from sqlalchemy.orm import Session  # Сессия SQLAlchemy
+from pydantic import ValidationError  # Ошибка валидации схемы
+
+from app.api.etag import (  # Условные запросы: ETag, If-None-Match, If-Match
+    if_match_version,
+    list_etag,
+    not_modified,
+    part_etag,
+    precondition_failed,
+)
 
 # Больше не импортируем глобальный garage!
 # from app.database import garage  # ❌ УДАЛЕНО
-from app.db.database import get_db  # Функция, выдающая сессию БД
-from app.db.models import PartDB  # Модель SQLAlchemy (таблица parts)
-from app.schemas.part import PartCreate, PartResponse  # Pydantic-схемы
-from fastapi import APIRouter, Depends, HTTPException, status  # status для кодов ответа
+from app.core.config import get_settings  # Настройки (порог «заканчивается»)
+from app.core.profiling import ProfilingRoute  # Замеры фаз (при PROFILING_ENABLED)
+from app.core.responses import json_dumps  # Быстрый JSON (orjson)
+from app.db.database import (  # реплики для чтения и read-your-writes
+    read_from_replica,
+    read_only_route,
+    requires_primary,
+)
+from app.schemas.part import (  # Pydantic-схемы
+    INVENTORY_STATS_ADAPTER,
+    MOVEMENT_PAGE_ADAPTER,
+    PART_LIST_ADAPTER,
+    PART_LOOKUP_ADAPTER,
+    PART_PAGE_ADAPTER,
+    PART_SEARCH_ADAPTER,
+    PartCreate,
+    PartLookup,
+    PartResponse,
+    PartUpdate,
+    StockAdjustment,
+    StockBatch,
+)
+from app.services.cache import PartCache, get_part_cache  # Кэш запчастей
+from app.services.events import (  # Лента изменений (SSE / WebSocket)
+    EventHub,
+    Subscription,
+    get_event_hub,
+)
+from app.services.exceptions import (  # Ошибки хранилища (общие для всех реализаций)
+    DuplicatePartNumber,
+    InsufficientStock,
+    PartNotFound,
+    VersionConflict,
+)
+from app.services.filters import PartFilter  # Фильтры списка
+from app.services.repository import (  # Интерфейс хранилища и его выбор по настройке
+    PART_FIELDS,
+    PartRepository,
+    get_repository,
+)
+from app.services.stats import StatsCache, get_stats_cache  # Сводка по складу
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,  # Описание и валидация query-параметров
+    Request,  # Сырой запрос (для потокового чтения тела)
+    Response,  # Ответ (чтобы выставить заголовок ETag)
+    WebSocket,  # Соединение WebSocket (лента изменений)
+    WebSocketDisconnect,
+    status,  # status для кодов ответа
+)
+from fastapi.responses import StreamingResponse  # Ответ, который отдаётся кусками
+
+# СОЗДАНИЕ РОУТЕРА
+# ProfilingRoute замеряет обработчик и эндпоинт, если включено профилирование
+# (без него это одна проверка ContextVar на запрос)
+router = APIRouter(prefix="/parts", tags=["parts"], route_class=ProfilingRoute)
+
+
+# ==================== ОШИБКИ ХРАНИЛИЩА → HTTP-ОТВЕТЫ ====================
+def _not_found(part_id: int) -> HTTPException:
+    return HTTPException(status_code=404, detail=f"Запчасть с ID {part_id} не найдена")
+
 
-# СОЗДАНИЕ РОУТЕРА (без изменений)
-router = APIRouter(prefix="/parts", tags=["parts"])
+def _duplicate(error: DuplicatePartNumber) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+
+
+def _insufficient_stock(error: InsufficientStock) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": str(error),
+            "part_id": error.part_id,
+            "available": error.available,
+            "delta": error.delta,
+        },
+    )
 
 
 # ==================== ЭНДПОИНТ СОЗДАНИЯ ЗАПЧАСТИ (POST) ====================
 # Раньше мы использовали глобальный garage и добавляли в список в памяти.
-# Теперь мы сохраняем запчасть в настоящую базу данных через SQLAlchemy.
+# Потом — сессию SQLAlchemy прямо в обработчике (db.add/commit/refresh).
+# Теперь обработчик просит хранилище (repo) создать запчасть, а как именно
+# она сохраняется — решает реализация PartRepository.
 
 
 @router.post("/", response_model=PartResponse, status_code=status.HTTP_201_CREATED)
@@ -31,179 +119,839 @@ router = APIRouter(prefix="/parts", tags=["parts"])
 #   │      │    └── 4. Путь "/" — как и раньше, итоговый путь /parts/
 #   │      └── 3. POST — создание нового ресурса
 #   └── 2. Декоратор router (тот же)
-async def create_part(part: PartCreate, db: Session = Depends(get_db)):
-    #    │    │            │       │      │   │    │          │
-    #    │    │            │       │      │   │    │          └── 11. get_db — зависимость,
-    #    │    │            │       │      │   │    │               которая даёт сессию БД
-    #    │    │            │       │      │   │    └── 10. Depends — специальная функция
-    #    │    │            │       │      │    │          FastAPI, вызывает get_db()
-    #    │    │            │       │      │    └── 9. db — имя параметра (можно любое)
-    #    │    │            │       │      │         Здесь будет сессия SQLAlchemy
-    #    │    │            │       │      └── 8. part — как и раньше, валидированная схема
+async def create_part(part: PartCreate, repo: PartRepository = Depends(get_repository),
+                      cache: PartCache = Depends(get_part_cache),
+                      stats: StatsCache = Depends(get_stats_cache),
+                      events: EventHub = Depends(get_event_hub)):
+    #    │    │            │       │      │     │              │          │
+    #    │    │            │       │      │     │              │          └── 11. get_repository —
+    #    │    │            │       │      │     │              │               зависимость, которая даёт
+    #    │    │            │       │      │     │              │               хранилище для запроса
+    #    │    │            │       │      │     │              └── 10. Depends — специальная функция
+    #    │    │            │       │      │     │                   FastAPI, вызывает get_repository()
+    #    │    │            │       │      │     └── 9. PartRepository — интерфейс хранилища
+    #    │    │            │       │      └── 8. repo — имя параметра (можно любое)
     #    │    │            │       └── 7. Аннотация типа PartCreate (без изменений)
-    #    │    │            └── 6. Имя функции (можно оставить)
-    #    │    └── 5. Ключевое слово async (можно убрать, если не нужно)
+    #    │    │            └── 6. part — как и раньше, валидированная схема
+    #    │    └── 5. Ключевое слово async: внутри мы ждём хранилище через await
     #    └── 4. def — объявление функции
+    #    cache — кэш запчастей (см. app/services/cache.py), тоже через Depends
+    #    stats — кэш сводки по складу (см. app/services/stats.py)
+    #    events — лента изменений для подписчиков (см. app/services/events.py)
+    """
+    Создать новую запчасть.
     """
-    Создать новую запчасть в базе данных.
-    """
-    # 🆕 Часть 1: Преобразуем Pydantic-схему в объект SQLAlchemy
-    #    Раньше мы писали: garage.add_part(part.name, part.part_number, part.quantity)
-    #    Теперь мы работаем через модель PartDB.
-    #    **part.model_dump() распаковывает словарь из полей схемы.
-    #    Например, PartCreate(name="Масло", part_number="OIL-1", quantity=5)
-    #    превращается в keywords: name="Масло", part_number="OIL-1", quantity=5
-    db_part = PartDB(**part.model_dump())
-    #    │        │      │        │
-    #    │        │      │        └── 15. model_dump() — метод Pydantic v2,
-    #    │        │      │             превращает схему в словарь
-    #    │        │      └── 14. Оператор ** (распаковка словаря) — передаёт пары
-    #    │        │                   ключ=значение как именованные аргументы
-    #    │        └── 13. PartDB — класс модели SQLAlchemy (из models.py)
-    #    │              У него есть конструктор, принимающий name, part_number и т.д.
-    #    └── 12. db_part — объект SQLAlchemy, ещё не сохранённый в БД
-
-    # 🆕 Часть 2: Добавляем объект в сессию (ставим в очередь на вставку)
-    db.add(db_part)
-    #    │   │
-    #    │   └── 16. add() — метод сессии, добавляет объект в «рабочую область».
-    #    │        Пока объект не сохранён в базе.
-    #    └── 17. db — наша сессия
-
-    # 🆕 Часть 3: Фиксируем транзакцию (commit)
-    db.commit()
-    #    │    │
-    #    │    └── 18. commit() — отправляет все накопленные изменения в БД.
-    #    │         Теперь запись реально появилась в таблице parts.
-    #    └── 19. После commit() объект db_part получает сгенерированный ID (если был autoincrement).
-
-    # 🆕 Часть 4: Обновляем объект из БД (чтобы получить, например, ID)
-    db.refresh(db_part)
-    #    │      │
-    #    │      └── 20. refresh() — перечитывает объект из базы,
-    #    │           чтобы db_part.id стал актуальным (и любые другие поля,
-    #    │           которые могли быть установлены БД, например, default-значения).
-    #    └── 21. Теперь db_part содержит все поля, как в таблице.
-
-    # 🆕 Часть 5: Возвращаем объект
-    return db_part
+    # 🆕 Часть 1: Передаём хранилищу словарь полей из Pydantic-схемы.
+    #    model_dump() — метод Pydantic v2, превращает схему в словарь:
+    #    PartCreate(name="Масло", part_number="OIL-001", quantity=5)
+    #    → {"name": "Масло", "part_number": "OIL-001", "quantity": 5}
+    try:
+        created = await repo.create(part.model_dump())
+    except DuplicatePartNumber as error:
+        # Каталожный номер уникален: вторую запчасть с тем же номером не создаём
+        raise _duplicate(error)
+
+    # 🆕 Часть 2: Сбрасываем возможную устаревшую ссылку part_number → id в кэше
+    await cache.invalidate(None, created["part_number"])
+    stats.part_created(created)  # сводка по складу поправляется без пересчёта
+    events.part_created(created)  # подписчики ленты узнают о новой запчасти
+
+    # 🆕 Часть 3: Возвращаем словарь полей новой запчасти (с id, выданным хранилищем)
+    return created
     #    │
-    #    └── 22. FastAPI автоматически преобразует SQLAlchemy-объект в dict,
-    #         затем в JSON, используя схему PartResponse (указали в response_model).
-    #         Для этого в PartResponse мы добавили class Config: from_attributes = True
-    #         (см. app/schemas/part.py). Это позволяет Pydantic читать поля из ORM-объектов.
+    #    └── FastAPI проверяет и преобразует его в JSON по схеме PartResponse
+    #         (указали в response_model).
+
+    # 🎉 ИТОГ: при POST запросе запчасть сохраняется в хранилище,
+    #   и при хранилище в БД после перезапуска сервера данные не теряются.
+
+
+# ==================== МАССОВАЯ ЗАГРУЗКА ЗАПЧАСТЕЙ (POST /parts/bulk) ====================
+# Ночной фид поставщика — десятки тысяч запчастей. По одному POST /parts/ на
+# запчасть это десятки тысяч HTTP-запросов и транзакций.
+# Здесь запчасти передаются хранилищу пачками по BULK_BATCH_SIZE: в SQL это один
+# многострочный INSERT ... ON CONFLICT (part_number) DO UPDATE на пачку.
+# Существующие part_number обновляются (upsert).
+#
+# Тело запроса — либо JSON-массив, либо NDJSON (одна запчасть в строке,
+# Content-Type: application/x-ndjson). NDJSON читается потоком, построчно,
+# поэтому большой фид не нужно целиком держать в памяти.
+
+BULK_BATCH_SIZE = 500  # строк в одном INSERT (с запасом до лимита параметров SQLite)
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+
+async def _iter_bulk_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Отдаёт пары (индекс, элемент) из тела запроса.
+    Вместо элемента может прийти исключение — ошибка разбора JSON этой строки.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        # Читаем тело кусками и режем на строки по \n
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_json_line(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_json_line(buffer)
+        return
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Тело запроса не JSON"
+        )
+    if not isinstance(payload, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ожидается JSON-массив запчастей или NDJSON",
+        )
+    for index, item in enumerate(payload):
+        yield index, item
+
+
+def _parse_json_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as error:
+        return error
+
+
+async def _upsert_batch(
+    repo: PartRepository,
+    cache: PartCache,
+    stats: StatsCache,
+    events: EventHub,
+    batch: List[Tuple[int, PartCreate]],
+) -> List[Dict[str, Any]]:
+    """
+    Отправляет пачку в хранилище (в SQL — один INSERT ... ON CONFLICT ... RETURNING)
+    и возвращает результат по каждому элементу.
+    В пачке не бывает двух одинаковых part_number (см. bulk_upsert_parts).
+    """
+    upserted = await repo.upsert_many([part.model_dump() for _, part in batch])
+
+    # Обновлённые запчасти могли лежать в кэше — удаляем их
+    for part_number, part_id, _ in upserted:
+        await cache.invalidate(part_id, part_number)
+    stats.parts_imported(sum(created for _, _, created in upserted))
+
+    results = [
+        {
+            "index": index,
+            "status": "created" if created else "updated",
+            "id": part_id,
+            "part_number": part_number,
+        }
+        for (index, _), (part_number, part_id, created) in zip(batch, upserted)
+    ]
+    events.parts_imported(results)  # одно событие на пачку
+    return results
+
+
+@router.post("/bulk")
+async def bulk_upsert_parts(
+    request: Request,
+    repo: PartRepository = Depends(get_repository),
+    cache: PartCache = Depends(get_part_cache),
+    stats: StatsCache = Depends(get_stats_cache),
+    events: EventHub = Depends(get_event_hub),
+) -> Dict[str, Any]:
+    """
+    Массовое создание/обновление запчастей (upsert по part_number).
+
+    Принимает JSON-массив или NDJSON. Каждый элемент проверяется схемой PartCreate;
+    невалидные элементы попадают в результат со статусом error и не мешают остальным.
+    """
+    results: List[Dict[str, Any]] = []
+    batch: List[Tuple[int, PartCreate]] = []
+    batch_part_numbers = set()
 
-    # 🎉 ИТОГ: Теперь при POST запросе запчасть сохраняется в файл garage.db,
-    #   и после перезапуска сервера данные не теряются.
+    async for index, item in _iter_bulk_items(request):
+        if isinstance(item, ValueError):
+            results.append(
+                {"index": index, "status": "error", "errors": [{"msg": str(item)}]}
+            )
+            continue
+        try:
+            part = PartCreate.model_validate(item)
+        except ValidationError as error:
+            results.append(
+                {
+                    "index": index,
+                    "status": "error",
+                    "errors": error.errors(include_url=False, include_context=False),
+                }
+            )
+            continue
+
+        # Один и тот же part_number дважды в одном INSERT ... ON CONFLICT
+        # PostgreSQL не примет. Поэтому при повторе сначала сбрасываем пачку:
+        # следующий элемент с тем же номером честно обновит уже вставленную строку.
+        if part.part_number in batch_part_numbers or len(batch) >= BULK_BATCH_SIZE:
+            results.extend(await _upsert_batch(repo, cache, stats, events, batch))
+            batch, batch_part_numbers = [], set()
+        batch.append((index, part))
+        batch_part_numbers.add(part.part_number)
+
+    if batch:
+        results.extend(await _upsert_batch(repo, cache, stats, events, batch))
+
+    results.sort(key=lambda result: result["index"])
+    return {
+        "created": sum(result["status"] == "created" for result in results),
+        "updated": sum(result["status"] == "updated" for result in results),
+        "errors": sum(result["status"] == "error" for result in results),
+        "results": results,
+    }
 
 
 # ==================== ЭНДПОИНТ СПИСКА ЗАПЧАСТЕЙ (GET /parts) ====================
-# Раньше мы брали данные из garage.list_parts(). Теперь читаем из БД.
+# Раньше мы читали ВСЮ таблицу через .all() и строили список словарей в памяти.
+# На сотнях тысяч запчастей это секунды и сотни мегабайт на каждый вызов.
+# Теперь список отдаётся страницами с keyset-пагинацией по id:
+#   GET /parts/?limit=100              — первая страница
+#   GET /parts/?limit=100&after=100    — следующая (after = next_after из ответа)
+# Keyset (WHERE id > :after ORDER BY id LIMIT :limit) использует индекс
+# первичного ключа, поэтому стоимость страницы не зависит ни от размера таблицы,
+# ни от того, насколько «далеко» мы пролистали (в отличие от OFFSET).
+# Фильтры тоже применяются в хранилище — в обработчик приходит только страница.
+#
+# Сериализация: страница — это словари из строк БД (без ORM-объектов).
+# PART_PAGE_ADAPTER проверяет их по схеме PartPage и пишет JSON сразу в bytes
+# (pydantic-core на Rust), минуя jsonable_encoder. Поэтому обработчик
+# возвращает готовый Response, а не словарь.
 
 
 @router.get("/")
-def list_parts(db: Session = Depends(get_db)) -> Dict[str, Any]:
-    """
-    Получить список всех запчастей из БД.
-    """
-    # 1. Выполняем запрос к таблице parts через сессию.
-    #    db.query(PartDB) — создаёт запрос к таблице, связанной с моделью PartDB.
-    #    .all() — выполняет запрос и возвращает ВСЕ записи в виде списка объектов PartDB.
-    parts = db.query(PartDB).all()
-    #    │      │      │        │
-    #    │      │      │        └── 3. .all() — список всех объектов
-    #    │      │      └── 2. PartDB — модель, указываем какую таблицу хотим выбрать
-    #    │      └── 1. db.query() — создаём объект запроса
-    #    └── 4. parts — теперь это список экземпляров PartDB, каждый соответствует строке в БД.
-
-    # 2. Преобразуем ORM-объекты в словари (как и раньше, но теперь из PartDB)
-    parts_list = []
-    for part in parts:
-        parts_list.append(
-            {
-                "id": part.id,
-                "name": part.name,
-                "part_number": part.part_number,
-                "quantity": part.quantity,
-                "storage_location": part.storage_location,  # новое поле (может быть None)
-            }
-        )
-    #    В цикле мы обращаемся к атрибутам SQLAlchemy-объекта part.
-    #    Эти атрибуты соответствуют колонкам таблицы.
+async def list_parts(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000, description="Размер страницы"),
+    after: Optional[int] = Query(
+        None, ge=0, description="ID последней запчасти предыдущей страницы"
+    ),
+    name: Optional[str] = Query(
+        None, min_length=1, description="Подстрока в названии (без учёта регистра)"
+    ),
+    part_number: Optional[str] = Query(
+        None, min_length=1, description="Префикс каталожного номера, например OIL-"
+    ),
+    storage_location: Optional[str] = Query(None, description="Место хранения"),
+    min_quantity: Optional[int] = Query(None, ge=0, description="Количество от"),
+    max_quantity: Optional[int] = Query(None, ge=0, description="Количество до"),
+    total: Literal["none", "estimate", "exact"] = Query(
+        "estimate",
+        description="Как считать total: none — не считать, "
+        "estimate — быстрая оценка (только без фильтров), exact — точный COUNT",
+    ),
+    repo: PartRepository = Depends(get_repository),
+) -> Response:
+    """
+    Получить страницу запчастей (keyset-пагинация по id и фильтры).
+    """
+    # 1. Собираем фильтры из query-параметров
+    filters = PartFilter(
+        name=name,
+        part_number=part_number,
+        storage_location=storage_location,
+        min_quantity=min_quantity,
+        max_quantity=max_quantity,
+    )
+
+    # 2. Страница (limit + 1 внутри хранилища говорит, есть ли следующая)
+    parts_list, has_more = await repo.list_page(filters, after, limit)
+
+    # 3. total считаем только если его попросили
+    if total == "exact":
+        total_count = await repo.count(filters)
+    elif total == "estimate" and filters.is_empty():
+        total_count = await repo.estimate_count()
+    else:
+        # Оценка с фильтрами была бы неверной, поэтому честно отдаём null
+        total_count = None
+
+    # 4. ETag страницы: если у клиента та же версия — 304 без сериализации
+    etag = list_etag(
+        request.url.query,
+        ((part["id"], part["version"]) for part in parts_list),
+        total_count,
+    )
+    cached_response = not_modified(request, etag)
+    if cached_response is not None:
+        return cached_response
+
+    # 5. Страница → JSON-байты одним вызовом (проверка схемы + кодирование)
+    page = PART_PAGE_ADAPTER.validate_python(
+        {
+            "total": total_count,
+            "parts": parts_list,
+            "next_after": parts_list[-1]["id"] if has_more else None,
+        }
+    )
+    return Response(
+        content=PART_PAGE_ADAPTER.dump_json(page),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+    # Ключи total и parts сохранены, чтобы не ломать существующих клиентов.
+
+
+# ==================== ПОИСК ЗАПЧАСТЕЙ (GET /parts/search) ====================
+# Поиск «как в каталоге»: GET /parts/search?q=тормозные колодки или ?q=OIL-0
+# Ищет по индексу полнотекстового поиска (FTS5 в SQLite, tsvector + pg_trgm
+# в PostgreSQL — см. app/db/search.py), а не перебором таблицы через LIKE '%...%'.
+# Порядок: сначала запчасти, чей номер начинается с запроса, затем — по релевантности.
+# ⚠️ Маршрут объявлен ДО /{part_id}, иначе "search" приняли бы за part_id.
+
+
+@router.get("/search")
+async def search_parts(
+    q: str = Query(
+        ..., min_length=1, max_length=200, description="Слова из названия или начало номера"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Сколько результатов вернуть"),
+    repo: PartRepository = Depends(get_repository),
+) -> Response:
+    """
+    Найти запчасти по названию и каталожному номеру (с ранжированием).
+    """
+    parts_list = await repo.search(q, limit)
+    results = PART_SEARCH_ADAPTER.validate_python({"query": q, "parts": parts_list})
+    return Response(
+        content=PART_SEARCH_ADAPTER.dump_json(results), media_type="application/json"
+    )
+
+
+# ==================== МНОГО ЗАПЧАСТЕЙ ОДНИМ ЗАПРОСОМ (POST /parts/lookup) ====================
+# Заказ-наряду нужны 50–200 запчастей. Раньше это 50–200 вызовов GET /parts/{part_id}:
+# на каждый — свой HTTP-запрос, своя сессия и свой SELECT.
+# Теперь все ключи уходят одним запросом:
+#   POST /parts/lookup  {"ids": [1, 5, 9], "part_numbers": ["OIL-001"]}
+#   → SELECT ... WHERE id IN (1, 5, 9) OR part_number IN ('OIL-001')
+# В ответе запчасти идут в порядке запроса (сначала ids, затем part_numbers,
+# каждая один раз), а ненайденные ключи перечислены отдельно — 404 здесь нет.
+# POST, а не GET: 200 каталожных номеров в строке запроса упираются в лимиты длины URL.
+# @read_only_route: при репликах читает с них, как GET, и cookie db_primary не ставит.
+
+
+@router.post("/lookup")
+@read_only_route
+async def lookup_parts(
+    lookup: PartLookup,
+    repo: PartRepository = Depends(get_repository),
+) -> Response:
+    """
+    Найти запчасти по списку ID и/или каталожных номеров.
+    """
+    found = await repo.get_many(lookup.ids, lookup.part_numbers)
+    by_id = {part["id"]: part for part in found}
+    by_part_number = {part["part_number"]: part for part in found}
+
+    parts: List[Dict[str, Any]] = []
+    returned = set()  # id уже добавленных запчастей (ключи в запросе могут повторяться)
+    missing_ids: Dict[int, None] = {}  # dict вместо set — сохраняет порядок запроса
+    missing_part_numbers: Dict[str, None] = {}
+    requested = [(by_id, key, missing_ids) for key in lookup.ids] + [
+        (by_part_number, key, missing_part_numbers) for key in lookup.part_numbers
+    ]
+    for index, key, missing in requested:
+        part = index.get(key)
+        if part is None:
+            missing[key] = None
+        elif part["id"] not in returned:
+            returned.add(part["id"])
+            parts.append(part)
+
+    results = PART_LOOKUP_ADAPTER.validate_python(
+        {
+            "parts": parts,
+            "missing_ids": list(missing_ids),
+            "missing_part_numbers": list(missing_part_numbers),
+        }
+    )
+    return Response(
+        content=PART_LOOKUP_ADAPTER.dump_json(results), media_type="application/json"
+    )
+
+
+# ==================== СВОДКА ПО СКЛАДУ (GET /parts/stats) ====================
+# Стоимость склада, итоги по местам хранения и заканчивающиеся запчасти.
+# Всё считает БД (GROUP BY, SUM, ROW_NUMBER() OVER) — в приложение приходят
+# только итоговые строки, а не вся таблица. Результат кэшируется на
+# STATS_CACHE_TTL секунд, а записи (создание, приход/списание, удаление)
+# поправляют его без пересчёта (см. app/services/stats.py).
+# ⚠️ Маршрут объявлен ДО /{part_id}, иначе "stats" приняли бы за part_id.
+
+
+@router.get("/stats")
+async def inventory_stats(
+    low_stock_threshold: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Заканчивается, если quantity <= порога"
+        " (по умолчанию STATS_LOW_STOCK_THRESHOLD)",
+    ),
+    per_location: int = Query(
+        10, ge=1, le=100, description="Сколько заканчивающихся показать на место хранения"
+    ),
+    repo: PartRepository = Depends(get_repository),
+    stats: StatsCache = Depends(get_stats_cache),
+) -> Response:
+    """
+    Сводка по складу: стоимость, места хранения, заканчивающиеся запчасти.
+    """
+    if low_stock_threshold is None:
+        low_stock_threshold = get_settings().stats_low_stock_threshold
+    summary = await stats.get(repo, low_stock_threshold, per_location)
+    return Response(
+        content=INVENTORY_STATS_ADAPTER.dump_json(
+            INVENTORY_STATS_ADAPTER.validate_python(summary)
+        ),
+        media_type="application/json",
+    )
+
+
+# ==================== ЛЕНТА ИЗМЕНЕНИЙ (GET /parts/events, /parts/events/ws) ====================
+# Вместо опроса GET /parts каждые несколько секунд терминал держит одно соединение,
+# а сервер присылает события сразу после записи (app/services/events.py):
+#   const events = new EventSource("/parts/events?types=stock.adjusted");
+#   events.addEventListener("stock.adjusted", (e) => update(JSON.parse(e.data)));
+# Server-Sent Events — обычный HTTP-ответ, который не заканчивается; при обрыве
+# браузер переподключается сам и присылает Last-Event-ID — пропущенное досылается.
+# WebSocket-вариант — для клиентов без EventSource; id последнего события
+# передаётся параметром last_event_id.
+# В пустую ленту раз в EVENTS_HEARTBEAT_INTERVAL уходит heartbeat: прокси не
+# закрывают «молчащее» соединение, а оборванное обнаруживается при отправке.
+# ⚠️ Маршрут объявлен ДО /{part_id}, иначе "events" приняли бы за part_id.
+
+EVENTS_RETRY_MS = 3000  # через сколько EventSource переподключается после обрыва
+SSE_HEARTBEAT = b": ping\n\n"  # строка-комментарий SSE: клиент её игнорирует
+
+
+def _event_types(types: Optional[str]) -> frozenset:
+    """?types=part.created,stock.adjusted → множество типов (пусто — все)."""
+    return frozenset(filter(None, (name.strip() for name in (types or "").split(","))))
+
 
-    return {"total": len(parts_list), "parts": parts_list}
-    # Возвращаем такой же формат, как и раньше, чтобы не ломать фронтенд (если он есть).
+async def _sse_stream(hub: EventHub, subscription: Subscription) -> AsyncIterator[bytes]:
+    heartbeat = get_settings().events_heartbeat_interval
+    try:
+        yield b"retry: %d\n\n" % EVENTS_RETRY_MS
+        while True:
+            event = await subscription.next(heartbeat)
+            if event is not None:
+                yield event.sse
+            elif subscription.closed:
+                return  # остановка сервера или переполнение: клиент переподключится
+            else:
+                yield SSE_HEARTBEAT
+    finally:
+        # Клиент отключился (StreamingResponse отменяет генератор) или лента закрыта
+        hub.unsubscribe(subscription)
+
+
+@router.get("/events")
+async def part_events(
+    request: Request,
+    last_event_id: Optional[str] = Query(
+        None, description="id последнего полученного события (вместо заголовка Last-Event-ID)"
+    ),
+    types: Optional[str] = Query(
+        None, description="Типы событий через запятую, например stock.adjusted"
+    ),
+    hub: EventHub = Depends(get_event_hub),
+) -> StreamingResponse:
+    """
+    Лента изменений запчастей (Server-Sent Events).
+    """
+    # Подписываемся здесь, а не в генераторе: события, опубликованные, пока
+    # отправляются заголовки ответа, уже попадут в очередь
+    subscription = hub.subscribe(
+        request.headers.get("last-event-id") or last_event_id, _event_types(types)
+    )
+    return StreamingResponse(
+        _sse_stream(hub, subscription),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx: не буферизовать ответ
+        },
+    )
+
+
+@router.websocket("/events/ws")
+async def part_events_ws(
+    websocket: WebSocket,
+    last_event_id: Optional[str] = None,
+    types: Optional[str] = None,
+    hub: EventHub = Depends(get_event_hub),
+) -> None:
+    """
+    Лента изменений запчастей (WebSocket): каждое сообщение — JSON {"id", "type", "data"}.
+    """
+    await websocket.accept()
+    subscription = hub.subscribe(last_event_id, _event_types(types))
+    heartbeat = get_settings().events_heartbeat_interval
+    try:
+        while True:
+            event = await subscription.next(heartbeat)
+            if event is not None:
+                await websocket.send_text(event.text)
+            elif subscription.closed:
+                # 1012 — сервер перезапускается, 1013 — клиент не успевал читать;
+                # в обоих случаях клиент переподключается с last_event_id
+                code = 1012 if subscription.close_reason == "shutdown" else 1013
+                await websocket.close(code=code)
+                return
+            else:
+                await websocket.send_text('{"type":"ping"}')
+    except WebSocketDisconnect:
+        pass  # клиент отключился — подписка снимается ниже
+    finally:
+        hub.unsubscribe(subscription)
+
+
+# ==================== ЭКСПОРТ ВСЕГО СКЛАДА (GET /parts/export) ====================
+# Потоковая выгрузка всего склада в CSV или NDJSON.
+# Хранилище отдаёт запчасти кусками (в SQL — курсор на стороне сервера,
+# stream_results + yield_per): в памяти одновременно держится не больше
+# EXPORT_CHUNK_SIZE строк, а каждый кусок сразу уходит клиенту через StreamingResponse.
+# Поэтому память постоянна при любом размере склада, а первый байт (заголовок CSV)
+# клиент получает сразу, не дожидаясь чтения всей таблицы.
+# ⚠️ Маршрут объявлен ДО /{part_id}, иначе "export" приняли бы за part_id.
+
+EXPORT_CHUNK_SIZE = 1000  # строк на один кусок ответа
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _format_csv(parts: List[Dict[str, Any]], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=PART_FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(parts)
+    return buffer.getvalue()
+
+
+async def _export_chunks(repo: PartRepository, export_format: str) -> AsyncIterator[str]:
+    """
+    Генератор кусков выгрузки. Работает уже после выхода из обработчика,
+    пока StreamingResponse отдаёт тело (поэтому SQL-хранилище открывает
+    для него собственную сессию).
+    """
+    if export_format == "csv":
+        yield _format_csv([], header=True)  # заголовок уходит сразу
+
+    async for parts in repo.iter_all(EXPORT_CHUNK_SIZE):
+        if export_format == "csv":
+            yield _format_csv(parts)
+        else:
+            yield b"".join(json_dumps(part) + b"\n" for part in parts)
+
+
+@router.get("/export")
+async def export_parts(
+    export_format: Literal["csv", "ndjson"] = Query(
+        "csv", alias="format", description="Формат выгрузки: csv или ndjson"
+    ),
+    repo: PartRepository = Depends(get_repository),
+) -> StreamingResponse:
+    """
+    Выгрузить все запчасти потоком (CSV или NDJSON).
+    """
+    return StreamingResponse(
+        _export_chunks(repo, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="parts.{export_format}"'
+        },
+    )
 
 
 # ==================== ЭНДПОИНТ ПОЛУЧЕНИЯ КОНКРЕТНОЙ ЗАПЧАСТИ (GET /parts/{part_id}) ====================
+# Read-through кэш: сначала смотрим в кэш, при промахе читаем из хранилища и
+# кладём результат в кэш. Изменяющие эндпоинты (POST/PUT/DELETE/bulk) удаляют
+# запчасть из кэша, а TTL ограничивает устаревание, если инвалидация не дошла
+# (например, кэш в памяти другого воркера).
 
 
-@router.get("/{part_id}")
-def get_part(part_id: int, db: Session = Depends(get_db)):
+@router.get("/{part_id}", response_model=PartResponse)
+async def get_part(
+    part_id: int,
+    request: Request,
+    response: Response,
+    repo: PartRepository = Depends(get_repository),
+    cache: PartCache = Depends(get_part_cache),
+):
     """
     Получить запчасть по ID.
     """
-    # Ищем одну запись с указанным ID.
-    # .filter(PartDB.id == part_id) — условие WHERE id = part_id
-    # .first() — возвращает первый результат или None, если ничего не найдено.
-    part = db.query(PartDB).filter(PartDB.id == part_id).first()
+    # 1. Попадание в кэш — в хранилище не ходим вовсе
+    #    (сессия AsyncSession ленивая: соединение из пула даже не берётся).
+    #    Клиенту после записи (cookie db_primary) нужен основной сервер: кэш
+    #    другого воркера мог ещё не получить инвалидацию — читаем из БД
+    if not requires_primary(request):
+        cached = await cache.get_by_id(part_id)
+        if cached is not None:
+            return _conditional_part(request, response, cached)
 
-    if not part:
+    # 2. Промах — ищем запчасть по первичному ключу. Поколение запоминаем ДО
+    #    запроса: если пока мы читаем, запчасть изменят, put строку не положит
+    generation = await cache.generation(part_id)
+    part = await repo.get(part_id)
+    if part is None:
         # Если запчасти нет — 404 ошибка (как и раньше)
-        raise HTTPException(
-            status_code=404, detail=f"Запчасть с ID {part_id} не найдена"
-        )
+        raise _not_found(part_id)
 
-    return part  # FastAPI преобразует в JSON автоматически
+    # 3. Кладём в кэш словарь всех полей — он же уходит клиенту как JSON.
+    #    Прочитанное с реплики — нет: она могла ещё не догнать запись, и
+    #    устаревшая строка жила бы в кэше до TTL уже после инвалидации
+    if not read_from_replica(request):
+        await cache.put(part, generation)
+    return _conditional_part(request, response, part)
+
+
+def _conditional_part(request: Request, response: Response, data: Dict[str, Any]):
+    """
+    Отдаёт запчасть с ETag, либо 304, если у клиента уже эта версия.
+    """
+    etag = part_etag(data["id"], data["version"])
+    cached_response = not_modified(request, etag)
+    if cached_response is not None:
+        return cached_response  # 304: тело не сериализуется и не передаётся
+    response.headers["ETag"] = etag
+    return data  # FastAPI преобразует в JSON автоматически
 
 
 # ==================== ЭНДПОИНТ ОБНОВЛЕНИЯ ЗАПЧАСТИ (PUT /parts/{part_id}) ====================
-# Ранее его не было, но сейчас добавляем для полноты.
+# If-Match: клиент может прислать ETag версии, которую он редактировал.
+# Версия проверяется тем же запросом, что меняет строку, — если запчасть успели
+# изменить, ответ 412 и чужое изменение не затирается.
 
 
 @router.put("/{part_id}", response_model=PartResponse)
-def update_part(part_id: int, part_data: PartCreate, db: Session = Depends(get_db)):
+async def update_part(
+    part_id: int,
+    part_data: PartCreate,
+    request: Request,
+    response: Response,
+    repo: PartRepository = Depends(get_repository),
+    cache: PartCache = Depends(get_part_cache),
+    stats: StatsCache = Depends(get_stats_cache),
+    events: EventHub = Depends(get_event_hub),
+):
     """
     Обновить запчасть по ID (полная замена).
     """
-    # 1. Находим существующую запчасть
-    db_part = db.query(PartDB).filter(PartDB.id == part_id).first()
-    if not db_part:
-        raise HTTPException(
-            status_code=404, detail=f"Запчасть с ID {part_id} не найдена"
-        )
+    # 1. Версия из If-Match (None — без проверки)
+    expected_version = if_match_version(request, part_id)
 
-    # 2. Обновляем поля объекта данными из part_data
+    # 2. Меняем все поля из part_data.
     #    model_dump() даёт словарь, например {"name": "...", "part_number": "...", "quantity": 5}
-    #    Проходим по каждому ключу и устанавливаем новое значение в db_part
-    for key, value in part_data.model_dump().items():
-        setattr(
-            db_part, key, value
-        )  # setattr(obj, "name", value) эквивалентно obj.name = value
+    try:
+        updated = await repo.update(part_id, part_data.model_dump(), expected_version)
+    except PartNotFound:
+        raise _not_found(part_id)
+    except VersionConflict:
+        raise precondition_failed()
+    except DuplicatePartNumber as error:
+        raise _duplicate(error)
+
+    # 3. Удаляем устаревшую запись из кэша. Ссылку со старого part_number
+    #    кэш отбросит сам: она указывает на запчасть с другим номером.
+    await cache.invalidate(part_id, updated["part_number"])
+    stats.part_updated()
+    events.part_updated(updated)
+
+    response.headers["ETag"] = part_etag(part_id, updated["version"])
+    return updated
+
+
+# ==================== ЧАСТИЧНОЕ ОБНОВЛЕНИЕ (PATCH /parts/{part_id}) ====================
+# PUT — полная замена: клиент присылает все поля, даже если меняет одно.
+# PATCH присылает только то, что меняется, например {"price": 450.0}.
+# model_dump(exclude_unset=True) оставляет лишь переданные поля, и хранилище
+# выполняет один запрос, который трогает только их:
+#   UPDATE parts SET price = :price, version = version + 1
+#   WHERE id = :id [AND version = :if_match] RETURNING ...
+# If-Match работает так же, как у PUT.
+
+
+@router.patch("/{part_id}", response_model=PartResponse)
+async def patch_part(
+    part_id: int,
+    changes: PartUpdate,
+    request: Request,
+    response: Response,
+    repo: PartRepository = Depends(get_repository),
+    cache: PartCache = Depends(get_part_cache),
+    stats: StatsCache = Depends(get_stats_cache),
+    events: EventHub = Depends(get_event_hub),
+):
+    """
+    Изменить только переданные поля запчасти.
+    """
+    data = changes.model_dump(exclude_unset=True)
+    if not data:
+        # Менять нечего — отдаём текущее состояние без записи в БД
+        current = await repo.get(part_id)
+        if current is None:
+            raise _not_found(part_id)
+        response.headers["ETag"] = part_etag(part_id, current["version"])
+        return current
+
+    try:
+        updated = await repo.update(part_id, data, if_match_version(request, part_id))
+    except PartNotFound:
+        raise _not_found(part_id)
+    except VersionConflict:
+        raise precondition_failed()
+    except DuplicatePartNumber as error:
+        raise _duplicate(error)
+
+    await cache.invalidate(part_id, updated["part_number"])
+    stats.part_updated()
+    events.part_updated(updated)
+    response.headers["ETag"] = part_etag(part_id, updated["version"])
+    return updated
+
+
+# ==================== ИЗМЕНЕНИЕ ОСТАТКА (POST /parts/{part_id}/stock) ====================
+# Приход и списание со склада. Раньше количество меняли только через PUT:
+# прочитать запчасть → переписать все поля → сохранить. Два терминала,
+# списывающие одну запчасть одновременно, читали одно и то же количество,
+# и одно из списаний терялось.
+# Теперь изменение — один запрос к БД:
+#   UPDATE parts SET quantity = quantity + :delta, version = version + 1
+#   WHERE id = :id AND quantity + :delta >= 0 RETURNING ...
+# Нехватка остатка — 409 с текущим количеством, строка не меняется.
+# POST /parts/stock — пачка таких изменений одной транзакцией (все или ни одного).
+
+
+@router.post("/{part_id}/stock", response_model=PartResponse)
+async def adjust_part_stock(
+    part_id: int,
+    adjustment: StockAdjustment,
+    response: Response,
+    repo: PartRepository = Depends(get_repository),
+    cache: PartCache = Depends(get_part_cache),
+    stats: StatsCache = Depends(get_stats_cache),
+    events: EventHub = Depends(get_event_hub),
+):
+    """
+    Приход (delta > 0) или списание (delta < 0) запчасти.
+    """
+    try:
+        updated = await repo.adjust_stock(part_id, adjustment.delta)
+    except PartNotFound:
+        raise _not_found(part_id)
+    except InsufficientStock as error:
+        raise _insufficient_stock(error)
+
+    await cache.invalidate(part_id)
+    stats.stock_adjusted(updated, adjustment.delta)
+    events.stock_adjusted(updated, adjustment.delta)
+    response.headers["ETag"] = part_etag(part_id, updated["version"])
+    return updated
 
-    # 3. Сохраняем изменения в БД
-    db.commit()
-    db.refresh(db_part)  # обновляем объект (на всякий случай, если были триггеры в БД)
 
-    return db_part
+@router.post("/stock")
+async def adjust_stock_batch(
+    batch: StockBatch,
+    repo: PartRepository = Depends(get_repository),
+    cache: PartCache = Depends(get_part_cache),
+    stats: StatsCache = Depends(get_stats_cache),
+    events: EventHub = Depends(get_event_hub),
+) -> Response:
+    """
+    Пакет изменений остатков одной транзакцией: применяются все или ни одного.
+    """
+    deltas = [(item.part_id, item.delta) for item in batch.items]
+    try:
+        updated = await repo.adjust_stock_many(deltas)
+    except PartNotFound as error:
+        raise _not_found(error.part_id)
+    except InsufficientStock as error:
+        raise _insufficient_stock(error)
+
+    for part_id in {part_id for part_id, _ in deltas}:
+        await cache.invalidate(part_id)
+    for part, (_, delta) in zip(updated, deltas):
+        stats.stock_adjusted(part, delta)
+        events.stock_adjusted(part, delta)
+    # Состояние запчасти после каждого изменения, в порядке items
+    return Response(
+        content=PART_LIST_ADAPTER.dump_json(PART_LIST_ADAPTER.validate_python(updated)),
+        media_type="application/json",
+    )
+
+
+# ==================== ИСТОРИЯ ОСТАТКА (GET /parts/{part_id}/movements) ====================
+# Каждое изменение quantity (создание, PUT, приход/списание, фид, удаление)
+# записывается в журнал stock_movements в той же транзакции (app/services/ledger.py).
+# История отдаётся от новых движений к старым, keyset-пагинацией по id:
+#   GET /parts/1/movements?limit=50                  — последние 50 движений
+#   GET /parts/1/movements?limit=50&before=12345     — следующая страница
+# История удалённой запчасти тоже доступна (поэтому 404 здесь не бывает).
+
+
+@router.get("/{part_id}/movements")
+async def list_part_movements(
+    part_id: int,
+    limit: int = Query(50, ge=1, le=500, description="Размер страницы"),
+    before: Optional[int] = Query(
+        None, ge=1, description="ID самого старого движения предыдущей страницы"
+    ),
+    repo: PartRepository = Depends(get_repository),
+) -> Response:
+    """
+    История изменений остатка запчасти (от новых к старым).
+    """
+    movements, has_more = await repo.list_movements(part_id, before, limit)
+    page = MOVEMENT_PAGE_ADAPTER.validate_python(
+        {
+            "movements": movements,
+            "next_before": movements[-1]["id"] if has_more else None,
+        }
+    )
+    return Response(
+        content=MOVEMENT_PAGE_ADAPTER.dump_json(page), media_type="application/json"
+    )
 
 
 # ==================== ЭНДПОИНТ УДАЛЕНИЯ ЗАПЧАСТИ (DELETE /parts/{part_id}) ====================
 
 
 @router.delete("/{part_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_part(part_id: int, db: Session = Depends(get_db)):
+async def delete_part(
+    part_id: int,
+    request: Request,
+    repo: PartRepository = Depends(get_repository),
+    cache: PartCache = Depends(get_part_cache),
+    stats: StatsCache = Depends(get_stats_cache),
+    events: EventHub = Depends(get_event_hub),
+):
     """
     Удалить запчасть по ID.
     """
-    db_part = db.query(PartDB).filter(PartDB.id == part_id).first()
-    if not db_part:
-        raise HTTPException(
-            status_code=404, detail=f"Запчасть с ID {part_id} не найдена"
-        )
+    try:
+        deleted = await repo.delete(part_id, if_match_version(request, part_id))
+    except PartNotFound:
+        raise _not_found(part_id)
+    except VersionConflict:  # If-Match не совпал с текущей версией
+        raise precondition_failed()
 
-    db.delete(db_part)  # помечаем объект на удаление
-    db.commit()  # фиксируем транзакцию (удаление происходит здесь)
+    await cache.invalidate(part_id, deleted["part_number"])  # и убираем из кэша
+    stats.part_deleted(deleted)
+    events.part_deleted(deleted)
 
     # Возвращаем None — для 204 ответа тело не требуется
     return None
@@ -226,10 +974,56 @@ def delete_part(part_id: int, db: Session = Depends(get_db)):
 #    - Создаём объект PartDB с распаковкой словаря: PartDB(**part.model_dump())
 #    - Добавляем в сессию, коммитим, обновляем (refresh) и возвращаем.
 #
-# 5. При чтении списка (GET /parts/) мы выполняем запрос .all() и преобразуем
-#    результат в тот же формат словаря, что и раньше, чтобы не ломать API.
+# 5. При чтении списка (GET /parts/) мы отдаём страницу (keyset по id) с
+#    фильтрами на стороне БД; ключи total/parts сохранены, добавлен next_after.
 #
 # 6. Для PUT и DELETE добавил соответствующие эндпоинты (ранее их не было).
 #
 # 7. В ответах теперь может появиться поле storage_location (если оно заполнено).
 #    В старом garage его не было — теперь оно есть в базе (см. models.py).
+#
+# 8. Все обработчики стали async def и работают с AsyncSession через await:
+#    запрос к БД больше не блокирует event loop и не занимает поток из пула.
+#
+# 9. POST /parts/bulk загружает тысячи запчастей пачками INSERT ... ON CONFLICT.
+#
+# 10. GET /parts/export выгружает весь склад потоком (CSV/NDJSON) курсором БД.
+#
+# 11. GET /parts/{part_id} читает через кэш; изменения удаляют запчасть из кэша.
+#
+# 12. ETag: GET отвечает 304 на If-None-Match, PUT/DELETE проверяют If-Match
+#     (версия строки PartDB.version, оптимистическая блокировка).
+#
+# 13. Обработчики работают через интерфейс PartRepository (ORM, Core или память,
+#     по настройке PARTS_BACKEND), а не через db.query(PartDB) напрямую.
+#
+# 14. Ответы кодируются через orjson (FastJSONResponse), а страница списка —
+#     через TypeAdapter.dump_json прямо в bytes.
+#
+# 15. GET /parts/search ищет по индексу полнотекстового поиска (FTS5 / tsvector)
+#     с ранжированием и поиском по началу каталожного номера.
+#
+# 16. POST /parts/{part_id}/stock и POST /parts/stock меняют количество одним
+#     атомарным UPDATE (без чтения перед записью и без потерянных списаний).
+#
+# 17. Изменения остатка пишутся в журнал stock_movements (та же транзакция),
+#     история — GET /parts/{part_id}/movements; старые движения сворачивает компакция.
+#
+# 18. PATCH /parts/{part_id} меняет только переданные поля одним UPDATE ... RETURNING;
+#     лишние SELECT (refresh после commit) убраны и из создания/изменения.
+#
+# 19. GET /parts/stats — сводка по складу, посчитанная в SQL (GROUP BY, SUM,
+#     ROW_NUMBER() OVER); кэш с коротким TTL поправляется при записи.
+#
+# 20. POST /parts/lookup отдаёт много запчастей по ID и номерам одним запросом
+#     (WHERE id IN (...) OR part_number IN (...)) вместо сотен GET /parts/{part_id}.
+#
+# 21. GET /parts/events (SSE) и /parts/events/ws (WebSocket) присылают изменения
+#     сразу после записи — терминалам больше не нужно опрашивать GET /parts.
+#
+# 22. GROUP_COMMIT_ENABLED=true: одиночные записи параллельных запросов фиксируются
+#     одной транзакцией на пачку (app/services/group_commit.py) — обработчики те же.
+#
+# 23. С DATABASE_REPLICA_URLS GET-запросы читают с реплик (app/db/replicas.py);
+#     запись и чтение клиента сразу после его записи — с основного сервера
+#     (и мимо кэша GET /parts/{part_id}; прочитанное с реплики в кэш не попадает).
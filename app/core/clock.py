@@ -0,0 +1,14 @@
+"""
+ТЕКУЩЕЕ ВРЕМЯ
+
+utc_now() нужно и моделям БД (значение по умолчанию created_at), и хранилищу
+в памяти (app/services/garage.py), которое не должно тянуть за собой
+SQLAlchemy, поэтому функция живёт здесь, а не в app/db/models.py.
+"""
+
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """Текущее время UTC без часового пояса (так DateTime одинаково хранится в SQLite и PG)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
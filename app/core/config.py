@@ -0,0 +1,267 @@
+"""
+НАСТРОЙКИ ПРИЛОЖЕНИЯ
+
+Назначение: единое место для всех параметров, которые меняются между
+окружениями (разработка, docker-compose, продакшен) без изменения кода.
+Все значения читаются из переменных окружения (и файла .env, если он есть).
+
+Использование:
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    settings.db_pool_size  # -> 5
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+
+# ----------------------------------------------------------------------
+# Вспомогательные функции чтения переменных окружения
+# ----------------------------------------------------------------------
+def _env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Настройки приложения. frozen=True — после создания менять нельзя,
+    чтобы все модули гарантированно видели одни и те же значения.
+    """
+
+    # --- Подключение к БД ---
+    database_url: str = "sqlite:///./garage.db"
+    # Явный async-URL (если не задан, выводится из database_url)
+    async_database_url: Optional[str] = None
+    # Реплики для чтения через запятую (app/db/replicas.py); пусто — без реплик
+    database_replica_urls: str = ""
+    # Реплика, отстающая больше чем на N секунд, не используется
+    db_replica_max_lag: float = 5.0
+    # Как часто проверять связь и отставание реплик, сек
+    db_replica_check_interval: float = 5.0
+
+    # --- Пул соединений (QueuePool) ---
+    # Постоянные соединения в пуле
+    db_pool_size: int = 5
+    # Сколько соединений можно открыть сверх pool_size при пиковой нагрузке
+    db_max_overflow: int = 10
+    # Сколько секунд ждать свободное соединение, прежде чем упасть с TimeoutError
+    db_pool_timeout: float = 30.0
+    # Пересоздавать соединение старше N секунд (-1 — никогда).
+    # Защищает от обрывов по idle-таймауту на стороне сервера/балансировщика.
+    db_pool_recycle: int = 1800
+    # Перед выдачей соединения проверять, что оно живое (лёгкий SELECT 1)
+    db_pool_pre_ping: bool = True
+    # Максимальное время выполнения одного запроса в PostgreSQL, мс (0 — без лимита)
+    db_statement_timeout_ms: int = 0
+    # Сколько соединений открыть заранее при старте воркера (0 — по первому запросу)
+    db_pool_warmup: int = 2
+
+    # --- SQLite (PRAGMA при каждом новом соединении) ---
+    # WAL: читатели не блокируют писателя и наоборот
+    sqlite_journal_mode: str = "WAL"
+    # NORMAL в режиме WAL безопасен и заметно быстрее FULL
+    sqlite_synchronous: str = "NORMAL"
+    # Сколько ждать освобождения блокировки вместо мгновенного "database is locked"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_foreign_keys: bool = True
+    # Сколько байт файла БД отображать в память (mmap), 0 — не отображать
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # Кэш страниц одного соединения, КиБ
+    sqlite_cache_size_kib: int = 16 * 1024
+    # Запись — одним соединением-писателем, чтение — пулом соединений только
+    # для чтения (app/db/database.py); для SQLite под параллельной записью
+    sqlite_single_writer: bool = False
+
+    # --- Хранилище запчастей (app/services/repository.py) ---
+    # orm — SQLAlchemy ORM, core — SQLAlchemy Core, memory — Garage в памяти
+    parts_backend: str = "orm"
+
+    # --- Кэш запчастей (GET /parts/{part_id}) ---
+    # memory — LRU в памяти процесса, redis — общий кэш, none — выключен
+    part_cache_backend: str = "memory"
+    # Максимум запчастей в LRU-кэше (старые вытесняются)
+    part_cache_max_size: int = 10_000
+    # Время жизни записи, сек: верхняя граница «устаревания» данных в кэше
+    part_cache_ttl: float = 60.0
+    # Адрес Redis для part_cache_backend=redis
+    redis_url: str = "redis://localhost:6379/0"
+
+    # --- Профилирование (app/core/profiling.py) ---
+    # Включает Server-Timing, GET /metrics и замеры фаз запроса
+    profiling_enabled: bool = False
+    # Сколько самых медленных запросов сохранять стеками (0 — сэмплер выключен)
+    profiling_slowest_requests: int = 0
+    # Интервал сэмплирования стека, мс
+    profiling_sample_interval_ms: float = 5.0
+    # Куда писать *.folded-файлы для flamegraph
+    profiling_dir: str = "./profiles"
+
+    # --- Журнал движений остатков (app/services/ledger.py) ---
+    # Как часто сворачивать старые движения внутри приложения, сек (0 — не сворачивать;
+    # при нескольких воркерах лучше запускать scripts/compact_ledger.py по расписанию)
+    ledger_compaction_interval: float = 0.0
+    # Движения старше N дней сворачиваются в снимки
+    ledger_retention_days: float = 30.0
+
+    # --- Сводка по складу (GET /parts/stats, app/services/stats.py) ---
+    # Время жизни сводки в кэше, сек: между пересчётами её обновляют сами записи
+    stats_cache_ttl: float = 10.0
+    # Порог «заканчивается»: quantity <= порога (по умолчанию для GET /parts/stats)
+    stats_low_stock_threshold: int = 5
+
+    # --- Лента изменений (GET /parts/events, app/services/events.py) ---
+    # Сколько последних событий хранить для досылки по Last-Event-ID
+    events_buffer_size: int = 1000
+    # Очередь одного подписчика: столько событий может ждать отправки
+    events_queue_size: int = 256
+    # Что делать с медленным подписчиком: disconnect | drop_oldest
+    events_overflow_policy: str = "disconnect"
+    # Раз в сколько секунд слать heartbeat в пустую ленту (не даёт прокси закрыть соединение)
+    events_heartbeat_interval: float = 15.0
+
+    # --- Групповой коммит (app/services/group_commit.py) ---
+    # Одиночные записи параллельных запросов фиксируются одной транзакцией на пачку
+    group_commit_enabled: bool = False
+    # Сколько мс после первой записи собирать пачку (0 — только то, что уже ждёт)
+    group_commit_interval_ms: float = 2.0
+    # Полная пачка фиксируется сразу, не дожидаясь конца интервала
+    group_commit_max_batch: int = 64
+
+    # --- Продакшен-сервер (serve.py) ---
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    # Число процессов-воркеров (0 — по числу доступных ядер CPU)
+    server_workers: int = 0
+    # Сколько секунд после SIGTERM ждать завершения начатых запросов
+    server_graceful_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Собирает настройки из переменных окружения (с значениями по умолчанию)."""
+        defaults = cls()
+        return cls(
+            database_url=_env_str("DATABASE_URL", defaults.database_url),
+            async_database_url=_env_str("ASYNC_DATABASE_URL"),
+            database_replica_urls=_env_str(
+                "DATABASE_REPLICA_URLS", defaults.database_replica_urls
+            ),
+            db_replica_max_lag=_env_float("DB_REPLICA_MAX_LAG", defaults.db_replica_max_lag),
+            db_replica_check_interval=_env_float(
+                "DB_REPLICA_CHECK_INTERVAL", defaults.db_replica_check_interval
+            ),
+            db_pool_size=_env_int("DB_POOL_SIZE", defaults.db_pool_size),
+            db_max_overflow=_env_int("DB_MAX_OVERFLOW", defaults.db_max_overflow),
+            db_pool_timeout=_env_float("DB_POOL_TIMEOUT", defaults.db_pool_timeout),
+            db_pool_recycle=_env_int("DB_POOL_RECYCLE", defaults.db_pool_recycle),
+            db_pool_pre_ping=_env_bool("DB_POOL_PRE_PING", defaults.db_pool_pre_ping),
+            db_pool_warmup=_env_int("DB_POOL_WARMUP", defaults.db_pool_warmup),
+            db_statement_timeout_ms=_env_int(
+                "DB_STATEMENT_TIMEOUT_MS", defaults.db_statement_timeout_ms
+            ),
+            sqlite_journal_mode=_env_str(
+                "SQLITE_JOURNAL_MODE", defaults.sqlite_journal_mode
+            ),
+            sqlite_synchronous=_env_str(
+                "SQLITE_SYNCHRONOUS", defaults.sqlite_synchronous
+            ),
+            sqlite_busy_timeout_ms=_env_int(
+                "SQLITE_BUSY_TIMEOUT_MS", defaults.sqlite_busy_timeout_ms
+            ),
+            sqlite_foreign_keys=_env_bool(
+                "SQLITE_FOREIGN_KEYS", defaults.sqlite_foreign_keys
+            ),
+            sqlite_mmap_size=_env_int("SQLITE_MMAP_SIZE", defaults.sqlite_mmap_size),
+            sqlite_cache_size_kib=_env_int(
+                "SQLITE_CACHE_SIZE_KIB", defaults.sqlite_cache_size_kib
+            ),
+            sqlite_single_writer=_env_bool(
+                "SQLITE_SINGLE_WRITER", defaults.sqlite_single_writer
+            ),
+            parts_backend=_env_str("PARTS_BACKEND", defaults.parts_backend).lower(),
+            part_cache_backend=_env_str(
+                "PART_CACHE_BACKEND", defaults.part_cache_backend
+            ).lower(),
+            part_cache_max_size=_env_int(
+                "PART_CACHE_MAX_SIZE", defaults.part_cache_max_size
+            ),
+            part_cache_ttl=_env_float("PART_CACHE_TTL", defaults.part_cache_ttl),
+            redis_url=_env_str("REDIS_URL", defaults.redis_url),
+            profiling_enabled=_env_bool("PROFILING_ENABLED", defaults.profiling_enabled),
+            profiling_slowest_requests=_env_int(
+                "PROFILING_SLOWEST_REQUESTS", defaults.profiling_slowest_requests
+            ),
+            profiling_sample_interval_ms=_env_float(
+                "PROFILING_SAMPLE_INTERVAL_MS", defaults.profiling_sample_interval_ms
+            ),
+            profiling_dir=_env_str("PROFILING_DIR", defaults.profiling_dir),
+            ledger_compaction_interval=_env_float(
+                "LEDGER_COMPACTION_INTERVAL", defaults.ledger_compaction_interval
+            ),
+            ledger_retention_days=_env_float(
+                "LEDGER_RETENTION_DAYS", defaults.ledger_retention_days
+            ),
+            stats_cache_ttl=_env_float("STATS_CACHE_TTL", defaults.stats_cache_ttl),
+            stats_low_stock_threshold=_env_int(
+                "STATS_LOW_STOCK_THRESHOLD", defaults.stats_low_stock_threshold
+            ),
+            events_buffer_size=_env_int("EVENTS_BUFFER_SIZE", defaults.events_buffer_size),
+            events_queue_size=_env_int("EVENTS_QUEUE_SIZE", defaults.events_queue_size),
+            events_overflow_policy=_env_str(
+                "EVENTS_OVERFLOW_POLICY", defaults.events_overflow_policy
+            ).lower(),
+            events_heartbeat_interval=_env_float(
+                "EVENTS_HEARTBEAT_INTERVAL", defaults.events_heartbeat_interval
+            ),
+            group_commit_enabled=_env_bool(
+                "GROUP_COMMIT_ENABLED", defaults.group_commit_enabled
+            ),
+            group_commit_interval_ms=_env_float(
+                "GROUP_COMMIT_INTERVAL_MS", defaults.group_commit_interval_ms
+            ),
+            group_commit_max_batch=_env_int(
+                "GROUP_COMMIT_MAX_BATCH", defaults.group_commit_max_batch
+            ),
+            server_host=_env_str("HOST", defaults.server_host),
+            server_port=_env_int("PORT", defaults.server_port),
+            # WEB_CONCURRENCY — общепринятое имя (так его понимают uvicorn, gunicorn, PaaS)
+            server_workers=_env_int("WEB_CONCURRENCY", defaults.server_workers),
+            server_graceful_timeout=_env_float(
+                "GRACEFUL_SHUTDOWN_TIMEOUT", defaults.server_graceful_timeout
+            ),
+        )
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Возвращает настройки приложения.
+    lru_cache — окружение читается один раз, дальше отдаётся тот же объект.
+    Файл .env тоже читается здесь, при первом вызове, а не при импорте модуля.
+    """
+    from dotenv import load_dotenv
+
+    # Загружаем переменные из .env (если файл существует)
+    load_dotenv()
+    return Settings.from_env()
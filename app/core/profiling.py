@@ -0,0 +1,434 @@
+"""
+ПРОФИЛИРОВАНИЕ ЗАПРОСОВ (включается настройкой PROFILING_ENABLED)
+
+Назначение: понять, куда уходит время медленного запроса — в SQL,
+в превращение строк в объекты/словари, в проверку Pydantic или в JSON.
+
+Фазы одного запроса:
+    sql        - выполнение SQL (события SQLAlchemy before/after_cursor_execute)
+    hydration  - работа хранилища без выполнения SQL: получение строк,
+                 строки → ORM-объекты → словари, а также выдача соединения
+                 из пула и COMMIT
+    endpoint   - остальной код обработчика
+    validation - разбор тела и зависимостей, проверка response_model (Pydantic).
+                 Если FastAPI сериализует response_model прямо в Pydantic
+                 (быстрый путь dump_json), кодирование JSON тоже попадает сюда.
+    json       - кодирование ответа в JSON (TimedJSONResponse.render).
+                 Список GET /parts кодируется в обработчике (TypeAdapter.dump_json)
+                 и попадает в endpoint
+    total      - всё время до начала отправки ответа
+
+Фазы validation/endpoint замеряются только у маршрутов с ProfilingRoute
+(роутер /parts); у остальных (например, /health) они равны нулю.
+
+Составные части:
+1. RequestProfile и current_profile - данные текущего запроса (ContextVar:
+   у каждого запроса — свой, даже при конкурентных запросах в одном event loop)
+2. install_sql_listeners() - счётчик и время SQL-запросов через события движка
+3. ProfilingRoute, TimedJSONResponse, ProfiledRepository - замеры фаз
+4. StackSampler - сэмплирующий профилировщик: раз в N мс снимает стек потока
+   event loop и сохраняет стеки самых медленных запросов в формате
+   collapsed stacks (flamegraph.pl, speedscope, inferno)
+5. ProfilingMiddleware - заголовок Server-Timing и метрики для GET /metrics
+6. install_profiling() - подключение всего перечисленного к приложению
+
+Без PROFILING_ENABLED middleware и слушатели SQL не подключаются, а
+ProfilingRoute и TimedJSONResponse сводятся к одной проверке ContextVar.
+"""
+
+import heapq
+import inspect
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import registry
+from app.core.responses import FastJSONResponse
+from fastapi.routing import APIRoute
+
+# ----------------------------------------------------------------------
+# 1. ДАННЫЕ ТЕКУЩЕГО ЗАПРОСА
+# ----------------------------------------------------------------------
+PHASES = ("sql", "hydration", "endpoint", "validation", "json")
+
+
+class RequestProfile:
+    """Замеры одного запроса. __slots__ — объект создаётся на каждый запрос."""
+
+    __slots__ = (
+        "method",
+        "path",
+        "route",
+        "started",
+        "total",
+        "timings",
+        "sql_count",
+        "samples",
+    )
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None  # шаблон маршрута: /parts/{part_id}
+        self.started = time.perf_counter()
+        self.total = 0.0
+        # Сырые замеры: sql, repository, endpoint, handler, json (секунды)
+        self.timings: Dict[str, float] = {}
+        self.sql_count = 0
+        self.samples: Counter = Counter()  # стек → число сэмплов
+
+    def add(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def phases(self) -> Dict[str, float]:
+        """
+        Вложенные замеры → непересекающиеся фазы:
+        handler ⊃ endpoint ⊃ repository ⊃ sql, json — отдельно.
+        """
+        timing = self.timings.get
+        sql = timing("sql", 0.0)
+        repository = max(timing("repository", 0.0), sql)
+        endpoint = max(timing("endpoint", 0.0), repository)
+        json_time = timing("json", 0.0)
+        handler = timing("handler", 0.0)
+        return {
+            "sql": sql,
+            "hydration": repository - sql,
+            "endpoint": endpoint - repository,
+            "validation": max(handler - endpoint - json_time, 0.0) if handler else 0.0,
+            "json": json_time,
+        }
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+# ----------------------------------------------------------------------
+# 2. SQL: КОЛИЧЕСТВО И ВРЕМЯ ЗАПРОСОВ
+# ----------------------------------------------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["profiling_started"].pop()
+    profile = current_profile.get()
+    if profile is not None:
+        profile.sql_count += 1
+        profile.add("sql", time.perf_counter() - started)
+
+
+def _handle_error(exception_context) -> None:
+    # Запрос упал: after_cursor_execute не вызовется — снимаем отметку сами
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("profiling_started"):
+        connection.info["profiling_started"].pop()
+
+
+def install_sql_listeners(engine: Any = Engine) -> None:
+    """
+    Вешает слушатели на движок (для AsyncEngine — на engine.sync_engine).
+    По умолчанию — на класс Engine, т.е. на все движки процесса, в том числе
+    ещё не созданные (app/db/database.py создаёт их при первом обращении).
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+# ----------------------------------------------------------------------
+# 3. ЗАМЕРЫ ФАЗ
+# ----------------------------------------------------------------------
+def _timed_coroutine(function: Callable[..., Any], name: str) -> Callable[..., Any]:
+    """Обёртка async-функции: время выполнения добавляется к фазе name."""
+
+    @wraps(function)  # сохраняет сигнатуру — FastAPI читает по ней параметры
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        profile = current_profile.get()
+        if profile is None:
+            return await function(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            profile.add(name, time.perf_counter() - started)
+
+    return wrapper
+
+
+class ProfilingRoute(APIRoute):
+    """
+    Маршрут FastAPI, который замеряет обработчик целиком (handler)
+    и саму функцию эндпоинта (endpoint). Разница — проверка Pydantic
+    и разбор зависимостей. Подключается через APIRouter(route_class=...).
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = _timed_coroutine(endpoint, "endpoint")
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route_path = self.path_format
+
+        async def profiled_handler(request):
+            profile = current_profile.get()
+            if profile is None:
+                return await handler(request)
+            profile.route = route_path
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                profile.add("handler", time.perf_counter() - started)
+
+        return profiled_handler
+
+
+class TimedJSONResponse(FastJSONResponse):
+    """FastJSONResponse (orjson), который замеряет кодирование тела в JSON."""
+
+    def render(self, content: Any) -> bytes:
+        profile = current_profile.get()
+        if profile is None:
+            return super().render(content)
+        started = time.perf_counter()
+        body = super().render(content)
+        profile.add("json", time.perf_counter() - started)
+        return body
+
+
+class ProfiledRepository:
+    """
+    Обёртка над PartRepository: время async-методов идёт в фазу repository
+    (из неё потом вычитается SQL — остаток и есть «гидрация»).
+    iter_all (экспорт) не оборачивается: он работает уже после ответа.
+    """
+
+    def __init__(self, repository: Any) -> None:
+        self._repository = repository
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._repository, name)
+        if inspect.iscoroutinefunction(attribute):
+            attribute = _timed_coroutine(attribute, "repository")
+            setattr(self, name, attribute)  # следующий вызов — без __getattr__
+        return attribute
+
+
+# ----------------------------------------------------------------------
+# 4. СЭМПЛИРУЮЩИЙ ПРОФИЛИРОВЩИК
+# ----------------------------------------------------------------------
+class StackSampler:
+    """
+    Отдельный поток раз в interval секунд снимает стек потока event loop
+    (sys._current_frames) и засчитывает сэмпл запросу, чей
+    ProfilingMiddleware.__call__ найден в этом стеке. Так сэмплы не
+    смешиваются между конкурентными запросами. Ожидание (await SQL, сети)
+    в стек не попадает — это видно в фазах sql/total.
+
+    Стеки keep_slowest самых медленных запросов пишутся в output_dir
+    файлами *.folded: одна строка «кадр;кадр;кадр число_сэмплов».
+    """
+
+    def __init__(self, output_dir: str, keep_slowest: int, interval: float) -> None:
+        self.output_dir = output_dir
+        self.keep_slowest = keep_slowest
+        self.interval = interval
+        # кадр middleware → профиль запроса (кадры сравниваются по идентичности)
+        self._active: Dict[Any, RequestProfile] = {}
+        self._thread_id: Optional[int] = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        # (длительность, номер, файл) — min-куча: сверху самый быстрый из сохранённых
+        self._slowest: List[Tuple[float, int, str]] = []
+        self._sequence = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, frame: Any, profile: RequestProfile) -> None:
+        if self._thread is None:
+            self._thread_id = threading.get_ident()  # поток event loop
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._thread = threading.Thread(
+                target=self._run, name="stack-sampler", daemon=True
+            )
+            self._thread.start()
+        self._active[frame] = profile
+        self._wakeup.set()
+
+    def finish(self, frame: Any, profile: RequestProfile) -> None:
+        self._active.pop(frame, None)
+        if not self._active:
+            self._wakeup.clear()  # нет запросов — поток спит
+        with self._lock:
+            samples = dict(profile.samples)
+        if samples:
+            self._keep_if_slow(profile, samples)
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._sample(frame)
+
+    def _sample(self, frame: Any) -> None:
+        stack = []
+        while frame is not None:
+            profile = self._active.get(frame)
+            if profile is not None:
+                with self._lock:
+                    profile.samples[";".join(reversed(stack))] += 1
+                return
+            code = frame.f_code
+            stack.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+            )
+            frame = frame.f_back
+        # Стек без ProfilingMiddleware — код вне запроса, его не учитываем
+
+    def _keep_if_slow(self, profile: RequestProfile, samples: Dict[str, int]) -> None:
+        heap = self._slowest
+        if len(heap) >= self.keep_slowest and profile.total <= heap[0][0]:
+            return
+        self._sequence += 1
+        route = re.sub(r"[^A-Za-z0-9]+", "_", profile.route or profile.path).strip("_")
+        path = os.path.join(
+            self.output_dir,
+            f"{profile.total * 1000:.0f}ms-{profile.method}-{route or 'root'}"
+            f"-{self._sequence}.folded",
+        )
+        with open(path, "w", encoding="utf-8") as output:
+            for stack, count in sorted(samples.items()):
+                output.write(f"{stack} {count}\n")
+        heapq.heappush(heap, (profile.total, self._sequence, path))
+        if len(heap) > self.keep_slowest:
+            _, _, evicted = heapq.heappop(heap)
+            try:
+                os.remove(evicted)
+            except OSError:
+                pass
+
+
+# ----------------------------------------------------------------------
+# 5. MIDDLEWARE: SERVER-TIMING И МЕТРИКИ
+# ----------------------------------------------------------------------
+REQUESTS = registry.counter(
+    "garage_http_requests_total",
+    "Количество HTTP-запросов",
+    ("method", "route", "status"),
+)
+REQUEST_DURATION = registry.histogram(
+    "garage_http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ("method", "route"),
+)
+PHASE_DURATION = registry.histogram(
+    "garage_http_request_phase_seconds",
+    "Время фаз обработки запроса (sql, hydration, endpoint, validation, json)",
+    ("route", "phase"),
+)
+SQL_STATEMENTS = registry.histogram(
+    "garage_db_statements_per_request",
+    "Количество SQL-запросов на один HTTP-запрос",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+
+
+def server_timing(profile: RequestProfile, total: float) -> str:
+    """Значение заголовка Server-Timing (видно во вкладке Network браузера)."""
+    parts = [
+        f'{name};dur={seconds * 1000:.2f}'
+        + (f';desc="{profile.sql_count} queries"' if name == "sql" else "")
+        for name, seconds in profile.phases().items()
+    ]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class ProfilingMiddleware:
+    """
+    Чистый ASGI-middleware (без BaseHTTPMiddleware: не буферизует потоковые
+    ответы вроде /parts/export и не создаёт лишнюю задачу на запрос).
+    """
+
+    def __init__(self, app: Any, sampler: Optional[StackSampler] = None) -> None:
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = current_profile.set(profile)
+        status_code = 500
+        frame = sys._getframe()  # по этому кадру сэмплер узнаёт запрос
+
+        async def send_with_timing(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total = time.perf_counter() - profile.started
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (b"server-timing", server_timing(profile, total).encode("latin-1"))
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if self.sampler is not None:
+            self.sampler.start(frame, profile)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            profile.total = time.perf_counter() - profile.started
+            current_profile.reset(token)
+            self._record(scope, profile, status_code)
+            if self.sampler is not None:
+                self.sampler.finish(frame, profile)
+
+    @staticmethod
+    def _record(scope, profile: RequestProfile, status_code: int) -> None:
+        route = profile.route
+        if route is None:
+            # Маршруты вне ProfilingRoute (например, /health): шаблон из scope
+            matched = scope.get("route")
+            route = getattr(matched, "path", None) or "<unmatched>"
+        REQUESTS.inc(method=profile.method, route=route, status=str(status_code))
+        REQUEST_DURATION.observe(profile.total, method=profile.method, route=route)
+        SQL_STATEMENTS.observe(profile.sql_count, route=route)
+        for phase, seconds in profile.phases().items():
+            PHASE_DURATION.observe(seconds, route=route, phase=phase)
+
+
+# ----------------------------------------------------------------------
+# 6. ПОДКЛЮЧЕНИЕ К ПРИЛОЖЕНИЮ
+# ----------------------------------------------------------------------
+def install_profiling(app: Any, settings: Any) -> None:
+    """Middleware, слушатели SQL (на все движки) и (если задано) сэмплирующий профилировщик."""
+    install_sql_listeners()
+    sampler = None
+    if settings.profiling_slowest_requests > 0:
+        sampler = StackSampler(
+            settings.profiling_dir,
+            settings.profiling_slowest_requests,
+            settings.profiling_sample_interval_ms / 1000,
+        )
+    app.add_middleware(ProfilingMiddleware, sampler=sampler)
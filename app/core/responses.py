@@ -0,0 +1,63 @@
+"""
+БЫСТРЫЙ JSON-ОТВЕТ
+
+Назначение: кодирование ответов в JSON — заметная доля CPU на больших
+списках. orjson (написан на Rust) кодирует в несколько раз быстрее
+стандартного json и сразу возвращает bytes.
+
+1. json_dumps() - словарь/список → bytes (orjson, если установлен)
+2. FastJSONResponse - ответ по умолчанию для всего приложения (см. app/main.py)
+
+orjson — обычная зависимость проекта, но если пакета нет (например,
+в урезанном окружении), используется стандартный json. Типы, которые orjson
+кодирует сам (datetime/date/time, UUID, dataclass, Enum), переводит _default() —
+в тот же вид, что у orjson. Ключи словарей в запасном варианте — только
+str/int/float/bool/None (orjson с OPT_NON_STR_KEYS принимает и datetime, UUID).
+"""
+
+import dataclasses
+import json
+from datetime import date, time
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson не установлен
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Типы, которые orjson кодирует без default=, — для стандартного json."""
+    if isinstance(value, (date, time)):  # datetime — подкласс date
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def json_dumps(value: Any) -> bytes:
+    """
+    Компактный JSON в UTF-8 (кириллица без \\uXXXX-экранирования,
+    как и у стандартного JSONResponse).
+    """
+    if orjson is not None:
+        # OPT_NON_STR_KEYS — ключи-числа допустимы (как у json.dumps)
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse, который кодирует через orjson (аналог fastapi ORJSONResponse)."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
@@ -12,20 +12,21 @@ import sys
 # Добавляем корень проекта в путь Python для корректных импортов
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from app.db.database import SessionLocal, engine
-from app.db.models import Base, PartDB
+from app.db.database import get_engine, get_session_factory
+from app.db.models import Base, PartDB, StockMovementDB
+from app.services import ledger
 
 
 def init_database():
     """Создаёт все таблицы в базе данных, если их ещё нет."""
     print("🚀 Создание таблиц в базе данных...")
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
     print("✅ Таблицы успешно созданы (или уже существовали).")
 
 
 def add_test_data():
     """Добавляет тестовые запчасти, если таблица пуста."""
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         # Проверяем, есть ли уже записи в таблице parts
         count = db.query(PartDB).count()
@@ -69,9 +70,17 @@ def add_test_data():
             },
         ]
 
-        for part_data in test_parts:
-            part = PartDB(**part_data)
-            db.add(part)
+        parts = [PartDB(**part_data) for part_data in test_parts]
+        db.add_all(parts)
+        db.flush()  # INSERT без commit: у запчастей появляются id
+
+        # Начальные остатки — в журнал движений (как при POST /parts/)
+        db.add_all(
+            StockMovementDB(
+                **ledger.movement(part.id, part.quantity, part.quantity, ledger.CREATE)
+            )
+            for part in parts
+        )
 
         db.commit()
         print(f"✅ Добавлено {len(test_parts)} тестовых запчастей.")
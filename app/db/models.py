@@ -13,12 +13,17 @@
 
 from sqlalchemy import (
     Column,
+    DateTime,
     Float,  # если ещё не импортирован
+    Index,
     Integer,
     String,
 )
 from sqlalchemy.orm import declarative_base
 
+from app.core.clock import utc_now
+from app.db.search import install_search_ddl  # DDL индексов поиска
+
 # Базовый класс для всех моделей. Все таблицы регистрируются через него.
 # Это "точка входа" для системы маппинга SQLAlchemy.
 Base = declarative_base()
@@ -42,8 +47,9 @@ class PartDB(Base):
     part_number = Column(String, unique=True, index=True)
     # ↑ Уникальный каталожный номер, с индексом для быстрого поиска
 
-    quantity = Column(Integer, default=0)
+    quantity = Column(Integer, default=0, index=True)
     # ↑ Количество на складе, по умолчанию = 0
+    #   Индекс — для списка заканчивающихся запчастей (WHERE quantity <= :порог, GET /parts/stats)
 
     storage_location = Column(String, nullable=True)
     # ↑ Место хранения (полка, ящик), может быть не указано (NULL)
@@ -52,3 +58,57 @@ class PartDB(Base):
     # поэтому писать его вручную не нужно.
     # Также автоматически доступен метод __repr__ для отладки.
     price = Column(Float, nullable=True)  # цена, может быть пустой
+
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # ↑ Версия строки: увеличивается при каждом изменении.
+    #   Из неё строится ETag, а If-Match сравнивает её для оптимистической блокировки.
+
+    # AUTOINCREMENT (только SQLite): id удалённой запчасти не достаётся новой.
+    # Без него SQLite выдаёт max(id) + 1, и после удаления последней запчасти
+    # новая получала бы её id — а с ним её ETag "<id>-1" и её историю в журнале
+    # движений (stock_movements без FOREIGN KEY). PostgreSQL id и так не повторяет.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # version_id_col: при UPDATE/DELETE через ORM SQLAlchemy сама добавляет
+    # "WHERE version = <прочитанная версия>" и увеличивает version на 1.
+    # Если строку успел изменить кто-то другой, будет StaleDataError, а не
+    # молчаливая перезапись. Core-запросы (INSERT ... ON CONFLICT и т.п.)
+    # должны увеличивать version сами: version = version + 1.
+    __mapper_args__ = {"version_id_col": version}
+
+    def to_dict(self) -> dict:
+        """
+        Все колонки в виде словаря {имя: значение}.
+        Такой словарь можно положить в кэш или сразу отдать как JSON.
+        """
+        return {column.key: getattr(self, column.key) for column in self.__table__.columns}
+
+
+# Индексы полнотекстового поиска (FTS5 / tsvector) создаются вместе с таблицей
+install_search_ddl(PartDB.__table__)
+
+
+class StockMovementDB(Base):
+    """
+    Модель 'Движение остатка'. Журнал (ledger) всех изменений quantity:
+    приход, списание, создание, удаление, загрузка фида.
+    Строки только добавляются; PartDB.quantity — текущий итог по журналу,
+    который поддерживается в той же транзакции (читать остаток из журнала не нужно).
+    Старые строки сворачивает app/services/ledger.py (компакция).
+    """
+
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True)
+    # Без FOREIGN KEY: история остаётся и после удаления запчасти. Поэтому id
+    # запчастей не должны использоваться повторно (parts — AUTOINCREMENT),
+    # иначе новая запчасть унаследовала бы историю удалённой
+    part_id = Column(Integer, nullable=False)
+    delta = Column(Integer, nullable=False)  # +приход / -списание
+    quantity_after = Column(Integer, nullable=False)  # остаток после движения
+    kind = Column(String(16), nullable=False)  # create, update, adjust, import, delete, snapshot
+    created_at = Column(DateTime, nullable=False, default=utc_now)
+
+    # История запчасти: WHERE part_id = :id AND id < :before ORDER BY id DESC —
+    # весь запрос идёт по одному индексу, без сортировки
+    __table_args__ = (Index("ix_stock_movements_part_id_id", "part_id", "id"),)
@@ -0,0 +1,107 @@
+"""
+ПУЛ СОЕДИНЕНИЙ С МЕТРИКАМИ
+
+Назначение: стандартные пулы SQLAlchemy знают, сколько соединений занято,
+но не считают, сколько запросы ЖДУТ свободное соединение. Именно это ожидание
+превращается в "QueuePool limit ... connection timed out" под нагрузкой.
+
+Здесь:
+1. PoolWaitStats - счётчики ожидания соединения (сколько раз, суммарно, максимум)
+2. InstrumentedQueuePool / InstrumentedAsyncQueuePool - пулы, которые их ведут
+3. pool_status() - снимок состояния пула для /health
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolWaitStats:
+    """Накопительная статистика ожидания соединения из пула."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()  # пул используется из разных потоков
+        self.checkouts = 0  # сколько раз выдавали соединение
+        self.timeouts = 0  # сколько раз не дождались (TimeoutError)
+        self.total_wait = 0.0  # суммарное время ожидания, сек
+        self.max_wait = 0.0  # самое долгое ожидание, сек
+        self.last_wait = 0.0  # последнее ожидание, сек
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.last_wait = seconds
+            if seconds > self.max_wait:
+                self.max_wait = seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.total_wait / attempts * 1000, 3)
+                if attempts
+                else 0.0,
+                "wait_max_ms": round(self.max_wait * 1000, 3),
+                "wait_last_ms": round(self.last_wait * 1000, 3),
+            }
+
+
+class _WaitTimeMixin:
+    """
+    Замеряет время connect() — от запроса соединения до его получения.
+    Сюда входит и ожидание в очереди, и открытие нового соединения.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def connect(self):  # type: ignore[no-untyped-def]
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.wait_stats.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.observe(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_WaitTimeMixin, QueuePool):
+    """QueuePool для синхронного движка (скрипты, init_db)."""
+
+
+class InstrumentedAsyncQueuePool(_WaitTimeMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool для асинхронного движка (обработчики FastAPI)."""
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """
+    Снимок состояния пула: занятые соединения, overflow и ожидание.
+    Для пулов без очереди (NullPool, StaticPool) отдаём только тип.
+    """
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),  # постоянный размер пула
+                "checked_out": pool.checkedout(),  # сейчас выдано запросам
+                "checked_in": pool.checkedin(),  # свободно в пуле
+                # overflow() < 0, пока пул ещё не заполнен до pool_size
+                "overflow": max(pool.overflow(), 0),
+                "timeout_s": pool.timeout(),
+            }
+        )
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status.update(wait_stats.as_dict())
+    return status
@@ -0,0 +1,160 @@
+"""
+РЕПЛИКИ ДЛЯ ЧТЕНИЯ (DATABASE_REPLICA_URLS)
+
+Назначение: основной сервер PostgreSQL занят чтением GET /parts, хотя те же
+данные есть на репликах. ReplicaSet раздаёт чтение репликам по кругу
+(round-robin) и следит, какие из них можно использовать:
+    - живая: проверка раз в DB_REPLICA_CHECK_INTERVAL секунд прошла;
+      обрыв соединения во время запроса тоже выключает реплику до проверки
+    - не отстаёт: задержка применения WAL не больше DB_REPLICA_MAX_LAG секунд
+Если подходящих реплик нет — чтение идёт на основной сервер (fallback).
+
+Какие запросы вообще можно отдать репликам, решает get_db()
+(app/db/database.py): только GET/HEAD, и только если клиент недавно ничего не
+записывал (read-your-writes), а маршрут отдельных SQL-запросов внутри сессии —
+RoutingSession (app/db/routing.py).
+
+Отставание PostgreSQL: реплика, которая получила и применила весь WAL, не
+отстаёт (даже если на основном давно не было записей); иначе — время с
+последней применённой транзакции. SQLite (локальная подмена: два файла) не
+реплицируется — у неё проверяется только связь, отставание 0.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.pool import pool_status
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики в секундах (0 на основном сервере)
+POSTGRES_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+# Сколько ждать ответа реплики при проверке, сек
+CHECK_TIMEOUT = 2.0
+
+
+class Replica:
+    """Одна реплика: движок и результат последней проверки."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.name = engine.url.render_as_string(hide_password=True)
+        self.healthy = False  # до первой проверки реплика не используется
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.reads = 0  # сколько сессий отправили сюда чтение
+        # Обрыв соединения посреди запроса — не ждём следующей проверки
+        event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def _on_error(self, context: Any) -> None:
+        if context.is_disconnect:
+            self.healthy = False
+            self.error = type(context.original_exception).__name__
+
+    async def check(self) -> None:
+        """Связь и отставание; любая ошибка — реплика выключается до следующей проверки."""
+        try:
+            self.lag = await asyncio.wait_for(self._measure_lag(), CHECK_TIMEOUT)
+        except Exception as error:  # noqa: BLE001 — недоступная реплика не ошибка приложения
+            if self.healthy:
+                logger.warning("Реплика %s недоступна: %r", self.name, error)
+            self.healthy, self.error = False, type(error).__name__
+        else:
+            if not self.healthy:
+                logger.info("Реплика %s доступна (отставание %.1f с)", self.name, self.lag)
+            self.healthy, self.error = True, None
+        self.checked_at = time.time()
+
+    async def _measure_lag(self) -> float:
+        async with self.engine.connect() as connection:
+            if self.engine.dialect.name == "postgresql":
+                return float((await connection.execute(POSTGRES_LAG_QUERY)).scalar() or 0)
+            await connection.execute(text("SELECT 1"))
+            return 0.0
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "url": self.name,
+            "healthy": self.healthy,
+            "lag_s": None if self.lag is None else round(self.lag, 3),
+            "error": self.error,
+            "reads": self.reads,
+            "pool": pool_status(self.engine.pool),
+        }
+
+
+class ReplicaSet:
+    """Реплики для чтения: выбор по кругу среди живых и не отстающих."""
+
+    def __init__(
+        self, engines: List[AsyncEngine], max_lag: float, check_interval: float
+    ) -> None:
+        self.replicas = [Replica(engine) for engine in engines]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.fallbacks = 0  # чтение ушло на основной: подходящих реплик не было
+        self._next = 0
+
+    def usable(self) -> List[Replica]:
+        return [
+            replica
+            for replica in self.replicas
+            if replica.healthy and replica.lag is not None and replica.lag <= self.max_lag
+        ]
+
+    def choose(self) -> Optional[Engine]:
+        """Синхронный движок следующей подходящей реплики или None (читать с основного)."""
+        usable = self.usable()
+        if not usable:
+            self.fallbacks += 1
+            return None
+        replica = usable[self._next % len(usable)]
+        self._next += 1
+        replica.reads += 1
+        return replica.engine.sync_engine
+
+    @property
+    def read_your_writes_window(self) -> float:
+        """
+        Сколько секунд после записи клиент читает с основного сервера: реплика
+        с отставанием до max_lag (измеренным не позже check_interval назад)
+        к этому времени свою запись уже получила.
+        """
+        return self.max_lag + self.check_interval
+
+    async def check(self) -> None:
+        await asyncio.gather(*(replica.check() for replica in self.replicas))
+
+    async def monitor(self) -> None:
+        """Фоновая задача (lifespan): проверка реплик раз в check_interval секунд."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def info(self) -> Dict[str, Any]:
+        """Состояние реплик (для GET /health)."""
+        return {
+            "max_lag_s": self.max_lag,
+            "usable": len(self.usable()),
+            "fallbacks": self.fallbacks,
+            "replicas": [replica.info() for replica in self.replicas],
+        }
@@ -0,0 +1,83 @@
+"""
+МАРШРУТИЗАЦИЯ ЗАПРОСОВ СЕССИИ: ЗАПИСЬ И ЧТЕНИЕ — РАЗНЫМИ СОЕДИНЕНИЯМИ
+
+Назначение: сессия SQLAlchemy сама выбирает движок для каждого запроса
+(Session.get_bind), поэтому код хранилищ не меняется — он по-прежнему
+работает с одной AsyncSession, а RoutingSession решает, куда идёт запрос:
+    чтение (SELECT)                  → движок для чтения
+    запись (INSERT/UPDATE/DELETE,
+    flush ORM, SELECT ... FOR UPDATE) → основной движок (писатель)
+
+После первой записи в транзакции все запросы до её конца идут в основной
+движок: чтение «сразу после записи» (например, SELECT после UPDATE, не
+задевшего строку) должно видеть незафиксированные изменения своей транзакции,
+а их видит только соединение писателя.
+
+Используется для SQLite в режиме SQLITE_SINGLE_WRITER и для реплик
+(DATABASE_REPLICA_URLS) — см. app/db/database.py.
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import TextClause, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, SessionTransaction
+
+
+def is_read_only(clause: Any) -> bool:
+    """Можно ли выполнить запрос соединением для чтения."""
+    if clause is None:
+        return False  # session.connection() без запроса — неизвестно, что дальше
+    if getattr(clause, "is_select", False):
+        # SELECT ... FOR UPDATE блокирует строки — это часть записи
+        return getattr(clause, "_for_update_arg", None) is None
+    if isinstance(clause, TextClause):
+        # text(): по первому слову ("BEGIN IMMEDIATE" группового коммита — запись)
+        return clause.text.lstrip()[:6].upper() == "SELECT"
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Session, которая отправляет чтение в read_bind(), а всё остальное — в
+    основной движок (bind сессии). read_bind возвращает синхронный Engine
+    (для AsyncEngine — его .sync_engine) или None — тогда читаем основным.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        read_bind: Optional[Callable[[], Optional[Engine]]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.read_bind = read_bind
+        self.writing = False  # в текущей транзакции уже была запись
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        if self.read_bind is not None and not self.writing and not self._flushing:
+            if is_read_only(clause):
+                reader = self.read_bind()
+                if reader is not None:
+                    return reader
+        self.writing = True
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def same_reads(session: Any) -> Dict[str, Any]:
+    """
+    Аргументы фабрики сессий, с которыми новая сессия читает оттуда же, откуда
+    session (AsyncSession): потоковый экспорт открывает свою сессию.
+    """
+    sync_session = getattr(session, "sync_session", session)
+    if isinstance(sync_session, RoutingSession) and sync_session.read_bind is not None:
+        return {"read_bind": sync_session.read_bind}
+    return {}
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _transaction_end(session: RoutingSession, transaction: SessionTransaction) -> None:
+    # Внешняя транзакция закончилась (commit/rollback) — чтение снова идёт читателям.
+    # Точки сохранения (begin_nested) флаг не сбрасывают.
+    if transaction.parent is None:
+        session.writing = False
@@ -0,0 +1,82 @@
+"""
+ПОЛНОТЕКСТОВЫЙ ПОИСК ПО ЗАПЧАСТЯМ (ИНДЕКСЫ)
+
+Назначение: GET /parts/search ищет по индексу, а не перебором таблицы.
+У каждой СУБД свой механизм:
+
+PostgreSQL:
+    search_vector - генерируемая колонка tsvector: номер (вес A, словарь simple)
+                    + название (вес B, словарь russian — «колодки» и «колодка»
+                    приводятся к одной основе). PostgreSQL сам пересчитывает её
+                    при INSERT/UPDATE, поэтому триггеры не нужны.
+    GIN-индекс по search_vector - для @@ (полнотекстовый поиск)
+    GIN-индекс pg_trgm по name  - для нечёткого поиска с опечатками (<%)
+    индекс text_pattern_ops по part_number - для LIKE 'OIL-0%' при любой collation
+
+SQLite:
+    parts_fts - виртуальная таблица FTS5 (external content: хранит только индекс,
+                сами данные остаются в parts). Токенизатор unicode61 без учёта
+                регистра и для кириллицы. Три триггера поддерживают индекс при
+                INSERT/UPDATE/DELETE в parts.
+
+Для новых баз DDL выполняется сразу после CREATE TABLE parts (событие after_create,
+т.е. работает и с Base.metadata.create_all). Существующие базы обновляет
+миграция Alembic (app/migrations/versions/c4f2a9e7d1b3_add_part_search.py).
+"""
+
+from typing import List
+
+from sqlalchemy import DDL, Table, event
+
+# Имена объектов, которых нет в моделях SQLAlchemy (их не должен трогать
+# alembic autogenerate — см. app/migrations/env.py)
+FTS_TABLE = "parts_fts"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_INDEXES = ("ix_parts_search_vector", "ix_parts_name_trgm", "ix_parts_part_number_pattern")
+
+POSTGRES_SEARCH_DDL: List[str] = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE parts ADD COLUMN IF NOT EXISTS search_vector tsvector"
+    " GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(part_number, '')), 'A')"
+    " || setweight(to_tsvector('russian', coalesce(name, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_parts_search_vector ON parts USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_parts_name_trgm ON parts USING GIN (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_parts_part_number_pattern"
+    " ON parts (part_number text_pattern_ops)",
+]
+
+SQLITE_SEARCH_DDL: List[str] = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts USING fts5("
+    "name, part_number, content='parts', content_rowid='id',"
+    " tokenize='unicode61 remove_diacritics 2')",
+    # Для external content FTS5 удаление записи — это INSERT со служебным
+    # значением 'delete' и СТАРЫМИ значениями колонок
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_insert AFTER INSERT ON parts BEGIN"
+    " INSERT INTO parts_fts(rowid, name, part_number)"
+    " VALUES (new.id, new.name, new.part_number); END",
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_delete AFTER DELETE ON parts BEGIN"
+    " INSERT INTO parts_fts(parts_fts, rowid, name, part_number)"
+    " VALUES ('delete', old.id, old.name, old.part_number); END",
+    # Только при изменении индексируемых колонок (не при смене quantity)
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_update AFTER UPDATE OF name, part_number"
+    " ON parts BEGIN"
+    " INSERT INTO parts_fts(parts_fts, rowid, name, part_number)"
+    " VALUES ('delete', old.id, old.name, old.part_number);"
+    " INSERT INTO parts_fts(rowid, name, part_number)"
+    " VALUES (new.id, new.name, new.part_number); END",
+]
+
+# Триггеры удаляются вместе с таблицей parts, а виртуальная таблица — нет
+SQLITE_DROP_DDL: List[str] = ["DROP TABLE IF EXISTS parts_fts"]
+
+
+def install_search_ddl(table: Table) -> None:
+    """Подписывает DDL поиска на создание/удаление таблицы parts."""
+    for statement in POSTGRES_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_SEARCH_DDL:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in SQLITE_DROP_DDL:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
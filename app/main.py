@@ -2,30 +2,144 @@
 
 # ГЛАВНЫЙ ВХОД, ОБЩИЕ ЭНДПОИНТЫ
 
-from typing import Any, Dict
-
-from sqlalchemy.orm import Session
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any, AsyncIterator, Dict, Optional
 
 from app.api.parts import router as parts_router
-from app.db.database import get_db  # функция для получения сессии
-from app.db.models import PartDB  # модель таблицы parts
-from fastapi import Depends, FastAPI
+from app.core.config import get_settings  # настройки приложения
+from app.core.profiling import TimedJSONResponse  # JSON-ответ с замером кодирования
+from app.db.database import (  # асинхронный движок (создаётся лениво) и жизненный цикл пула
+    ReadYourWritesMiddleware,
+    dispose_engines,
+    get_async_engine,
+    get_async_read_engine,
+    get_replica_set,
+    replica_urls,
+    warm_up_pool,
+)
+from app.db.pool import pool_status  # состояние пула соединений
+from app.services.cache import get_part_cache  # кэш запчастей
+from app.services.events import (  # лента изменений (SSE / WebSocket)
+    close_on_exit_signal,
+    get_event_hub,
+    reset_event_hub,
+    restore_signal_handlers,
+)
+from app.services.ledger import compact_periodically  # компакция журнала остатков
+from app.services.repository import (  # хранилище запчастей
+    PartRepository,
+    get_repository,
+)
+from app.services.stats import StatsCache, get_stats_cache  # кэш сводки (и числа запчастей)
+from fastapi import APIRouter, Depends, FastAPI, status
+from fastapi.responses import JSONResponse
+
+# Настройки (.env и окружение) читаются не при импорте модуля, а при создании
+# приложения (create_app) и в lifespan: импорт app.main для инструментов,
+# скриптов и тестов конфигурацию не трогает.
+
+
+# 0. ЖИЗНЕННЫЙ ЦИКЛ ПРИЛОЖЕНИЯ (lifespan)
+# Код до yield выполняется при старте сервера, после yield — при остановке.
+# При запуске через serve.py lifespan выполняется в КАЖДОМ воркере.
+# Остановка (SIGTERM): uvicorn перестаёт принимать соединения, дожидается
+# начатых запросов (не дольше GRACEFUL_SHUTDOWN_TIMEOUT) и только потом
+# выполняет код после yield — пул закрывается, когда он уже никому не нужен.
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    if settings.parts_backend != "memory" and settings.db_pool_warmup > 0:
+        # Соединения открываются заранее, не дольше размера пула
+        await warm_up_pool(min(settings.db_pool_warmup, settings.db_pool_size))
+
+    # Лента изменений: по SIGTERM закрываем подписки сразу, иначе открытые
+    # потоки событий держали бы остановку весь GRACEFUL_SHUTDOWN_TIMEOUT
+    signal_handlers = close_on_exit_signal(get_event_hub())
+
+    background = []
+    replicas = get_replica_set()
+    if replicas is not None:
+        # Первая проверка — до приёма запросов: иначе GET шли бы на основной,
+        # пока реплики не проверены; дальше — раз в DB_REPLICA_CHECK_INTERVAL
+        await replicas.check()
+        background.append(asyncio.create_task(replicas.monitor()))
+    if settings.ledger_compaction_interval > 0:
+        # Периодическая компакция журнала движений остатков (app/services/ledger.py)
+        background.append(
+            asyncio.create_task(
+                compact_periodically(
+                    settings.ledger_compaction_interval,
+                    timedelta(days=settings.ledger_retention_days),
+                )
+            )
+        )
+    yield
+    # Обработчики сигналов — прежние: следующий lifespan поставит свои
+    restore_signal_handlers(signal_handlers)
+    get_event_hub().close()
+    # Следующий lifespan в этом процессе (тесты, перезагрузка) — с новым хабом
+    reset_event_hub()
+    if settings.group_commit_enabled and settings.parts_backend != "memory":
+        from app.services.group_commit import get_group_commit_writer
+
+        # Запросы уже завершены: фиксируем пачку, если она ещё собирается
+        await get_group_commit_writer().close()
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    # Закрываем соединения сами: иначе БД увидит оборванные сессии
+    await dispose_engines()
+
+
+# Общие эндпоинты (GET /, GET /health) — отдельный роутер: приложение создаётся
+# функцией create_app(), а не при импорте
+router = APIRouter()
+
 
 # 1. СОЗДАНИЕ ПРИЛОЖЕНИЯ FASTAPI
-app = FastAPI(title="Garage API", description="API для учета запчастей в гараже")
+def create_app() -> FastAPI:
+    """Приложение с роутерами; профилирование — по настройке PROFILING_ENABLED."""
+    settings = get_settings()
+    application = FastAPI(
+        title="Garage API",
+        description="API для учета запчастей в гараже",
+        default_response_class=TimedJSONResponse,
+        lifespan=lifespan,
+    )
+
+    # 2. ПОДКЛЮЧЕНИЕ РОУТЕРА С ЭНДПОИНТАМИ ДЛЯ ЗАПЧАСТЕЙ
+    application.include_router(parts_router)
 
-# 2. ПОДКЛЮЧЕНИЕ РОУТЕРА С ЭНДПОИНТАМИ ДЛЯ ЗАПЧАСТЕЙ
-app.include_router(parts_router)
+    # 2.1 ПРОФИЛИРОВАНИЕ (опционально, PROFILING_ENABLED=true):
+    # заголовок Server-Timing, GET /metrics для Prometheus, стеки медленных запросов
+    if settings.profiling_enabled:
+        from app.api.metrics import router as metrics_router
+        from app.core.profiling import install_profiling
+
+        # Слушатели SQL вешаются на класс Engine — движки, созданные позже, тоже замеряются
+        install_profiling(application, settings)
+        application.include_router(metrics_router)
+
+    # 2.2 РЕПЛИКИ ДЛЯ ЧТЕНИЯ: cookie read-your-writes в ответах на запись
+    if replica_urls():
+        application.add_middleware(ReadYourWritesMiddleware)
+
+    application.include_router(router)
+    return application
 
 
 # 3. КОРНЕВОЙ ЭНДПОИНТ (GET /)
-@app.get("/")
+@router.get("/")
 def read_root() -> Dict[str, Any]:
     """Основная страница API с информацией о доступных эндпоинтах"""
     return {
         "message": "Garage API работает!",
         "endpoints": {
             "parts_list": "/parts",
+            "inventory_stats": "/parts/stats",
+            "part_events": "/parts/events",
             "health_check": "/health",
             "docs": "/docs",
         },
@@ -33,21 +147,81 @@ def read_root() -> Dict[str, Any]:
 
 
 # 4. ЭНДПОИНТ ПРОВЕРКИ ЗДОРОВЬЯ (GET /health)
-# Теперь получаем количество запчастей напрямую из базы данных
-@app.get("/health")
-def health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
+# Мониторинг опрашивает /health каждые несколько секунд. Раньше каждая проверка
+# считала COUNT(*) по всей таблице — полный проход на больших складах.
+# Теперь: связь с хранилищем — дешёвый SELECT 1, а число запчастей — из кэша
+# сводки (app/services/stats.py): COUNT(*) не чаще раза в STATS_CACHE_TTL.
+@router.get("/health")
+async def health_check(
+    repo: PartRepository = Depends(get_repository),
+    stats: StatsCache = Depends(get_stats_cache),
+) -> Dict[str, Any]:
     """Проверка состояния сервиса (используется системами мониторинга)"""
-    total_parts = db.query(PartDB).count()  # считаем записи в таблице parts
-    return {
+    try:
+        await repo.ping()
+    except Exception as error:  # noqa: BLE001 — любая ошибка связи = «не готов»
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "UNAVAILABLE",
+                "error": type(error).__name__,
+                "service": "garage-api",
+            },
+        )
+    result = {
         "status": "OK",
-        "total_parts": total_parts,
+        "total_parts": await stats.part_count(repo),
         "service": "garage-api",
         "version": "0.1.0",
+        # Кэш запчастей: попадания/промахи/вытеснения — по ним подбирают размер и TTL
+        "part_cache": get_part_cache().info(),
+        # Кэш сводки по складу: попадания и пересчёты
+        "stats_cache": stats.info(),
+        # Лента изменений: подписчики, опубликованные события, переполнения очередей
+        "events": get_event_hub().info(),
     }
+    settings = get_settings()
+    if settings.parts_backend != "memory":
+        # Пул соединений: сколько занято, overflow, сколько запросы ждут соединение.
+        # Хранилище в памяти БД не использует — движок ради /health не создаём
+        result["db_pool"] = pool_status(get_async_engine().pool)
+        if get_async_read_engine() is not get_async_engine():
+            # SQLITE_SINGLE_WRITER: в db_pool — писатель, здесь — пул читателей
+            result["db_read_pool"] = pool_status(get_async_read_engine().pool)
+        if get_replica_set() is not None:
+            # Реплики: живые ли, отставание, сколько чтений ушло на основной (fallbacks)
+            result["db_replicas"] = get_replica_set().info()
+    if settings.group_commit_enabled and settings.parts_backend != "memory":
+        from app.services.group_commit import get_group_commit_writer
+
+        # Групповой коммит: размер пачек и время COMMIT
+        result["group_commit"] = get_group_commit_writer().info()
+    return result
+
+
+# ----------------------------------------------------------------------
+# ПРИЛОЖЕНИЕ app.main:app (создаётся при первом обращении, PEP 562)
+# ----------------------------------------------------------------------
+# uvicorn ("app.main:app"), serve.py и `from app.main import app` получают один
+# и тот же экземпляр; сам импорт модуля приложение не создаёт.
+_app: Optional[FastAPI] = None
+
+
+def get_app() -> FastAPI:
+    global _app
+    if _app is None:
+        _app = create_app()
+    return _app
+
+
+def __getattr__(name: str) -> Any:
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-# 5. ЗАПУСК СЕРВЕРА (при прямом запуске файла)
+# 5. ЗАПУСК СЕРВЕРА (при прямом запуске файла; для продакшена — python serve.py)
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(get_app(), host="0.0.0.0", port=8000)
@@ -5,15 +5,17 @@ from alembic import context
 from sqlalchemy import engine_from_config, pool
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from app.db.database import DATABASE_URL
+from app.core.config import get_settings
 from app.db.models import Base
+from app.db.search import FTS_TABLE, SEARCH_INDEXES, SEARCH_VECTOR_COLUMN
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
 # Переопределяем URL из переменной окружения
-config.set_main_option("sqlalchemy.url", DATABASE_URL)  # <-- добавить
+# (движки приложения из app/db/database.py не создаются: миграциям хватает своего)
+config.set_main_option("sqlalchemy.url", get_settings().database_url)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -21,6 +23,21 @@ config.set_main_option("sqlalchemy.url", DATABASE_URL)  # <-- добавить
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Объекты полнотекстового поиска (app/db/search.py) создаются не моделями,
+    а DDL и миграцией c4f2a9e7d1b3 — autogenerate не должен предлагать их удалить.
+    """
+    if type_ == "table" and name.startswith(FTS_TABLE):
+        return False  # parts_fts и служебные parts_fts_data, parts_fts_idx, ...
+    if type_ == "column" and name == SEARCH_VECTOR_COLUMN:
+        return False
+    if type_ == "index" and name in SEARCH_INDEXES:
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -44,6 +61,7 @@ def run_migrations_offline() -> None:
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_object=include_object,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -65,7 +83,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,86 @@
+"""add part search
+
+Revision ID: c4f2a9e7d1b3
+Revises: b7e41c2d9a10
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f2a9e7d1b3'
+down_revision: Union[str, Sequence[str], None] = 'b7e41c2d9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# DDL скопирован из app/db/search.py на момент миграции: миграция не должна
+# меняться вместе с кодом приложения
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE parts ADD COLUMN IF NOT EXISTS search_vector tsvector"
+    " GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(part_number, '')), 'A')"
+    " || setweight(to_tsvector('russian', coalesce(name, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_parts_search_vector ON parts USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_parts_name_trgm ON parts USING GIN (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_parts_part_number_pattern"
+    " ON parts (part_number text_pattern_ops)",
+]
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_parts_part_number_pattern",
+    "DROP INDEX IF EXISTS ix_parts_name_trgm",
+    "DROP INDEX IF EXISTS ix_parts_search_vector",
+    "ALTER TABLE parts DROP COLUMN IF EXISTS search_vector",
+    # расширение pg_trgm не удаляем: им могут пользоваться другие таблицы
+]
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts USING fts5("
+    "name, part_number, content='parts', content_rowid='id',"
+    " tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_insert AFTER INSERT ON parts BEGIN"
+    " INSERT INTO parts_fts(rowid, name, part_number)"
+    " VALUES (new.id, new.name, new.part_number); END",
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_delete AFTER DELETE ON parts BEGIN"
+    " INSERT INTO parts_fts(parts_fts, rowid, name, part_number)"
+    " VALUES ('delete', old.id, old.name, old.part_number); END",
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_update AFTER UPDATE OF name, part_number"
+    " ON parts BEGIN"
+    " INSERT INTO parts_fts(parts_fts, rowid, name, part_number)"
+    " VALUES ('delete', old.id, old.name, old.part_number);"
+    " INSERT INTO parts_fts(rowid, name, part_number)"
+    " VALUES (new.id, new.name, new.part_number); END",
+    # Индексируем строки, которые уже есть в parts
+    "INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')",
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS parts_fts_update",
+    "DROP TRIGGER IF EXISTS parts_fts_delete",
+    "DROP TRIGGER IF EXISTS parts_fts_insert",
+    "DROP TABLE IF EXISTS parts_fts",
+]
+
+
+def _statements(postgres: list, sqlite: list) -> list:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgres
+    if dialect == "sqlite":
+        return sqlite
+    return []  # другие СУБД не поддерживаются приложением
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in _statements(POSTGRES_UPGRADE, SQLITE_UPGRADE):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for statement in _statements(POSTGRES_DOWNGRADE, SQLITE_DOWNGRADE):
+        op.execute(statement)
@@ -0,0 +1,52 @@
+"""add stock movements
+
+Revision ID: d8e3b5c6a4f2
+Revises: c4f2a9e7d1b3
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e3b5c6a4f2'
+down_revision: Union[str, Sequence[str], None] = 'c4f2a9e7d1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stock_movements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        # без FOREIGN KEY: история остаётся после удаления запчасти
+        sa.Column('part_id', sa.Integer(), nullable=False),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('quantity_after', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_stock_movements_part_id_id', 'stock_movements', ['part_id', 'id'], unique=False
+    )
+    # Остатки, накопленные до появления журнала, — начальным снимком:
+    # сумма delta по запчасти сразу равна её quantity
+    op.execute(
+        sa.text(
+            "INSERT INTO stock_movements (part_id, delta, quantity_after, kind, created_at)"
+            " SELECT id, coalesce(quantity, 0), coalesce(quantity, 0), 'snapshot', :now"
+            " FROM parts ORDER BY id"
+        ).bindparams(now=datetime.now(timezone.utc).replace(tzinfo=None))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_movements_part_id_id', table_name='stock_movements')
+    op.drop_table('stock_movements')
@@ -0,0 +1,29 @@
+"""add part quantity index
+
+Revision ID: e5b7c9d1f3a8
+Revises: d8e3b5c6a4f2
+Create Date: 2026-10-18 17:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7c9d1f3a8'
+down_revision: Union[str, Sequence[str], None] = 'd8e3b5c6a4f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Список заканчивающихся запчастей (GET /parts/stats): WHERE quantity <= :порог
+    # читает по индексу несколько строк, а не всю таблицу
+    op.create_index(op.f('ix_parts_quantity'), 'parts', ['quantity'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_parts_quantity'), table_name='parts')
@@ -0,0 +1,79 @@
+"""parts autoincrement
+
+Revision ID: f2c4e6a8b0d1
+Revises: e5b7c9d1f3a8
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c4e6a8b0d1'
+down_revision: Union[str, Sequence[str], None] = 'e5b7c9d1f3a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# В SQLite INTEGER PRIMARY KEY без AUTOINCREMENT выдаёт max(id) + 1: после
+# удаления запчасти с наибольшим id новая получает тот же id — и тот же ETag
+# "<id>-1", что был у удалённой (304 и If-Match проходили бы для чужой строки).
+# С AUTOINCREMENT id не повторяются никогда (счётчик в sqlite_sequence).
+# В PostgreSQL id выдаёт последовательность, она и так не возвращается назад.
+# Добавить AUTOINCREMENT к таблице SQLite можно только пересозданием (batch).
+
+# Триггеры полнотекстового поиска удаляются вместе со старой таблицей —
+# создаём их заново (DDL скопирован из миграции c4f2a9e7d1b3)
+SQLITE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_insert AFTER INSERT ON parts BEGIN"
+    " INSERT INTO parts_fts(rowid, name, part_number)"
+    " VALUES (new.id, new.name, new.part_number); END",
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_delete AFTER DELETE ON parts BEGIN"
+    " INSERT INTO parts_fts(parts_fts, rowid, name, part_number)"
+    " VALUES ('delete', old.id, old.name, old.part_number); END",
+    "CREATE TRIGGER IF NOT EXISTS parts_fts_update AFTER UPDATE OF name, part_number"
+    " ON parts BEGIN"
+    " INSERT INTO parts_fts(parts_fts, rowid, name, part_number)"
+    " VALUES ('delete', old.id, old.name, old.part_number);"
+    " INSERT INTO parts_fts(rowid, name, part_number)"
+    " VALUES (new.id, new.name, new.part_number); END",
+    "INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')",
+]
+
+
+# Счётчик AUTOINCREMENT после пересоздания — max(id) из parts. Запчасти,
+# удалённые ДО миграции, остались только в журнале движений (stock_movements
+# без FOREIGN KEY): их id поднимаем в счётчик, иначе новая запчасть получила бы
+# и id, и историю удалённой (GET /parts/{id}/movements)
+SQLITE_SEED_SEQUENCE = [
+    "DELETE FROM sqlite_sequence WHERE name = 'parts'",
+    "INSERT INTO sqlite_sequence (name, seq) SELECT 'parts', MAX("
+    " COALESCE((SELECT MAX(id) FROM parts), 0),"
+    " COALESCE((SELECT MAX(part_id) FROM stock_movements), 0))",
+]
+
+
+def _rebuild_parts(autoincrement: bool) -> None:
+    with op.batch_alter_table(
+        'parts', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}
+    ):
+        pass
+    for statement in SQLITE_FTS_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild_parts(autoincrement=True)
+    for statement in SQLITE_SEED_SEQUENCE:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild_parts(autoincrement=False)
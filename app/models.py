@@ -1,19 +1,54 @@
 # 2025.12.11 17:34 IMM
 
+from typing import Optional
+
+
 # КЛАСС Part (МОДЕЛЬ ДАННЫХ)
 class Part:
+    # __slots__ — фиксированный список атрибутов объекта.
+    # Без него каждый объект хранит свои поля в отдельном словаре __dict__
+    # (~100+ байт сверху на объект). Со __slots__ поля лежат в компактном массиве
+    # внутри объекта: на сотнях тысяч запчастей это заметная экономия памяти,
+    # а доступ к атрибутам ещё и немного быстрее. Плата — нельзя добавить
+    # атрибут, которого нет в списке (part.color = ... вызовет AttributeError).
+    __slots__ = (
+        "id",
+        "name",
+        "part_number",
+        "quantity",
+        "storage_location",
+        "price",
+        "version",
+    )
+
     # Метод __init__ (дАндер-инИт) - это конструктор объекта. Вызывается
     # при создании нового экземпляра класса (новой запчасти).
     # 'self' - это ссылка на текущий экземпляр объекта (аналогично
     # 'this' в C#). Все методы класса первым аргументом принимают self.
     # id: int, name: str - это аннотации типов (type hints). Python их игнорирует при
     # выполнении, но они помогают разработчикам и IDE понимать, какие типы данных ожидаются.
-    def __init__(self, id: int, name: str, part_number: str, quantity: int):
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        part_number: str,
+        quantity: int,
+        storage_location: Optional[str] = None,  # необязательные поля — как в таблице parts
+        price: Optional[float] = None,
+        version: int = 1,
+    ):
         # Создаем атрибуты (поля) объекта и присваиваем им значения, переданные в конструктор.
         self.id = id  # Уникальный идентификатор запчасти
         self.name = name  # Название запчасти (например, "Масляный фильтр")
         self.part_number = part_number  # Каталожный номер
         self.quantity = quantity  # Количество на складе
+        self.storage_location = storage_location  # Место хранения
+        self.price = price  # Цена
+        self.version = version  # Версия (растёт при каждом изменении, как в БД)
+
+    # Словарь полей — в том же виде, что PartDB.to_dict() для запчасти из БД
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
 
     # Магический метод __str__ (# дАндер-стр). Определяет, как объект будет преобразован в строку
     # при вызове str(part) или print(part). Аналогично переопределению метода ToString() в C#.
@@ -6,15 +6,20 @@
 # Это как // в C#.
 
 # 2️⃣ ИМПОРТЫ (КЛЮЧЕВОЕ СЛОВО from...import)
-from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 
 # from = "из" (англ.)
 # pydantic = название библиотеки, которую мы установили через pip
 # import = "импортировать" (англ.)
 # BaseModel = базовый класс Pydantic, от которого наследуются все схемы
 # Field = класс для добавления дополнительных правил к полям
+# TypeAdapter = валидация и сериализация произвольного типа (см. конец файла)
 # Запятая между BaseModel и Field = перечисление того, что мы импортируем
-# Вся строка = "из библиотеки pydantic импортируй классы BaseModel и Field"
+# Вся строка = "из библиотеки pydantic импортируй классы BaseModel, Field и TypeAdapter"
+# typing.List / Optional = аннотации «список» и «значение или None»
 
 
 # 3️⃣ ОПРЕДЕЛЕНИЕ КЛАССА (class)
@@ -100,6 +105,16 @@ class PartResponse(PartBase):
     id: int  # Добавляем новое поле - ID запчасти
     # Тип int, без Field() - значит только базовая проверка типа
 
+    # Остальные колонки таблицы parts — ответ содержит запчасть целиком
+    # Optional[str] = строка или None (в БД колонка может быть пустой)
+    storage_location: Optional[str] = None
+    price: Optional[float] = None
+    version: int = 1  # версия строки (из неё строится ETag)
+
+    # Количество в ответе может быть 0 (всё выдали со склада), поэтому
+    # переопределяем поле без ограничения gt=0 из PartBase
+    quantity: int = Field(default=1, ge=0, description="Количество на складе")
+
     # 8️⃣ ВЛОЖЕННЫЙ КЛАСС Config
     class Config:
         # Вложенный класс с именем Config
@@ -114,3 +129,156 @@ class PartResponse(PartBase):
 
         # Если бы было False или параметр отсутствовал,
         # пришлось бы вручную преобразовывать ORM-объекты в словари
+
+
+# 7️⃣.1 ЧАСТИЧНОЕ ОБНОВЛЕНИЕ (PATCH)
+class PartUpdate(BaseModel):
+    """
+    Схема для PATCH: все поля необязательные, меняются только переданные.
+    Какие поля клиент передал, Pydantic помнит в model_fields_set —
+    их отдаёт model_dump(exclude_unset=True).
+    """
+
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    part_number: Optional[str] = Field(None, pattern=r"^[A-Z]{3}-\d{3}$")
+    # 0 допустим: инвентаризация может показать, что запчастей не осталось
+    quantity: Optional[int] = Field(None, ge=0)
+    storage_location: Optional[str] = None  # null — очистить место хранения
+    price: Optional[float] = Field(None, ge=0)  # null — очистить цену
+
+    @model_validator(mode="after")
+    def required_columns_not_null(self) -> "PartUpdate":
+        # В таблице эти колонки обязательные: их можно изменить, но не обнулить
+        for field in ("name", "part_number", "quantity"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"Поле {field} не может быть null")
+        return self
+
+
+# 9️⃣ СТРАНИЦА СПИСКА И БЫСТРАЯ СЕРИАЛИЗАЦИЯ
+class PartPage(BaseModel):
+    """Ответ GET /parts: страница запчастей (keyset-пагинация)"""
+
+    total: Optional[int] = None  # None — количество не считали
+    parts: List[PartResponse]
+    next_after: Optional[int] = None  # id для запроса следующей страницы
+
+
+class PartSearchResults(BaseModel):
+    """Ответ GET /parts/search: найденные запчасти, самые подходящие — первыми"""
+
+    query: str
+    parts: List[PartResponse]
+
+
+# 9️⃣.1 ПОИСК МНОГИХ ЗАПЧАСТЕЙ СРАЗУ (POST /parts/lookup)
+MAX_LOOKUP_KEYS = 1000  # ids + part_numbers в одном запросе
+
+
+class PartLookup(BaseModel):
+    """Запчасти по списку ID и/или каталожных номеров — одним запросом к БД"""
+
+    ids: List[int] = Field(default_factory=list, description="ID запчастей")
+    part_numbers: List[str] = Field(default_factory=list, description="Каталожные номера")
+
+    @model_validator(mode="after")
+    def keys_within_limit(self) -> "PartLookup":
+        keys = len(self.ids) + len(self.part_numbers)
+        if keys == 0:
+            raise ValueError("Нужен хотя бы один ID или каталожный номер")
+        if keys > MAX_LOOKUP_KEYS:
+            raise ValueError(f"Не больше {MAX_LOOKUP_KEYS} ключей в одном запросе")
+        return self
+
+
+class PartLookupResults(BaseModel):
+    """Ответ POST /parts/lookup: найденные запчасти в порядке запроса и ненайденные ключи"""
+
+    parts: List[PartResponse]
+    missing_ids: List[int]
+    missing_part_numbers: List[str]
+
+
+# 🔟 ИЗМЕНЕНИЕ ОСТАТКА (POST /parts/{part_id}/stock и POST /parts/stock)
+class StockAdjustment(BaseModel):
+    """Приход (delta > 0) или списание (delta < 0) одной запчасти"""
+
+    delta: int = Field(..., description="На сколько изменить количество: +5 приход, -2 списание")
+
+
+class StockBatchItem(StockAdjustment):
+    """Строка пакетного изменения остатков"""
+
+    part_id: int = Field(..., ge=1, description="ID запчасти")
+
+
+class StockBatch(BaseModel):
+    """Пакет изменений остатков: применяются все или ни одного"""
+
+    items: List[StockBatchItem] = Field(..., min_length=1, max_length=1000)
+
+
+# 1️⃣1️⃣ ЖУРНАЛ ДВИЖЕНИЙ ОСТАТКОВ (GET /parts/{part_id}/movements)
+class StockMovement(BaseModel):
+    """Одно изменение остатка (строка таблицы stock_movements)"""
+
+    id: int
+    part_id: int
+    delta: int  # +приход / -списание
+    quantity_after: int  # остаток после движения
+    kind: str  # create, update, adjust, import, delete, snapshot
+    created_at: datetime  # UTC
+
+
+class StockMovementPage(BaseModel):
+    """Страница истории остатка: от новых движений к старым"""
+
+    movements: List[StockMovement]
+    next_before: Optional[int] = None  # id для запроса следующей (более старой) страницы
+
+
+# 1️⃣2️⃣ СВОДКА ПО СКЛАДУ (GET /parts/stats)
+class StockTotals(BaseModel):
+    """Итоги: по всему складу или по одному месту хранения"""
+
+    part_count: int  # сколько разных запчастей
+    total_quantity: int  # сколько штук всего
+    priced_parts: int  # у скольких указана цена
+    stock_value: float  # стоимость: сумма price * quantity (без запчастей без цены)
+
+
+class LocationStats(StockTotals):
+    """Итоги по одному месту хранения"""
+
+    storage_location: Optional[str] = None  # None — место не указано
+    value_share: Optional[float] = None  # доля в стоимости склада (0..1)
+
+
+class LowStock(BaseModel):
+    """Заканчивающиеся запчасти: quantity <= threshold"""
+
+    threshold: int
+    per_location: int  # не больше стольких на одно место хранения
+    parts: List[PartResponse]
+
+
+class InventoryStats(BaseModel):
+    """Ответ GET /parts/stats"""
+
+    summary: StockTotals
+    locations: List[LocationStats]  # самые «дорогие» места хранения — первыми
+    low_stock: LowStock
+    computed_at: datetime  # когда БД посчитала сводку (UTC); дальше её поправляют записи
+
+
+# TypeAdapter — валидатор/сериализатор Pydantic для любого типа (не только модели).
+# dump_json() пишет JSON сразу в bytes на Rust (pydantic-core), минуя
+# промежуточные словари jsonable_encoder и json.dumps.
+# Создаётся один раз: построение схемы валидации — дорогая операция.
+PART_PAGE_ADAPTER = TypeAdapter(PartPage)
+PART_LIST_ADAPTER = TypeAdapter(List[PartResponse])
+PART_SEARCH_ADAPTER = TypeAdapter(PartSearchResults)
+MOVEMENT_PAGE_ADAPTER = TypeAdapter(StockMovementPage)
+INVENTORY_STATS_ADAPTER = TypeAdapter(InventoryStats)
+PART_LOOKUP_ADAPTER = TypeAdapter(PartLookupResults)
+
@@ -0,0 +1,365 @@
+"""
+КЭШ ЗАПЧАСТЕЙ (READ-THROUGH)
+
+Назначение: терминалы цеха постоянно опрашивают одни и те же ID, а меняются
+запчасти редко. Чтобы не ходить в БД за каждым GET /parts/{part_id},
+прочитанная запчасть кладётся в кэш, а при изменении — удаляется из него.
+
+Составные части:
+1. CacheBackend - интерфейс хранилища (get/set/delete)
+2. LRUCache - кэш в памяти процесса: ограниченный размер (LRU) + TTL
+3. RedisCache - общий кэш для нескольких процессов/серверов (нужен пакет redis)
+4. PartCache - обёртка для запчастей: ключи по id и по part_number, инвалидация
+
+ГОНКА ЧТЕНИЯ С ЗАПИСЬЮ
+Читатель при промахе идёт в БД и кладёт результат в кэш. Если между его
+SELECT и put параллельная запись успела зафиксироваться и вызвать invalidate,
+put вернул бы в кэш старую строку — до конца TTL. Поэтому у каждой запчасти
+есть «поколение» (ключ part:gen:<id>): invalidate записывает новое, читатель
+запоминает его до похода в БД (generation()), а put кладёт строку, только если
+поколение с тех пор не сменилось (проверка и запись — атомарно, set_if).
+5. get_part_cache() - зависимость FastAPI. В тестах её можно подменить
+   через app.dependency_overrides (например, на PartCache(LRUCache(...))).
+"""
+
+import json
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+
+
+class CacheStats:
+    """Счётчики кэша — по ним подбирают размер и TTL."""
+
+    def __init__(self) -> None:
+        self.hits = 0  # нашли в кэше
+        self.misses = 0  # не нашли (или запись устарела)
+        self.evictions = 0  # вытеснены из-за ограничения размера
+        self.expirations = 0  # удалены из-за истечения TTL
+        self.invalidations = 0  # удалены при изменении запчасти
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# ----------------------------------------------------------------------
+# 1. ИНТЕРФЕЙС ХРАНИЛИЩА
+# ----------------------------------------------------------------------
+class CacheBackend(ABC):
+    """
+    Хранилище «ключ → JSON-совместимое значение».
+    Методы асинхронные, чтобы сетевой бэкенд (Redis) не блокировал event loop.
+    """
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    @abstractmethod
+    async def peek(self, key: str) -> Optional[Any]:
+        """Значение без учёта в счётчиках hits/misses (служебные ключи)."""
+
+    @abstractmethod
+    async def set_if(self, key: str, value: Any, guard_key: str, guard: Optional[Any]) -> bool:
+        """
+        set(key, value), только если guard_key сейчас равен guard (None — ключа
+        нет). Проверка и запись атомарны. True — значение записано.
+        """
+
+    def info(self) -> Dict[str, Any]:
+        """Описание бэкенда и счётчики — для /health."""
+        return {"backend": type(self).__name__, **self.stats.as_dict()}
+
+
+# ----------------------------------------------------------------------
+# 2. LRU + TTL В ПАМЯТИ ПРОЦЕССА
+# ----------------------------------------------------------------------
+class LRUCache(CacheBackend):
+    """
+    OrderedDict хранит ключи в порядке использования:
+    при чтении ключ переносится в конец, при переполнении удаляется первый
+    (давно не использованный). Все операции — O(1).
+    Кэш живёт в одном процессе и используется из одного event loop,
+    поэтому блокировки не нужны.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 60.0) -> None:
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl  # секунд жизни записи (0 — без ограничения)
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        #                              └── (момент истечения, значение)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if self.ttl and expires_at < time.monotonic():
+            del self._data[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._data.move_to_end(key)  # отмечаем как недавно использованный
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)  # выкидываем самый старый
+            self.stats.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            if self._data.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+    async def peek(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None or (self.ttl and entry[0] < time.monotonic()):
+            return None
+        return entry[1]
+
+    async def set_if(self, key: str, value: Any, guard_key: str, guard: Optional[Any]) -> bool:
+        # Между проверкой и записью нет await — в одном event loop это атомарно
+        if await self.peek(guard_key) != guard:
+            return False
+        await self.set(key, value)
+        return True
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            **super().info(),
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_s": self.ttl,
+        }
+
+
+# ----------------------------------------------------------------------
+# 3. ОБЩИЙ КЭШ В REDIS (опционально)
+# ----------------------------------------------------------------------
+class RedisCache(CacheBackend):
+    """
+    Общий кэш для нескольких воркеров/серверов: инвалидация в одном процессе
+    видна всем остальным. Вытеснение по памяти делает сам Redis (maxmemory-policy),
+    поэтому evictions здесь не считаются.
+    """
+
+    # set_if: проверка и запись одним скриптом — между ними не вклинится
+    # invalidate другого процесса
+    SET_IF_SCRIPT = """
+    if (redis.call('GET', KEYS[2]) or '') ~= ARGV[2] then
+        return 0
+    end
+    if ARGV[3] == '0' then
+        redis.call('SET', KEYS[1], ARGV[1])
+    else
+        redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+    end
+    return 1
+    """
+
+    def __init__(self, url: str, ttl: float = 60.0, prefix: str = "garage:") -> None:
+        super().__init__()
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as error:
+            raise RuntimeError(
+                "Для PART_CACHE_BACKEND=redis установите пакет redis: pip install redis"
+            ) from error
+        self._redis = redis_asyncio.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self.prefix + key)
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._redis.set(
+            self.prefix + key,
+            json.dumps(value, ensure_ascii=False),
+            ex=int(self.ttl) or None,
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            self.stats.invalidations += await self._redis.delete(
+                *(self.prefix + key for key in keys)
+            )
+
+    async def clear(self) -> None:
+        async for key in self._redis.scan_iter(match=self.prefix + "*"):
+            await self._redis.delete(key)
+
+    async def peek(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set_if(self, key: str, value: Any, guard_key: str, guard: Optional[Any]) -> bool:
+        written = await self._redis.eval(
+            self.SET_IF_SCRIPT,
+            2,
+            self.prefix + key,
+            self.prefix + guard_key,
+            json.dumps(value, ensure_ascii=False),
+            "" if guard is None else json.dumps(guard, ensure_ascii=False),
+            str(int(self.ttl)),
+        )
+        return bool(written)
+
+
+class NullCache(CacheBackend):
+    """Кэш выключен: всегда промах. Удобно для отладки и сравнения."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+    async def peek(self, key: str) -> Optional[Any]:
+        return None
+
+    async def set_if(self, key: str, value: Any, guard_key: str, guard: Optional[Any]) -> bool:
+        return False
+
+
+# ----------------------------------------------------------------------
+# 4. КЭШ ЗАПЧАСТЕЙ
+# ----------------------------------------------------------------------
+class PartCache:
+    """
+    Запчасть хранится под ключом part:id:<id>, а part:pn:<part_number>
+    ссылается на её id. Так запчасть лежит в кэше один раз, а найти её
+    можно и по ID, и по каталожному номеру.
+    """
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    @staticmethod
+    def _id_key(part_id: int) -> str:
+        return f"part:id:{part_id}"
+
+    @staticmethod
+    def _pn_key(part_number: str) -> str:
+        return f"part:pn:{part_number}"
+
+    @staticmethod
+    def _generation_key(part_id: int) -> str:
+        return f"part:gen:{part_id}"
+
+    async def get_by_id(self, part_id: int) -> Optional[Dict[str, Any]]:
+        return await self.backend.get(self._id_key(part_id))
+
+    async def get_by_part_number(self, part_number: str) -> Optional[Dict[str, Any]]:
+        part_id = await self.backend.get(self._pn_key(part_number))
+        if part_id is None:
+            return None
+        part = await self.get_by_id(part_id)
+        # Ссылка могла устареть (номер запчасти сменили) — тогда это промах
+        if part is None or part.get("part_number") != part_number:
+            return None
+        return part
+
+    async def generation(self, part_id: int) -> Optional[str]:
+        """Поколение запчасти — запомнить ДО чтения из БД и передать в put()."""
+        return await self.backend.peek(self._generation_key(part_id))
+
+    async def put(self, part: Dict[str, Any], generation: Optional[str]) -> bool:
+        """
+        part — словарь полей запчасти (обязательно с id и part_number), прочитанный
+        после generation(). Если запчасть за это время изменили (invalidate),
+        строка устарела и в кэш не попадает — False.
+        """
+        stored = await self.backend.set_if(
+            self._id_key(part["id"]), part, self._generation_key(part["id"]), generation
+        )
+        if stored and part.get("part_number"):
+            await self.backend.set(self._pn_key(part["part_number"]), part["id"])
+        return stored
+
+    async def invalidate(
+        self, part_id: Optional[int] = None, *part_numbers: Optional[str]
+    ) -> None:
+        """
+        Удаляет запчасть из кэша. Ссылку со старого part_number (после смены
+        номера) удалять не обязательно: get_by_part_number её отбросит.
+        """
+        keys = [self._pn_key(number) for number in part_numbers if number]
+        if part_id is not None:
+            # Новое поколение — до удаления: put читателя, начавшего раньше, не пройдёт
+            await self.backend.set(self._generation_key(part_id), secrets.token_hex(8))
+            keys.append(self._id_key(part_id))
+        await self.backend.delete(*keys)
+
+    def info(self) -> Dict[str, Any]:
+        return self.backend.info()
+
+
+# ----------------------------------------------------------------------
+# 5. ЕДИНСТВЕННЫЙ ЭКЗЕМПЛЯР НА ПРОЦЕСС
+# ----------------------------------------------------------------------
+_part_cache: Optional[PartCache] = None
+
+
+def build_cache_backend() -> CacheBackend:
+    """Создаёт бэкенд по настройке PART_CACHE_BACKEND (memory | redis | none)."""
+    settings = get_settings()
+    if settings.part_cache_backend == "redis":
+        return RedisCache(settings.redis_url, ttl=settings.part_cache_ttl)
+    if settings.part_cache_backend == "none":
+        return NullCache()
+    return LRUCache(
+        max_size=settings.part_cache_max_size, ttl=settings.part_cache_ttl
+    )
+
+
+def get_part_cache() -> PartCache:
+    """Зависимость FastAPI: общий для всех запросов кэш запчастей."""
+    global _part_cache
+    if _part_cache is None:
+        _part_cache = PartCache(build_cache_backend())
+    return _part_cache
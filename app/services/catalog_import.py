@@ -0,0 +1,443 @@
+"""
+ЗАГРУЗКА КАТАЛОГА ПОСТАВЩИКА (scripts/import_parts.py)
+
+Назначение: каталог поставщика — сотни тысяч и миллионы строк. Через API
+(POST /parts/ по одной запчасти или POST /parts/bulk пачками) это миллионы
+HTTP-запросов или сотни транзакций. Здесь файл загружается напрямую в БД:
+
+1. Чтение потоком (read_rows): CSV (в том числе выгрузка из Excel: BOM,
+   разделитель «;», cp1251) или NDJSON. В памяти — только текущие пачки.
+2. Проверка схемой PartCreate (validate_chunk) — те же правила, что у API.
+   Пачки проверяются в пуле процессов (validated_chunks): разбор JSON и
+   валидация занимают CPU, а главный процесс в это время пишет в БД.
+   Отклонённые строки не мешают остальным и попадают в отчёт.
+3. Запись во временную таблицу import_parts (Staging):
+       PostgreSQL - COPY ... FROM STDIN (самый быстрый способ загрузки);
+       SQLite     - executemany в одной транзакции, PRAGMA synchronous=OFF
+                    (временная таблица — не сама база: сбой при загрузке
+                    ничего не портит, а слияние идёт обычной транзакцией).
+4. Слияние (Staging.merge) — несколько SQL-запросов в одной транзакции:
+       INSERT INTO parts ... SELECT ... ON CONFLICT (part_number) DO UPDATE
+   Если номер встречается в файле несколько раз, берётся последняя строка
+   (как у POST /parts/bulk). Запчасти без изменений не трогаются: версия
+   (ETag) сохраняется, триггеры поиска не срабатывают. Изменения остатков
+   пишутся в журнал движений (create / import) тем же INSERT ... SELECT.
+   На время слияния запись в parts другими блокируется (LOCK TABLE в
+   PostgreSQL, BEGIN IMMEDIATE в SQLite) — иначе delta в журнале могла бы
+   разойтись с остатком. Чтение не блокируется.
+
+Порядок вызова собран в import_catalog().
+
+Кэши работающего приложения о загрузке не знают: запчасти в кэше и сводка
+по складу обновятся по TTL (PART_CACHE_TTL, STATS_CACHE_TTL).
+"""
+
+import csv
+import io
+import json
+import operator
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.engine import Engine
+
+from app.core.clock import utc_now
+from app.schemas.part import PartCreate
+from app.services import ledger
+
+# Колонки, которые берутся из файла (поля PartCreate); остальные игнорируются
+FIELDS = tuple(PartCreate.model_fields)
+_field_values = operator.attrgetter(*FIELDS)  # PartCreate → (name, part_number, quantity)
+REQUIRED_FIELDS = tuple(
+    name for name, info in PartCreate.model_fields.items() if info.is_required()
+)
+FORMATS = ("csv", "ndjson")
+CHUNK_SIZE = 5000  # строк в одной пачке проверки и записи
+
+# Строка файла: (номер строки, сырое значение — список ячеек CSV или строка NDJSON)
+RawRow = Tuple[int, Any]
+# Проверенная строка: (номер строки, name, part_number, quantity)
+ValidRow = Tuple[Any, ...]
+
+
+@dataclass
+class ImportReport:
+    """Итог загрузки."""
+
+    rows: int = 0  # прочитано строк данных
+    valid: int = 0
+    rejected: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0  # запчасть уже была в точности такой
+    duplicates: int = 0  # строки, перекрытые более поздней строкой с тем же номером
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class CatalogImportError(ValueError):
+    """Файл нельзя загрузить целиком (нет обязательных колонок и т.п.)."""
+
+
+# ----------------------------------------------------------------------
+# 1. ЧТЕНИЕ ПОТОКОМ
+# ----------------------------------------------------------------------
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return "ndjson" if extension in (".ndjson", ".jsonl", ".json") else "csv"
+
+
+def read_rows(
+    stream: io.TextIOBase, file_format: str, delimiter: Optional[str] = None
+) -> Tuple[Optional[List[str]], Iterator[RawRow]]:
+    """
+    Заголовок CSV (для NDJSON — None) и строки файла по одной.
+    Разбор в главном процессе минимальный: csv.reader (на C) без DictReader,
+    а строки NDJSON отдаются как есть — json.loads выполняется в пуле процессов.
+    """
+    if file_format == "ndjson":
+        lines = (
+            (line_number, line)
+            for line_number, line in enumerate(stream, start=1)
+            if line.strip()
+        )
+        return None, lines
+
+    if delimiter is None:
+        # Excel с русской локалью сохраняет CSV с «;» — угадываем по началу файла
+        sample = stream.read(64 * 1024)
+        stream.seek(0)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+        except csv.Error:
+            delimiter = ","
+    reader = csv.reader(stream, delimiter=delimiter)
+    header = [name.strip() for name in next(reader, [])]
+    missing = [name for name in REQUIRED_FIELDS if name not in header]
+    if missing:
+        raise CatalogImportError(
+            f"В заголовке CSV нет колонок {', '.join(missing)} (есть: {', '.join(header)})"
+        )
+    return header, ((reader.line_num, row) for row in reader)
+
+
+def chunked(rows: Iterable[RawRow], size: int) -> Iterator[List[RawRow]]:
+    chunk: List[RawRow] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ----------------------------------------------------------------------
+# 2. ПРОВЕРКА (выполняется в процессах пула — функции уровня модуля)
+# ----------------------------------------------------------------------
+def validate_chunk(
+    chunk: List[RawRow], header: Optional[List[str]]
+) -> Tuple[List[ValidRow], List[Dict[str, Any]]]:
+    """
+    Пачка сырых строк → (проверенные строки, отклонённые с ошибками).
+    header — заголовок CSV; None — строки NDJSON.
+    """
+    # Из строки CSV берутся только колонки полей PartCreate
+    columns = [(name, header.index(name)) for name in FIELDS if name in header] if header else []
+    valid: List[ValidRow] = []
+    rejected: List[Dict[str, Any]] = []
+    for line_number, raw in chunk:
+        if header is not None:
+            # Пустая ячейка = значение не задано (quantity получит значение по умолчанию)
+            data = {
+                name: raw[index] for name, index in columns if index < len(raw) and raw[index]
+            }
+        else:
+            try:
+                data = json.loads(raw)
+            except ValueError as error:
+                rejected.append(_rejected(line_number, raw, [{"msg": str(error)}]))
+                continue
+            if not isinstance(data, dict):
+                rejected.append(_rejected(line_number, raw, [{"msg": "Ожидается объект"}]))
+                continue
+        try:
+            part = PartCreate.model_validate(data)
+        except ValidationError as error:
+            errors = error.errors(include_url=False, include_context=False, include_input=False)
+            row = dict(zip(header, raw)) if header is not None else raw
+            rejected.append(_rejected(line_number, row, errors))
+            continue
+        valid.append((line_number, *_field_values(part)))
+    return valid, rejected
+
+
+def _rejected(line_number: int, raw: Any, errors: List[Any]) -> Dict[str, Any]:
+    return {"line": line_number, "row": raw, "errors": errors}
+
+
+class _InlineExecutor(Executor):
+    """Проверка в текущем процессе (--workers 0 или одно ядро)."""
+
+    def submit(self, fn, *args, **kwargs):  # type: ignore[no-untyped-def]
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def validated_chunks(
+    chunks: Iterable[List[RawRow]], header: Optional[List[str]], workers: int
+) -> Iterator[Tuple[List[ValidRow], List[Dict[str, Any]]]]:
+    """
+    Результаты validate_chunk в порядке файла.
+    В работе не больше 2 × workers пачек: ProcessPoolExecutor.map сначала
+    прочитал бы весь файл в очередь заданий, а здесь чтение идёт не быстрее
+    проверки — память не зависит от размера файла.
+    """
+    executor: Executor = ProcessPoolExecutor(workers) if workers > 0 else _InlineExecutor()
+    in_flight: Deque[Future] = deque()
+    with executor:
+        for chunk in chunks:
+            in_flight.append(executor.submit(validate_chunk, chunk, header))
+            if len(in_flight) >= max(2 * workers, 1):
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+# ----------------------------------------------------------------------
+# 3–4. ВРЕМЕННАЯ ТАБЛИЦА И СЛИЯНИЕ
+# ----------------------------------------------------------------------
+# Последняя строка файла для каждого part_number и прежнее состояние запчасти
+MERGE_LATEST = """
+CREATE TEMPORARY TABLE import_latest AS
+SELECT i.line, i.name, i.part_number, i.quantity, p.id AS old_id,
+       p.name AS old_name, p.quantity AS old_quantity
+FROM import_parts i
+LEFT JOIN parts p ON p.part_number = i.part_number
+WHERE i.line IN (SELECT MAX(line) FROM import_parts GROUP BY part_number)
+"""
+
+MERGE_COUNTS = """
+SELECT
+    COUNT(*),
+    SUM(CASE WHEN old_id IS NULL THEN 1 ELSE 0 END),
+    SUM(CASE WHEN old_id IS NOT NULL AND (old_name <> name OR old_quantity IS NULL
+             OR old_quantity <> quantity) THEN 1 ELSE 0 END)
+FROM import_latest
+"""
+
+# WHERE true — SQLite иначе путает ON CONFLICT с условием JOIN в SELECT.
+# Неизменившиеся запчасти не обновляются: версия (ETag) остаётся прежней.
+MERGE_UPSERT = """
+INSERT INTO parts (name, part_number, quantity, version)
+SELECT name, part_number, quantity, 1 FROM import_latest WHERE true ORDER BY line
+ON CONFLICT (part_number) DO UPDATE
+SET name = excluded.name, quantity = excluded.quantity, version = parts.version + 1
+WHERE parts.name <> excluded.name OR parts.quantity IS NULL
+   OR parts.quantity <> excluded.quantity
+"""
+
+# Журнал движений: как у PartRepository.upsert_many — новая запчасть (create)
+# или изменившийся остаток (import), delta = новый остаток − прежний
+MERGE_MOVEMENTS = f"""
+INSERT INTO stock_movements (part_id, delta, quantity_after, kind, created_at)
+SELECT p.id, p.quantity - COALESCE(l.old_quantity, 0), p.quantity,
+       CASE WHEN l.old_id IS NULL THEN '{ledger.CREATE}' ELSE '{ledger.IMPORT}' END,
+       :created_at
+FROM import_latest l
+JOIN parts p ON p.part_number = l.part_number
+WHERE l.old_id IS NULL OR COALESCE(l.old_quantity, 0) <> p.quantity
+ORDER BY l.line
+"""
+
+
+class Staging(ABC):
+    """
+    Временная таблица import_parts на отдельном соединении DB-API
+    (COPY и executemany — возможности драйвера, а не SQLAlchemy).
+    load() вызывается на каждую пачку, merge() — один раз в конце.
+    """
+
+    CREATE = (
+        "CREATE TEMPORARY TABLE import_parts ("
+        "line INTEGER PRIMARY KEY, name TEXT NOT NULL,"
+        " part_number TEXT NOT NULL, quantity INTEGER NOT NULL)"
+    )
+    PARAMETER = ":{}"  # стиль параметров драйвера (paramstyle)
+
+    def __init__(self, engine: Engine) -> None:
+        self.connection = engine.raw_connection()
+        self.cursor = self.connection.cursor()
+
+    @staticmethod
+    def for_engine(engine: Engine) -> "Staging":
+        if engine.dialect.name == "postgresql":
+            return PostgresStaging(engine)
+        if engine.dialect.name == "sqlite":
+            return SqliteStaging(engine)
+        raise CatalogImportError(f"Загрузка в {engine.dialect.name} не поддерживается")
+
+    @abstractmethod
+    def load(self, rows: List[ValidRow]) -> None:
+        """Добавить пачку проверенных строк в import_parts."""
+
+    def merge(self, report: ImportReport) -> None:
+        """Слияние import_parts с parts одной транзакцией; счётчики — в report."""
+        self._begin_merge()
+        try:
+            self.cursor.execute(
+                "CREATE INDEX import_parts_part_number ON import_parts (part_number)"
+            )
+            self.cursor.execute(MERGE_LATEST)
+            self.cursor.execute(MERGE_COUNTS)
+            total, created, updated = (value or 0 for value in self.cursor.fetchone())
+            self.cursor.execute(MERGE_UPSERT)
+            self.cursor.execute(
+                MERGE_MOVEMENTS.replace(":created_at", self.PARAMETER.format("created_at")),
+                {"created_at": self._timestamp()},
+            )
+            self._commit()
+        except BaseException:
+            self._rollback()
+            raise
+        report.created, report.updated = created, updated
+        report.unchanged = total - created - updated
+        report.duplicates = report.valid - total
+
+    def close(self) -> None:
+        # Соединение закрывается, а не возвращается в пул: вместе с ним
+        # исчезают временные таблицы и PRAGMA загрузки
+        self.connection.invalidate()
+
+    @abstractmethod
+    def _begin_merge(self) -> None:
+        """Открыть транзакцию слияния (в SQLite — с блокировкой записи)."""
+
+    def _timestamp(self) -> Any:
+        return utc_now()
+
+    def _commit(self) -> None:
+        self.connection.commit()
+
+    def _rollback(self) -> None:
+        self.connection.rollback()
+
+
+class PostgresStaging(Staging):
+    """PostgreSQL (psycopg2): загрузка через COPY, всё — одна транзакция."""
+
+    PARAMETER = "%({})s"
+    COPY = "COPY import_parts (line, name, part_number, quantity) FROM STDIN WITH (FORMAT csv)"
+
+    def __init__(self, engine: Engine) -> None:
+        super().__init__(engine)
+        self.cursor.execute(self.CREATE + " ON COMMIT DROP")
+
+    def load(self, rows: List[ValidRow]) -> None:
+        # Пачка → CSV в памяти → один COPY: без разбора SQL и параметров на каждую строку
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        self.cursor.copy_expert(self.COPY, buffer)
+
+    def _begin_merge(self) -> None:
+        self.cursor.execute("ANALYZE import_parts")  # статистика для плана JOIN
+        # Другие записи в parts ждут конца слияния, чтение — нет
+        self.cursor.execute("LOCK TABLE parts IN SHARE ROW EXCLUSIVE MODE")
+
+
+class SqliteStaging(Staging):
+    """
+    SQLite: executemany во временную таблицу одной транзакцией,
+    слияние — отдельной транзакцией BEGIN IMMEDIATE.
+    """
+
+    # Только для соединения загрузки: без fsync на каждую запись, временные
+    # данные в памяти, большой кэш страниц. Сбой питания может потерять
+    # последнюю загрузку (в режиме WAL база при этом не портится) —
+    # загрузку тогда достаточно повторить.
+    PRAGMAS = (
+        "PRAGMA synchronous=OFF",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-262144",  # 256 МБ
+    )
+
+    def __init__(self, engine: Engine) -> None:
+        super().__init__(engine)
+        # Транзакции — явными BEGIN/COMMIT, а не неявными от модуля sqlite3
+        self.connection.driver_connection.isolation_level = None
+        for pragma in self.PRAGMAS:
+            self.cursor.execute(pragma)
+        self.cursor.execute(self.CREATE)
+        self.cursor.execute("BEGIN")
+
+    def load(self, rows: List[ValidRow]) -> None:
+        self.cursor.executemany("INSERT INTO import_parts VALUES (?, ?, ?, ?)", rows)
+
+    def _begin_merge(self) -> None:
+        self.cursor.execute("COMMIT")  # временная таблица загружена
+        # Блокировка записи берётся сразу, а не при первом INSERT: иначе чужая
+        # запись между чтением и записью оборвала бы слияние (SQLITE_BUSY)
+        self.cursor.execute("BEGIN IMMEDIATE")
+
+    def _timestamp(self) -> Any:
+        # Тот же текстовый формат, в котором SQLAlchemy хранит DateTime в SQLite
+        return utc_now().strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    def _commit(self) -> None:
+        self.cursor.execute("COMMIT")
+
+    def _rollback(self) -> None:
+        if self.connection.driver_connection.in_transaction:
+            self.cursor.execute("ROLLBACK")
+
+
+# ----------------------------------------------------------------------
+# ЗАГРУЗКА ЦЕЛИКОМ
+# ----------------------------------------------------------------------
+def import_catalog(
+    header: Optional[List[str]],
+    rows: Iterable[RawRow],
+    engine: Optional[Engine],
+    workers: int,
+    chunk_size: int = CHUNK_SIZE,
+    on_rejected: Callable[[Dict[str, Any]], None] = lambda rejected: None,
+    on_progress: Callable[[ImportReport], None] = lambda report: None,
+) -> ImportReport:
+    """
+    Чтение → проверка → временная таблица → слияние.
+    header и rows — результат read_rows().
+    engine=None — только проверка (ничего не пишется).
+    При ошибке во время загрузки или слияния в parts не попадает ничего.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    staging = Staging.for_engine(engine) if engine is not None else None
+    try:
+        for valid, rejected in validated_chunks(chunked(rows, chunk_size), header, workers):
+            report.rows += len(valid) + len(rejected)
+            report.valid += len(valid)
+            report.rejected += len(rejected)
+            for item in rejected:
+                on_rejected(item)
+            if staging is not None and valid:
+                staging.load(valid)
+            report.seconds = time.perf_counter() - started
+            on_progress(report)
+        if staging is not None:
+            staging.merge(report)
+    finally:
+        if staging is not None:
+            staging.close()
+    report.seconds = time.perf_counter() - started
+    return report
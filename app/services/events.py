@@ -0,0 +1,365 @@
+"""
+ЛЕНТА ИЗМЕНЕНИЙ ЗАПЧАСТЕЙ (GET /parts/events, WebSocket /parts/events/ws)
+
+Назначение: терминалы цеха опрашивали GET /parts каждые несколько секунд, чтобы
+заметить изменение остатков, — нагрузка росла с числом терминалов, даже когда
+ничего не менялось. Теперь терминал держит одно долгое соединение, а сервер сам
+присылает события, как только запись прошла:
+    part.created    - запчасть создана                  {"part": {...}}
+    part.updated    - PUT / PATCH                        {"part": {...}}
+    part.deleted    - запчасть удалена                   {"part": {... последнее состояние}}
+    stock.adjusted  - приход / списание                  {"part": {...}, "delta": -2}
+    parts.imported  - пачка POST /parts/bulk             {"parts": [{"id", "part_number", "status"}]}
+    reset           - пропущены события: перечитайте GET /parts  {"reason": "..."}
+
+Составные части:
+1. Event - событие; JSON и SSE-кадр кодируются один раз при публикации,
+   а не для каждого подписчика
+2. Subscription - очередь одного подписчика (ограниченного размера)
+3. EventHub - раздача событий подписчикам (fan-out) и кольцевой буфер для
+   досылки пропущенного
+4. get_event_hub() - зависимость FastAPI, один экземпляр на процесс
+   (reset_event_hub() — сброс после остановки приложения)
+
+МЕДЛЕННЫЙ ПОДПИСЧИК (EVENTS_OVERFLOW_POLICY)
+Публикация никогда не ждёт подписчиков: обработчик записи не должен тормозить
+из-за терминала на плохом Wi-Fi. Если очередь подписчика заполнена:
+    disconnect   - подписка закрывается (уже поставленные события ещё уходят);
+                   клиент переподключается с Last-Event-ID и получает пропущенное
+                   из кольцевого буфера (по умолчанию)
+    drop_oldest  - самое старое событие в очереди выбрасывается, а клиент
+                   получает reset (reason=overflow) и должен перечитать список
+
+ДОСЫЛКА ПО LAST-EVENT-ID
+id события — "<эпоха>-<номер>": эпоха случайная у каждого процесса. Клиент
+присылает id последнего полученного события (EventSource делает это сам в
+заголовке Last-Event-ID; WebSocket и первое подключение — параметр
+last_event_id). Если событие ещё в буфере — досылается всё, что после него.
+Если буфер уже ушёл дальше (reason=expired) или id от другого процесса
+(перезапуск, другой воркер — reason=restart) — приходит reset.
+
+⚠️ Хаб у каждого процесса свой: подписчик видит изменения, прошедшие через
+его воркер. При нескольких воркерах (serve.py) ленту нужно обслуживать одним
+процессом или вынести раздачу в общий брокер (Redis Pub/Sub и т.п.).
+"""
+
+import asyncio
+import secrets
+import signal
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, FrozenSet, List, Optional, Set
+
+from app.core.config import get_settings
+from app.core.responses import json_dumps
+
+# Типы событий
+PART_CREATED = "part.created"
+PART_UPDATED = "part.updated"
+PART_DELETED = "part.deleted"
+STOCK_ADJUSTED = "stock.adjusted"
+PARTS_IMPORTED = "parts.imported"
+RESET = "reset"
+EVENT_TYPES = (PART_CREATED, PART_UPDATED, PART_DELETED, STOCK_ADJUSTED, PARTS_IMPORTED)
+
+OVERFLOW_POLICIES = ("disconnect", "drop_oldest")
+
+
+# ----------------------------------------------------------------------
+# 1. СОБЫТИЕ
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class Event:
+    """Событие ленты, уже закодированное для WebSocket (text) и SSE (sse)."""
+
+    seq: int
+    id: str
+    type: str
+    text: str  # {"id": ..., "type": ..., "data": ...}
+    sse: bytes  # кадр text/event-stream: id / event / data
+
+    @classmethod
+    def encode(cls, seq: int, event_id: str, event_type: str, data: Any) -> "Event":
+        payload = json_dumps({"id": event_id, "type": event_type, "data": data})
+        sse = b"id: %s\nevent: %s\ndata: %s\n\n" % (
+            event_id.encode(),
+            event_type.encode(),
+            payload,
+        )
+        return cls(seq, event_id, event_type, payload.decode("utf-8"), sse)
+
+
+# ----------------------------------------------------------------------
+# 2. ПОДПИСЧИК
+# ----------------------------------------------------------------------
+class Subscription:
+    """
+    Очередь событий одного клиента. Хаб кладёт события без ожидания (_push),
+    обработчик соединения забирает их через next().
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        policy: str,
+        types: FrozenSet[str],
+        make_reset: Callable[[str, Optional[int]], Event],
+    ) -> None:
+        self.maxsize = maxsize
+        self.policy = policy
+        self.types = types  # пусто — все типы
+        self.closed = False
+        self.close_reason: Optional[str] = None  # overflow | shutdown
+        self.dropped = 0
+        self._events: Deque[Event] = deque()
+        self._lagged = False  # были выброшены события — перед следующим пойдёт reset
+        self._wakeup = asyncio.Event()
+        self._make_reset = make_reset  # reset с текущим номером события хаба
+
+    def wants(self, event: Event) -> bool:
+        return not self.types or event.type in self.types
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """
+        Следующее событие; None — за timeout секунд ничего не пришло
+        (пора отправить heartbeat) или подписка закрыта и очередь пуста.
+        """
+        if not self._events and not self.closed:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._lagged:
+            self._lagged = False
+            # id reset — перед первым оставшимся событием: порядок id не нарушается
+            return self._make_reset("overflow", self._events[0].seq - 1)
+        return self._events.popleft() if self._events else None
+
+    def close(self, reason: str) -> None:
+        if not self.closed:
+            self.closed, self.close_reason = True, reason
+            self._wakeup.set()
+
+    def _push(self, event: Event) -> None:
+        if self.closed or not self.wants(event):
+            return
+        if len(self._events) >= self.maxsize:
+            if self.policy == "drop_oldest":
+                self._events.popleft()
+                self.dropped += 1
+                self._lagged = True
+            else:
+                self.close("overflow")
+                return
+        self._events.append(event)
+        self._wakeup.set()
+
+
+# ----------------------------------------------------------------------
+# 3. ХАБ
+# ----------------------------------------------------------------------
+class EventHub:
+    """
+    Раздача событий подписчикам процесса. Всё работает в одном event loop,
+    поэтому publish и subscribe не требуют блокировок: между ними нет await.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int, overflow_policy: str) -> None:
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"EVENTS_OVERFLOW_POLICY={overflow_policy!r}: ожидается одно из {OVERFLOW_POLICIES}"
+            )
+        self.epoch = secrets.token_hex(4)
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.closed = False
+        self._seq = 0
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.overflows = 0  # подписки, закрытые из-за переполнения очереди
+
+    # ------------------------------------------------------------------
+    # Публикация (вызывается обработчиками после успешной записи)
+    # ------------------------------------------------------------------
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        self._seq += 1
+        event = Event.encode(self._seq, self._event_id(self._seq), event_type, data)
+        self._buffer.append(event)
+        self.published += 1
+        for subscription in list(self._subscribers):
+            subscription._push(event)
+            if subscription.close_reason == "overflow":
+                self.overflows += 1
+                self._subscribers.discard(subscription)
+        return event
+
+    def part_created(self, part: Dict[str, Any]) -> None:
+        self.publish(PART_CREATED, {"part": part})
+
+    def part_updated(self, part: Dict[str, Any]) -> None:
+        self.publish(PART_UPDATED, {"part": part})
+
+    def part_deleted(self, part: Dict[str, Any]) -> None:
+        self.publish(PART_DELETED, {"part": part})
+
+    def stock_adjusted(self, part: Dict[str, Any], delta: int) -> None:
+        """part — состояние после изменения, delta — на сколько изменилось количество."""
+        self.publish(STOCK_ADJUSTED, {"part": part, "delta": delta})
+
+    def parts_imported(self, results: List[Dict[str, Any]]) -> None:
+        """Одно событие на пачку POST /parts/bulk, а не на каждую из тысяч запчастей."""
+        self.publish(
+            PARTS_IMPORTED,
+            {
+                "parts": [
+                    {key: result[key] for key in ("id", "part_number", "status")}
+                    for result in results
+                ]
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # Подписка
+    # ------------------------------------------------------------------
+    def subscribe(
+        self, last_event_id: Optional[str] = None, types: FrozenSet[str] = frozenset()
+    ) -> Subscription:
+        """
+        Новая подписка. Если передан last_event_id, в её очередь сразу кладётся
+        всё пропущенное из буфера (или reset, если досылать нечем).
+        Досылка и подписка происходят без await между ними — события,
+        опубликованные в этот момент, не теряются и не дублируются.
+        """
+        subscription = Subscription(self.queue_size, self.overflow_policy, types, self._reset)
+        if self.closed:
+            subscription.close("shutdown")
+            return subscription
+
+        if last_event_id is not None:
+            seq = self._parse_event_id(last_event_id)
+            oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+            if seq is None or seq > self._seq:
+                subscription._events.append(self._reset("restart"))
+            elif seq + 1 < oldest:
+                subscription._events.append(self._reset("expired"))
+            else:
+                # Досылка не ограничена queue_size: её размер ограничен буфером
+                subscription._events.extend(
+                    event for event in self._buffer if event.seq > seq and subscription.wants(event)
+                )
+
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def close(self) -> None:
+        """Остановка сервера: закрыть все подписки, чтобы соединения завершились."""
+        self.closed = True
+        for subscription in self._subscribers:
+            subscription.close("shutdown")
+        self._subscribers.clear()
+
+    # ------------------------------------------------------------------
+    # Вспомогательное
+    # ------------------------------------------------------------------
+    def _event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def _parse_event_id(self, event_id: str) -> Optional[int]:
+        """Номер события этого процесса или None (чужая эпоха, мусор)."""
+        epoch, _, seq = event_id.strip().partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _reset(self, reason: str, seq: Optional[int] = None) -> Event:
+        # id reset — по умолчанию последнее опубликованное событие: после
+        # перечитывания списка клиент продолжает с этого места
+        seq = self._seq if seq is None else seq
+        return Event.encode(seq, self._event_id(seq), RESET, {"reason": reason})
+
+    def info(self) -> Dict[str, Any]:
+        """Состояние хаба (для GET /health)."""
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "last_event_id": self._event_id(self._seq),
+            "buffered": len(self._buffer),
+            "overflow_policy": self.overflow_policy,
+            "overflows": self.overflows,
+            "dropped": sum(subscription.dropped for subscription in self._subscribers),
+        }
+
+
+def close_on_exit_signal(hub: EventHub) -> Dict[int, Any]:
+    """
+    Закрывать подписки сразу по SIGTERM/SIGINT.
+
+    При остановке uvicorn ждёт завершения начатых ответов, а поток событий сам
+    не кончается никогда — без этого каждая остановка длилась бы весь
+    GRACEFUL_SHUTDOWN_TIMEOUT. Обработчик uvicorn сохраняется и вызывается
+    следом. Вызывать из lifespan (обработчики сигналов uvicorn к этому моменту
+    уже установлены).
+
+    Возвращает заменённые обработчики — при выходе из lifespan их нужно вернуть
+    restore_signal_handlers(): иначе каждый следующий lifespan в процессе
+    (тесты, перезагрузка) оборачивал бы предыдущую обёртку со старым хабом.
+    """
+    replaced: Dict[int, Any] = {}
+    if threading.current_thread() is not threading.main_thread():
+        return replaced
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(signum)
+        if not callable(previous):
+            continue
+
+        def handler(received: int, frame: Any, previous: Any = previous) -> None:
+            # Сигнал прерывает event loop в произвольном месте —
+            # сами подписки закрываются уже из цикла
+            loop.call_soon_threadsafe(hub.close)
+            previous(received, frame)
+
+        signal.signal(signum, handler)
+        replaced[signum] = previous
+    return replaced
+
+
+def restore_signal_handlers(replaced: Dict[int, Any]) -> None:
+    """Вернуть обработчики, заменённые close_on_exit_signal()."""
+    for signum, previous in replaced.items():
+        signal.signal(signum, previous)
+
+
+# ----------------------------------------------------------------------
+# 4. ЕДИНСТВЕННЫЙ ЭКЗЕМПЛЯР НА ПРОЦЕСС
+# ----------------------------------------------------------------------
+_event_hub: Optional[EventHub] = None
+
+
+def get_event_hub() -> EventHub:
+    """Зависимость FastAPI: общий для всех запросов хаб событий."""
+    global _event_hub
+    if _event_hub is None:
+        settings = get_settings()
+        _event_hub = EventHub(
+            settings.events_buffer_size,
+            settings.events_queue_size,
+            settings.events_overflow_policy,
+        )
+    return _event_hub
+
+
+def reset_event_hub() -> None:
+    """
+    Забыть закрытый хаб (lifespan, после close()): следующий запуск приложения
+    в этом же процессе (тестовый клиент, перезагрузка) получит новый, а не
+    закрытый — у закрытого все новые подписки сразу получают shutdown.
+    """
+    global _event_hub
+    _event_hub = None
@@ -0,0 +1,42 @@
+"""
+ОШИБКИ ХРАНИЛИЩА ЗАПЧАСТЕЙ
+
+Общие для всех хранилищ (SQL и в памяти), чтобы роутер обрабатывал их одинаково,
+не зная, с каким хранилищем работает.
+"""
+
+
+class PartNotFound(LookupError):
+    """Запчасти с таким ID нет."""
+
+    def __init__(self, part_id: int):
+        super().__init__(f"Запчасть с ID {part_id} не найдена")
+        self.part_id = part_id
+
+
+class DuplicatePartNumber(ValueError):
+    """Каталожный номер уже занят другой запчастью."""
+
+    def __init__(self, part_number: str):
+        super().__init__(f"Запчасть с номером {part_number} уже существует")
+        self.part_number = part_number
+
+
+class VersionConflict(RuntimeError):
+    """Запчасть изменили после того, как клиент её прочитал (ETag/If-Match)."""
+
+    def __init__(self, part_id: int):
+        super().__init__(f"Запчасть с ID {part_id} была изменена другим запросом")
+        self.part_id = part_id
+
+
+class InsufficientStock(ValueError):
+    """Списание больше, чем лежит на складе (количество ушло бы в минус)."""
+
+    def __init__(self, part_id: int, available: int, delta: int):
+        super().__init__(
+            f"Недостаточно запчасти с ID {part_id}: на складе {available}, списание {-delta}"
+        )
+        self.part_id = part_id
+        self.available = available
+        self.delta = delta
@@ -0,0 +1,42 @@
+"""
+ФИЛЬТРЫ СПИСКА ЗАПЧАСТЕЙ
+
+PartFilter — набор условий из query-параметров GET /parts/.
+Один и тот же объект понимают все хранилища: SQL превращает его в WHERE,
+хранилище в памяти проверяет запчасти методом matches().
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class PartFilter:
+    name: Optional[str] = None  # подстрока в названии, без учёта регистра
+    part_number: Optional[str] = None  # префикс каталожного номера
+    storage_location: Optional[str] = None  # точное место хранения
+    min_quantity: Optional[int] = None  # количество от (включительно)
+    max_quantity: Optional[int] = None  # количество до (включительно)
+
+    def is_empty(self) -> bool:
+        """True, если не задано ни одного условия."""
+        return all(value is None for value in vars(self).values())
+
+    def matches(self, part: Any) -> bool:
+        """Проверка одной запчасти (объекта с атрибутами) — для хранилища в памяти."""
+        if self.name is not None and self.name.casefold() not in part.name.casefold():
+            return False
+        if self.part_number is not None and not (part.part_number or "").startswith(
+            self.part_number
+        ):
+            return False
+        if (
+            self.storage_location is not None
+            and part.storage_location != self.storage_location
+        ):
+            return False
+        if self.min_quantity is not None and part.quantity < self.min_quantity:
+            return False
+        if self.max_quantity is not None and part.quantity > self.max_quantity:
+            return False
+        return True
@@ -1,40 +1,309 @@
 # 2026.03.05 18:37 IMM
 
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.clock import utc_now
 from app.models import Part  # импортируем модель данных
+from app.services import ledger
+from app.services.exceptions import (
+    DuplicatePartNumber,
+    InsufficientStock,
+    PartNotFound,
+    VersionConflict,
+)
+from app.services.filters import PartFilter
+from app.services.search import WORD_PATTERN
+
+# Поля, которые можно менять через update()/upsert() (id и version ведёт сам Garage)
+EDITABLE_FIELDS = ("name", "part_number", "quantity", "storage_location", "price")
 
 
 # КЛАСС Garage (БИЗНЕС-ЛОГИКА)
 # Класс Garage (Гараж) представляет собой "репозиторий" или "сервис" для управления запчастями.
+# Хранит всё в памяти и используется как хранилище для тестов и демо-режима без БД.
+#
+# Раньше запчасти лежали в обычном списке, и поиск по ID перебирал его целиком — O(n).
+# Теперь у Garage три индекса:
+#   _by_id          — словарь id → Part: поиск по ID за O(1)
+#   _by_part_number — словарь part_number → Part: поиск по номеру за O(1)
+#   _ids            — отсортированный список id: постраничный обход (keyset, как
+#                     WHERE id > :after ORDER BY id в SQL) через бинарный поиск bisect
 class Garage:
     def __init__(self):
-        # Инициализируем пустой список для хранения всех запчастей.
-        # Список (list) в Python - это аналог List<T> в C#. Изменяемая коллекция.
-        self.parts = list()  # или [] - то же самое
+        # Словарь (dict) в Python - это аналог Dictionary<TKey, TValue> в C#.
+        self._by_id: Dict[int, Part] = {}
+        self._by_part_number: Dict[str, Part] = {}
+        # id выдаются по возрастанию, поэтому новый id всегда дописывается в конец
+        # и список остаётся отсортированным без пересортировки.
+        self._ids: List[int] = []
         # Счетчик для автоматической генерации уникальных ID для новых запчастей.
         self.next_id = 1
+        # Журнал движений остатков: part_id → движения по возрастанию id
+        # (как таблица stock_movements с индексом (part_id, id))
+        self._movements: Dict[int, List[Dict[str, Any]]] = {}
+        self._next_movement_id = 1
+
+    def __len__(self) -> int:
+        return len(self._by_id)
 
-    # МЕТОД ДОБАВЛЕНИЯ ЗАПЧАСТИ
-    def add_part(self, name: str, part_number: str, quantity: int):
+    # МЕТОД ДОБАВЛЕНИЯ ЗАПЧАСТИ (прежний интерфейс)
+    def add_part(self, name: str, part_number: str, quantity: int, **fields: Any) -> Part:
+        return self.create(
+            {"name": name, "part_number": part_number, "quantity": quantity, **fields}
+        )
+
+    # МЕТОД СОЗДАНИЯ ЗАПЧАСТИ ИЗ СЛОВАРЯ ПОЛЕЙ
+    def create(self, data: Dict[str, Any], kind: str = ledger.CREATE) -> Part:
+        part_number = data.get("part_number")
+        if part_number in self._by_part_number:
+            # Как UNIQUE-индекс в БД: два одинаковых каталожных номера недопустимы
+            raise DuplicatePartNumber(part_number)
         # Создаем новый объект Part, передавая текущий next_id в качестве ID.
-        part = Part(self.next_id, name, part_number, quantity)
-        # Добавляем созданный объект в список parts.
-        self.parts.append(part)  # append - аналог Add() для List<T> в C#.
+        part = Part(self.next_id, **{key: data.get(key) for key in EDITABLE_FIELDS})
+        self._by_id[part.id] = part
+        if part_number is not None:
+            self._by_part_number[part_number] = part
+        self._ids.append(part.id)  # append - аналог Add() для List<T> в C#.
         # Увеличиваем счетчик ID для следующей запчасти.
         self.next_id += 1
+        quantity = part.quantity or 0
+        self._record(ledger.movement(part.id, quantity, quantity, kind))
+        return part
 
     # МЕТОД ПОЛУЧЕНИЯ СПИСКА ВСЕХ ЗАПЧАСТЕЙ
     def list_parts(self):
-        # Возвращаем копию списка (чтобы нельзя было изменить оригинал)
-        return self.parts.copy()
+        # Раньше возвращалась копия списка — O(n) памяти и времени на каждый вызов.
+        # Теперь отдаём «представление» значений словаря: оно не копирует данные
+        # и не позволяет добавить/удалить запчасть в обход Garage.
+        return self._by_id.values()
 
     # МЕТОД ПОИСКА ЗАПЧАСТИ ПО ID
-    def find_part(self, part_id: int):
-        # Проходим циклом for по всем запчастям в списке self.parts.
-        # Цикл for в Python похож на foreach в C#.
-        for part in self.parts:
-            # Если ID текущей запчасти в цикле совпадает с искомым...
-            if part.id == part_id:
-                # ...возвращаем эту запчасть.
-                return part
-        # Если цикл завершился, а запчасть не найдена, возвращаем None (аналог null в C#).
-        return None
+    def find_part(self, part_id: int) -> Optional[Part]:
+        # Поиск в словаре по ключу — O(1), без перебора всех запчастей.
+        # .get() возвращает None (аналог null в C#), если ключа нет.
+        return self._by_id.get(part_id)
+
+    get = find_part  # то же имя, что у SQL-хранилищ
+
+    # МЕТОД ПОИСКА ЗАПЧАСТИ ПО КАТАЛОЖНОМУ НОМЕРУ
+    def get_by_part_number(self, part_number: str) -> Optional[Part]:
+        return self._by_part_number.get(part_number)
+
+    # ПОСТРАНИЧНЫЙ ОБХОД (keyset по id)
+    def iter_from(self, after: Optional[int] = None) -> Iterator[Part]:
+        """Запчасти с id > after по возрастанию id."""
+        # bisect_right находит позицию первого id > after за O(log n)
+        position = 0 if after is None else bisect_right(self._ids, after)
+        while position < len(self._ids):
+            part_id = self._ids[position]
+            yield self._by_id[part_id]
+            # Позицию ищем заново от последнего отданного id: если между шагами
+            # (например, при потоковом экспорте) запчасти удалили, обход не собьётся
+            position = bisect_right(self._ids, part_id)
+
+    def list_page(
+        self,
+        filters: PartFilter = PartFilter(),
+        after: Optional[int] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Part], bool]:
+        """
+        Страница запчастей: (запчасти, есть_ли_следующая_страница).
+        Обход останавливается, как только набрано limit + 1 подходящих запчастей.
+        """
+        page: List[Part] = []
+        for part in self.iter_from(after):
+            if filters.matches(part):
+                if len(page) == limit:
+                    return page, True
+                page.append(part)
+        return page, False
+
+    def count(self, filters: PartFilter = PartFilter()) -> int:
+        if filters.is_empty():
+            return len(self._by_id)  # O(1)
+        return sum(1 for part in self._by_id.values() if filters.matches(part))
+
+    # СВОДКА ПО СКЛАДУ (как GROUP BY storage_location и ROW_NUMBER() в SQL)
+    def stats(
+        self, low_stock_threshold: int, per_location: int
+    ) -> Tuple[List[Dict[str, Any]], List[Part]]:
+        locations: Dict[Optional[str], Dict[str, Any]] = {}
+        low_by_location: Dict[Optional[str], List[Part]] = {}
+        for part in self.iter_from(None):
+            location = locations.setdefault(
+                part.storage_location,
+                {
+                    "storage_location": part.storage_location,
+                    "part_count": 0,
+                    "total_quantity": 0,
+                    "priced_parts": 0,
+                    "stock_value": 0.0,
+                },
+            )
+            location["part_count"] += 1
+            location["total_quantity"] += part.quantity
+            if part.price is not None:
+                location["priced_parts"] += 1
+                location["stock_value"] += part.price * part.quantity
+            if part.quantity <= low_stock_threshold:
+                low_by_location.setdefault(part.storage_location, []).append(part)
+
+        low_stock = [
+            part
+            for parts in low_by_location.values()
+            for part in sorted(parts, key=lambda part: (part.quantity, part.id))[:per_location]
+        ]
+        low_stock.sort(key=lambda part: (part.quantity, part.id))
+        by_value = sorted(
+            locations.values(),
+            key=lambda location: (-location["stock_value"], -location["part_count"]),
+        )
+        return by_value, low_stock
+
+    # ПОИСК ПО СЛОВАМ НАЗВАНИЯ И НОМЕРА
+    def search(
+        self, terms: List[str], prefix: Optional[str] = None, limit: int = 20
+    ) -> List[Part]:
+        """
+        terms — префиксы слов в нижнем регистре (см. app/services/search.py):
+        подходит запчасть, у которой для КАЖДОГО префикса есть слово, с него
+        начинающееся. prefix — начало каталожного номера: такие запчасти идут первыми.
+        Полный перебор O(n) — индекса слов в памяти нет (для демо-режима достаточно).
+        """
+        by_number: List[Part] = []
+        by_words: List[Part] = []
+        for part in self.iter_from(None):
+            if prefix is not None and part.part_number.startswith(prefix):
+                by_number.append(part)
+                continue
+            if terms:
+                words = WORD_PATTERN.findall(f"{part.name} {part.part_number}".casefold())
+                if all(any(word.startswith(term) for word in words) for term in terms):
+                    by_words.append(part)
+        return (by_number + by_words)[:limit]
+
+    # МЕТОД ОБНОВЛЕНИЯ ЗАПЧАСТИ
+    def update(
+        self,
+        part_id: int,
+        data: Dict[str, Any],
+        expected_version: Optional[int] = None,
+        kind: str = ledger.UPDATE,
+    ) -> Part:
+        """
+        Меняет переданные поля. expected_version — версия, которую видел клиент
+        (If-Match): если запчасть с тех пор менялась, будет VersionConflict.
+        """
+        part = self._by_id.get(part_id)
+        if part is None:
+            raise PartNotFound(part_id)
+        if expected_version is not None and part.version != expected_version:
+            raise VersionConflict(part_id)
+
+        new_number = data.get("part_number", part.part_number)
+        if new_number != part.part_number:
+            if new_number in self._by_part_number:
+                raise DuplicatePartNumber(new_number)
+            # Перевешиваем запчасть в индексе номеров на новый ключ
+            self._by_part_number.pop(part.part_number, None)
+            self._by_part_number[new_number] = part
+
+        old_quantity = part.quantity
+        for key, value in data.items():
+            if key in EDITABLE_FIELDS:
+                setattr(part, key, value)
+        part.version += 1
+        if part.quantity != old_quantity:
+            self._record(
+                ledger.movement(part_id, part.quantity - old_quantity, part.quantity, kind)
+            )
+        return part
+
+    # ИЗМЕНЕНИЕ ОСТАТКА (приход / списание)
+    def adjust_stock(self, part_id: int, delta: int) -> Part:
+        return self.adjust_stock_many([(part_id, delta)])[0]
+
+    def adjust_stock_many(self, deltas: List[Tuple[int, int]]) -> List[Part]:
+        """
+        Все изменения или ни одного: сначала проверяем всю пачку на «черновике»
+        остатков, и только если ошибок нет — меняем запчасти.
+        """
+        quantities: Dict[int, int] = {}
+        for part_id, delta in deltas:
+            part = self._by_id.get(part_id)
+            if part is None:
+                raise PartNotFound(part_id)
+            available = quantities.get(part_id, part.quantity)
+            if available + delta < 0:
+                raise InsufficientStock(part_id, available, delta)
+            quantities[part_id] = available + delta
+
+        results = []
+        for part_id, delta in deltas:
+            part = self._by_id[part_id]
+            part.quantity += delta
+            part.version += 1
+            self._record(ledger.movement(part_id, delta, part.quantity, ledger.ADJUST))
+            # Снимок после каждого изменения — как RETURNING в SQL
+            results.append(Part(**part.to_dict()))
+        return results
+
+    # МЕТОД УДАЛЕНИЯ ЗАПЧАСТИ
+    def delete(self, part_id: int, expected_version: Optional[int] = None) -> Part:
+        part = self._by_id.get(part_id)
+        if part is None:
+            raise PartNotFound(part_id)
+        if expected_version is not None and part.version != expected_version:
+            raise VersionConflict(part_id)
+        del self._by_id[part_id]
+        self._by_part_number.pop(part.part_number, None)
+        # Находим позицию id бинарным поиском и вырезаем его из списка
+        del self._ids[bisect_left(self._ids, part_id)]
+        quantity = part.quantity or 0
+        self._record(ledger.movement(part_id, -quantity, 0, ledger.DELETE))
+        return part
+
+    # СОЗДАТЬ ИЛИ ОБНОВИТЬ ПО КАТАЛОЖНОМУ НОМЕРУ (как INSERT ... ON CONFLICT)
+    def upsert(self, data: Dict[str, Any]) -> Tuple[Part, bool]:
+        """Возвращает (запчасть, True если создана / False если обновлена)."""
+        existing = self._by_part_number.get(data["part_number"])
+        if existing is None:
+            return self.create(data), True
+        return self.update(existing.id, data, kind=ledger.IMPORT), False
+
+    # ЖУРНАЛ ДВИЖЕНИЙ ОСТАТКОВ (см. app/services/ledger.py)
+    def _record(self, movement: Dict[str, Any]) -> None:
+        movement.update(id=self._next_movement_id, created_at=utc_now())
+        self._next_movement_id += 1
+        # id растут, поэтому список запчасти остаётся отсортированным
+        self._movements.setdefault(movement["part_id"], []).append(movement)
+
+    def movements(
+        self, part_id: int, before: Optional[int] = None, limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """История запчасти от новых к старым (keyset по id < before)."""
+        history = self._movements.get(part_id, [])
+        end = len(history)
+        if before is not None:
+            # Позиция первого движения с id >= before — бинарным поиском
+            end = bisect_left(history, before, key=lambda movement: movement["id"])
+        start = max(end - limit, 0)
+        return [dict(movement) for movement in reversed(history[start:end])], start > 0
+
+    def compact_movements(self, older_than: datetime) -> int:
+        """Сворачивает движения старше older_than: последнее старое становится снимком."""
+        removed = 0
+        for part_id, history in self._movements.items():
+            old = [movement for movement in history if movement["created_at"] < older_than]
+            if len(old) < 2:
+                continue
+            snapshot = old[-1]
+            snapshot.update(
+                delta=sum(movement["delta"] for movement in old), kind=ledger.SNAPSHOT
+            )
+            self._movements[part_id] = [snapshot] + history[len(old):]
+            removed += len(old) - 1
+        return removed
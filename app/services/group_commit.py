@@ -0,0 +1,304 @@
+"""
+ГРУППОВОЙ КОММИТ ОДИНОЧНЫХ ЗАПИСЕЙ (GROUP_COMMIT_ENABLED=true)
+
+Назначение: каждый POST/PUT/PATCH/DELETE и изменение остатка — отдельная
+транзакция, а значит отдельный COMMIT и fsync журнала БД. При сотнях записей в
+секунду время уходит на fsync, а не на сами INSERT/UPDATE (в SQLite к тому же
+пишет только одно соединение — остальные ждут блокировку).
+В режиме группового коммита записи параллельных запросов ставятся в очередь
+одной задаче-писателю, она выполняет их пачкой в ОДНОЙ транзакции и фиксирует
+одним COMMIT. Ответ каждому запросу уходит только после коммита его пачки —
+гарантии для клиента те же: 201/200 означает «записано».
+
+Составные части:
+1. GroupCommitWriter - очередь записей и задача-писатель
+2. GroupCommitRepository - обёртка над PartRepository запроса: чтение идёт как
+   обычно, одиночные записи — через писатель (обработчики не меняются)
+3. get_group_commit_writer() - один писатель на процесс
+
+КОГДА ФИКСИРУЕТСЯ ПАЧКА
+Первая запись открывает пачку; она фиксируется через GROUP_COMMIT_INTERVAL_MS
+или сразу, как только в ней GROUP_COMMIT_MAX_BATCH записей. Пока идёт COMMIT,
+новые записи копятся в очереди и становятся следующей пачкой — под нагрузкой
+пачки растут сами. Цена режима — до GROUP_COMMIT_INTERVAL_MS задержки на запись
+при слабой нагрузке (интервал 0 — без ожидания, пачка из того, что уже ждёт).
+
+ОШИБКА ОДНОЙ ЗАПИСИ
+Ошибки клиента (занятый номер, нет запчасти, 412, не хватает остатка) не должны
+ронять чужие записи: каждая запись выполняется в своей точке сохранения
+(SAVEPOINT, session.begin_nested()), и ошибка откатывает только её. В SQLite
+пачка открывается явным BEGIN IMMEDIATE: драйвер sqlite3 сам не начинает
+транзакцию перед SAVEPOINT, и без этого RELEASE фиксировал бы каждую запись
+отдельно. IMMEDIATE к тому же сразу берёт блокировку записи — пачка не упрётся
+в «database is locked» посреди работы.
+
+Метрики (GET /metrics при PROFILING_ENABLED=true, сводка — в GET /health):
+    garage_group_commit_batch_size      - записей в пачке
+    garage_group_commit_seconds         - время пачки: stage=execute (запросы)
+                                          и stage=commit (COMMIT)
+    garage_group_commit_failed_total    - записи, отклонённые внутри пачки
+
+⚠️ Писатель у каждого процесса свой; пачки собираются из запросов одного
+воркера. Массовые операции (POST /parts/bulk, POST /parts/stock) уже пишут
+одной транзакцией на пачку и идут мимо писателя.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.db.database import get_async_session_factory
+from app.services.repository import PartDict, PartRepository
+from app.services.sql_repository import CorePartRepository
+
+# Запись: функция от хранилища пачки (выполняется внутри общей транзакции)
+Operation = Callable[[PartRepository], Awaitable[Any]]
+
+BATCH_SIZE = registry.histogram(
+    "garage_group_commit_batch_size",
+    "Количество записей в одной пачке группового коммита",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+BATCH_DURATION = registry.histogram(
+    "garage_group_commit_seconds",
+    "Время пачки группового коммита: execute — запросы записей, commit — COMMIT",
+    ("stage",),
+)
+FAILED = registry.counter(
+    "garage_group_commit_failed_total",
+    "Записи, отклонённые внутри пачки (откачена только их точка сохранения)",
+)
+
+
+class _BatchRepository(CorePartRepository):
+    """
+    Хранилище внутри пачки: вместо commit — flush (ошибки БД всплывают у своей
+    записи), фиксирует писатель. Откат делает точка сохранения записи: rollback
+    сессии откатил бы всю пачку. Всегда Core: ORM-объекты в общей сессии пачки
+    копились бы в identity map и могли устареть после записей соседей.
+    """
+
+    async def _commit(self) -> None:
+        await self.session.flush()
+
+    async def _rollback(self) -> None:
+        pass  # исключение выйдет из begin_nested() — и откатит точку сохранения
+
+
+class GroupCommitWriter:
+    """Очередь одиночных записей и задача, фиксирующая их пачками."""
+
+    def __init__(self, interval_ms: float, max_batch: int) -> None:
+        self.interval = max(interval_ms, 0.0) / 1000
+        self.max_batch = max(max_batch, 1)
+        self._pending: List[Tuple[Operation, asyncio.Future]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup = asyncio.Event()  # в очереди есть записи
+        self._full = asyncio.Event()  # набралась полная пачка
+        self._closing = False
+        # Статистика для GET /health
+        self.batches = 0
+        self.operations = 0
+        self.largest_batch = 0
+        self.failed = 0
+        self.commit_seconds = 0.0
+        self.commit_max_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Сторона запросов
+    # ------------------------------------------------------------------
+    async def submit(self, operation: Operation) -> Any:
+        """Поставить запись в очередь и дождаться коммита её пачки."""
+        if self._closing:
+            # Остановка: писатель уже не соберёт новую пачку — пишем сами
+            async with get_async_session_factory()() as session:
+                return await operation(CorePartRepository(session))
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._pending.append((operation, future))
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        # shield: отмена запроса (клиент ушёл) не отменяет запись, уже стоящую в пачке
+        return await asyncio.shield(future)
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        # Первый вызов или новый event loop (скрипты, тестовый клиент):
+        # события привязаны к loop, поэтому создаём их заново
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        self._task = loop.create_task(self._run(), name="group-commit-writer")
+
+    async def close(self) -> None:
+        """Зафиксировать то, что уже в очереди, и остановить писатель (lifespan)."""
+        self._closing = True
+        self._wakeup.set()
+        self._full.set()
+        if self._task is not None and self._loop is asyncio.get_running_loop():
+            await self._task
+        self._task = None
+        self._closing = False  # следующий запуск приложения (тесты) создаст писатель заново
+
+    # ------------------------------------------------------------------
+    # Задача-писатель
+    # ------------------------------------------------------------------
+    async def _run(self) -> None:
+        try:
+            while await self._next_batch():
+                batch = self._pending[: self.max_batch]
+                del self._pending[: self.max_batch]
+                if len(self._pending) < self.max_batch and not self._closing:
+                    self._full.clear()
+                await self._flush(batch)
+        except asyncio.CancelledError:
+            for _, future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            raise
+
+    async def _next_batch(self) -> bool:
+        """Дождаться записей и набрать пачку; False — писатель остановлен."""
+        while not self._pending:
+            if self._closing:
+                return False
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        if self.interval > 0 and not self._closing and len(self._pending) < self.max_batch:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass  # интервал вышел — фиксируем то, что набралось
+        return True
+
+    async def _flush(self, batch: List[Tuple[Operation, asyncio.Future]]) -> None:
+        """Выполнить пачку одной транзакцией; ответы — только после COMMIT."""
+        started = time.perf_counter()
+        results: List[Any] = []
+        failed = 0
+        try:
+            async with get_async_session_factory()() as session:
+                if session.bind.dialect.name == "sqlite":
+                    await session.execute(text("BEGIN IMMEDIATE"))
+                repository = _BatchRepository(session)
+                for operation, future in batch:
+                    try:
+                        async with session.begin_nested():
+                            results.append(await operation(repository))
+                    except Exception as error:  # noqa: BLE001 — ошибка достаётся своему запросу
+                        results.append(None)
+                        failed += 1
+                        if not future.done():
+                            future.set_exception(error)
+                executed = time.perf_counter()
+                await session.commit()
+        except Exception as error:  # noqa: BLE001 — COMMIT не прошёл: не записано ничего
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        except BaseException:
+            # Писатель отменён посреди пачки (остановка loop): запросы не должны ждать вечно
+            for _, future in batch:
+                future.cancel()
+            raise
+
+        committed = time.perf_counter()
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        self._observe(len(batch), failed, executed - started, committed - executed)
+
+    def _observe(self, size: int, failed: int, execute: float, commit: float) -> None:
+        self.batches += 1
+        self.operations += size
+        self.failed += failed
+        self.largest_batch = max(self.largest_batch, size)
+        self.commit_seconds += commit
+        self.commit_max_seconds = max(self.commit_max_seconds, commit)
+        BATCH_SIZE.observe(size)
+        BATCH_DURATION.observe(execute, stage="execute")
+        BATCH_DURATION.observe(commit, stage="commit")
+        if failed:
+            FAILED.inc(failed)
+
+    def info(self) -> Dict[str, Any]:
+        """Состояние писателя (для GET /health)."""
+        return {
+            "interval_ms": self.interval * 1000,
+            "max_batch": self.max_batch,
+            "queued": len(self._pending),
+            "batches": self.batches,
+            "operations": self.operations,
+            "avg_batch": round(self.operations / self.batches, 2) if self.batches else 0,
+            "largest_batch": self.largest_batch,
+            "failed": self.failed,
+            "commit_avg_ms": (
+                round(self.commit_seconds / self.batches * 1000, 3) if self.batches else 0
+            ),
+            "commit_max_ms": round(self.commit_max_seconds * 1000, 3),
+        }
+
+
+class GroupCommitRepository:
+    """
+    PartRepository запроса, у которого одиночные записи идут через писатель.
+    Чтение (в том числе повторное чтение после 304/412) — сессией запроса.
+    """
+
+    def __init__(self, repository: PartRepository, writer: GroupCommitWriter) -> None:
+        self._repository = repository
+        self._writer = writer
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._repository, name)
+
+    async def create(self, data: Dict[str, Any]) -> PartDict:
+        return await self._writer.submit(lambda repository: repository.create(data))
+
+    async def update(
+        self,
+        part_id: int,
+        data: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> PartDict:
+        return await self._writer.submit(
+            lambda repository: repository.update(part_id, data, expected_version)
+        )
+
+    async def delete(self, part_id: int, expected_version: Optional[int] = None) -> PartDict:
+        return await self._writer.submit(
+            lambda repository: repository.delete(part_id, expected_version)
+        )
+
+    async def adjust_stock(self, part_id: int, delta: int) -> PartDict:
+        return await self._writer.submit(
+            lambda repository: repository.adjust_stock(part_id, delta)
+        )
+
+
+# ----------------------------------------------------------------------
+# ЕДИНСТВЕННЫЙ ЭКЗЕМПЛЯР НА ПРОЦЕСС
+# ----------------------------------------------------------------------
+_writer: Optional[GroupCommitWriter] = None
+
+
+def get_group_commit_writer() -> GroupCommitWriter:
+    """Общий для всех запросов писатель (создаётся при первой записи)."""
+    global _writer
+    if _writer is None:
+        settings = get_settings()
+        _writer = GroupCommitWriter(
+            settings.group_commit_interval_ms, settings.group_commit_max_batch
+        )
+    return _writer
@@ -0,0 +1,79 @@
+"""
+ЖУРНАЛ ДВИЖЕНИЙ ОСТАТКОВ (stock_movements)
+
+Каждое изменение quantity записывается в журнал в той же транзакции, что и
+само изменение (см. реализации PartRepository). Поэтому:
+- сумма delta по запчасти всегда равна её текущему PartDB.quantity;
+- текущий остаток читается из parts (материализованный итог), а не суммой
+  по журналу — чтение не дорожает с ростом истории;
+- журнал ссылается на запчасть только по part_id (без FOREIGN KEY, история
+  переживает удаление) — это верно, пока id запчастей не повторяются
+  (AUTOINCREMENT в SQLite, последовательность в PostgreSQL).
+
+КОМПАКЦИЯ (снимки)
+Журнал растёт без ограничений: миллионы строк замедляют историю и занимают место.
+Движения старше срока хранения сворачиваются: для каждой запчасти последняя
+старая строка становится снимком (kind=snapshot, delta = сумма свёрнутых
+движений, quantity_after не меняется), остальные старые строки удаляются.
+Снимок сохраняет id и время последнего свёрнутого движения, поэтому порядок
+истории не нарушается, а сумма delta по запчасти не меняется.
+
+Запуск компакции:
+- периодически внутри приложения: LEDGER_COMPACTION_INTERVAL > 0 (см. app/main.py);
+- по расписанию (cron): python -m scripts.compact_ledger --older-than-days 30
+  (при нескольких воркерах лучше так — иначе компакцию запустит каждый воркер).
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from app.core.clock import utc_now
+
+logger = logging.getLogger(__name__)
+
+# Виды движений (колонка kind)
+CREATE = "create"  # запчасть создана (начальный остаток)
+UPDATE = "update"  # PUT/PATCH изменил quantity
+ADJUST = "adjust"  # приход/списание через POST /parts/{part_id}/stock
+IMPORT = "import"  # загрузка фида (POST /parts/bulk)
+DELETE = "delete"  # запчасть удалена (остаток списан в ноль)
+SNAPSHOT = "snapshot"  # свёрнутые компакцией движения (или остаток до появления журнала)
+
+MovementDict = Dict[str, Any]
+
+
+def movement(part_id: int, delta: int, quantity_after: int, kind: str) -> MovementDict:
+    """Строка журнала (id и created_at проставляются при вставке)."""
+    return {
+        "part_id": part_id,
+        "delta": delta,
+        "quantity_after": quantity_after,
+        "kind": kind,
+    }
+
+
+async def compact_once(retention: timedelta) -> int:
+    """Одна компакция: сворачивает движения старше retention. Возвращает число удалённых строк."""
+    # Импорт внутри функции: repository импортирует хранилища, которые импортируют этот модуль
+    from app.services.repository import open_repository
+
+    async with open_repository() as repository:
+        return await repository.compact_movements(utc_now() - retention)
+
+
+async def compact_periodically(interval: float, retention: timedelta) -> None:
+    """
+    Фоновая задача (asyncio.Task из lifespan): компакция раз в interval секунд.
+    Ошибка одного прохода записывается в лог и не останавливает задачу.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed: Optional[int] = await compact_once(retention)
+            logger.info("Компакция журнала остатков: удалено строк %s", removed)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001 — следующий проход попробует снова
+            logger.exception("Компакция журнала остатков не удалась")
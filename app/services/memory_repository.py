@@ -0,0 +1,114 @@
+"""
+ХРАНИЛИЩЕ ЗАПЧАСТЕЙ В ПАМЯТИ (PARTS_BACKEND=memory)
+
+Асинхронная обёртка над Garage с тем же интерфейсом PartRepository,
+что и у SQL-хранилищ. Данные живут в памяти процесса и пропадают при
+перезапуске — для тестов и демо-режима без базы данных.
+Garage работает без ожиданий (await), поэтому каждый метод выполняется
+целиком без переключения event loop — блокировки не нужны.
+"""
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.services.filters import PartFilter
+from app.services.garage import Garage
+from app.services.repository import MovementDict, PartDict, PartRepository
+from app.services.search import part_number_prefix, search_terms
+
+# Единый экземпляр Garage на процесс (как когда-то в app/database.py)
+garage = Garage()
+
+
+class MemoryPartRepository(PartRepository):
+    def __init__(self, garage: Garage) -> None:
+        self.garage = garage
+
+    async def get(self, part_id: int) -> Optional[PartDict]:
+        part = self.garage.get(part_id)
+        return part.to_dict() if part is not None else None
+
+    async def get_by_part_number(self, part_number: str) -> Optional[PartDict]:
+        part = self.garage.get_by_part_number(part_number)
+        return part.to_dict() if part is not None else None
+
+    async def get_many(self, ids: List[int], part_numbers: List[str]) -> List[PartDict]:
+        found = {part.id: part for part in map(self.garage.get, ids) if part is not None}
+        for part in map(self.garage.get_by_part_number, part_numbers):
+            if part is not None:
+                found[part.id] = part
+        return [part.to_dict() for part in found.values()]
+
+    async def list_page(
+        self, filters: PartFilter, after: Optional[int], limit: int
+    ) -> Tuple[List[PartDict], bool]:
+        parts, has_more = self.garage.list_page(filters, after, limit)
+        return [part.to_dict() for part in parts], has_more
+
+    async def count(self, filters: PartFilter) -> int:
+        return self.garage.count(filters)
+
+    async def estimate_count(self) -> Optional[int]:
+        return len(self.garage)  # точное значение и так O(1)
+
+    async def search(self, query: str, limit: int) -> List[PartDict]:
+        parts = self.garage.search(search_terms(query), part_number_prefix(query), limit)
+        return [part.to_dict() for part in parts]
+
+    async def stats(
+        self, low_stock_threshold: int, per_location: int
+    ) -> Tuple[List[Dict[str, Any]], List[PartDict]]:
+        locations, low_stock = self.garage.stats(low_stock_threshold, per_location)
+        return locations, [part.to_dict() for part in low_stock]
+
+    async def ping(self) -> None:
+        return None  # хранилище — память процесса, связь проверять не с чем
+
+    async def iter_all(self, chunk_size: int) -> AsyncIterator[List[PartDict]]:
+        chunk: List[PartDict] = []
+        for part in self.garage.iter_from(None):
+            chunk.append(part.to_dict())
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def list_movements(
+        self, part_id: int, before: Optional[int], limit: int
+    ) -> Tuple[List[MovementDict], bool]:
+        return self.garage.movements(part_id, before, limit)
+
+    async def compact_movements(self, older_than: datetime) -> int:
+        return self.garage.compact_movements(older_than)
+
+    async def create(self, data: Dict[str, Any]) -> PartDict:
+        return self.garage.create(data).to_dict()
+
+    async def update(
+        self,
+        part_id: int,
+        data: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> PartDict:
+        return self.garage.update(part_id, data, expected_version).to_dict()
+
+    async def delete(
+        self, part_id: int, expected_version: Optional[int] = None
+    ) -> PartDict:
+        return self.garage.delete(part_id, expected_version).to_dict()
+
+    async def adjust_stock(self, part_id: int, delta: int) -> PartDict:
+        return self.garage.adjust_stock(part_id, delta).to_dict()
+
+    async def adjust_stock_many(self, deltas: List[Tuple[int, int]]) -> List[PartDict]:
+        return [part.to_dict() for part in self.garage.adjust_stock_many(deltas)]
+
+    async def upsert_many(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[Tuple[str, int, bool]]:
+        results = []
+        for row in rows:
+            part, created = self.garage.upsert(row)
+            results.append((part.part_number, part.id, created))
+        return results
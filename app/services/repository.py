@@ -0,0 +1,224 @@
+"""
+ХРАНИЛИЩЕ ЗАПЧАСТЕЙ (REPOSITORY PATTERN)
+
+Назначение: роутер не должен знать, КАК хранятся запчасти. Он работает
+с интерфейсом PartRepository, а конкретную реализацию выбирает настройка
+PARTS_BACKEND:
+
+    orm    - SQLAlchemy ORM (объекты PartDB, identity map) — по умолчанию
+    core   - SQLAlchemy Core (запросы без ORM-объектов: меньше накладных расходов)
+    memory - Garage в памяти процесса (тесты, демо-режим без БД)
+
+Все методы работают со словарями полей запчасти (см. PART_FIELDS) —
+их одинаково легко положить в кэш и отдать как JSON.
+Ошибки — общие для всех реализаций (app/services/exceptions.py).
+"""
+
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.database import get_async_session_factory, get_db
+from app.services.filters import PartFilter
+from fastapi import Depends
+
+# Поля запчасти в ответах и экспорте (в порядке колонок таблицы parts)
+PART_FIELDS = (
+    "id",
+    "name",
+    "part_number",
+    "quantity",
+    "storage_location",
+    "price",
+    "version",
+)
+
+PartDict = Dict[str, Any]
+# Строка журнала движений остатков (см. app/services/ledger.py)
+MOVEMENT_FIELDS = ("id", "part_id", "delta", "quantity_after", "kind", "created_at")
+MovementDict = Dict[str, Any]
+
+
+class PartRepository(ABC):
+    """Интерфейс хранилища запчастей. Реализации — в sql_repository / memory_repository."""
+
+    # --- Чтение ---
+    @abstractmethod
+    async def get(self, part_id: int) -> Optional[PartDict]:
+        """Запчасть по ID или None."""
+
+    @abstractmethod
+    async def get_by_part_number(self, part_number: str) -> Optional[PartDict]:
+        """Запчасть по каталожному номеру или None."""
+
+    @abstractmethod
+    async def get_many(self, ids: List[int], part_numbers: List[str]) -> List[PartDict]:
+        """
+        Запчасти с id из ids ИЛИ part_number из part_numbers — одним запросом
+        (WHERE id IN (...) OR part_number IN (...)). Порядок не гарантирован,
+        ненайденных ключей в результате просто нет.
+        """
+
+    @abstractmethod
+    async def list_page(
+        self, filters: PartFilter, after: Optional[int], limit: int
+    ) -> Tuple[List[PartDict], bool]:
+        """
+        Страница запчастей с id > after по возрастанию id.
+        Возвращает (запчасти, есть_ли_следующая_страница).
+        """
+
+    @abstractmethod
+    async def count(self, filters: PartFilter) -> int:
+        """Точное количество запчастей, подходящих под фильтры."""
+
+    @abstractmethod
+    async def estimate_count(self) -> Optional[int]:
+        """Быстрая оценка общего количества (без фильтров) или None."""
+
+    @abstractmethod
+    async def search(self, query: str, limit: int) -> List[PartDict]:
+        """
+        Полнотекстовый поиск по названию и каталожному номеру (см. app/services/search.py).
+        Сначала запчасти, чей номер начинается с запроса, затем — по релевантности.
+        """
+
+    @abstractmethod
+    async def stats(
+        self, low_stock_threshold: int, per_location: int
+    ) -> Tuple[List[Dict[str, Any]], List[PartDict]]:
+        """
+        Сводка по складу, посчитанная хранилищем (см. app/services/stats.py).
+        Возвращает (места_хранения, заканчивающиеся):
+        - места хранения: storage_location, part_count, total_quantity,
+          priced_parts, stock_value (сумма price * quantity);
+        - запчасти с quantity <= low_stock_threshold, не больше per_location
+          на место хранения, по возрастанию quantity.
+        """
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """Дешёвая проверка связи с хранилищем (для GET /health); исключение — недоступно."""
+
+    @abstractmethod
+    def iter_all(self, chunk_size: int) -> AsyncIterator[List[PartDict]]:
+        """
+        Все запчасти по возрастанию id, кусками по chunk_size.
+        Работает и после завершения обработчика (для StreamingResponse).
+        """
+
+    # --- Журнал движений остатков ---
+    @abstractmethod
+    async def list_movements(
+        self, part_id: int, before: Optional[int], limit: int
+    ) -> Tuple[List[MovementDict], bool]:
+        """
+        История остатка запчасти, от новых к старым: движения с id < before.
+        Возвращает (движения, есть_ли_следующая_страница).
+        """
+
+    @abstractmethod
+    async def compact_movements(self, older_than: datetime) -> int:
+        """Свернуть движения старше older_than в снимки. Возвращает число удалённых строк."""
+
+    # --- Запись (каждый метод — отдельная транзакция; изменения quantity
+    #     записываются в журнал движений в той же транзакции; при групповом
+    #     коммите create/update/delete/adjust_stock — часть общей транзакции пачки) ---
+    @abstractmethod
+    async def create(self, data: Dict[str, Any]) -> PartDict:
+        """Создать запчасть. DuplicatePartNumber, если номер занят."""
+
+    @abstractmethod
+    async def update(
+        self,
+        part_id: int,
+        data: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> PartDict:
+        """
+        Изменить переданные поля. expected_version — версия из If-Match.
+        PartNotFound / VersionConflict / DuplicatePartNumber.
+        """
+
+    @abstractmethod
+    async def delete(
+        self, part_id: int, expected_version: Optional[int] = None
+    ) -> PartDict:
+        """Удалить запчасть, вернуть её последнее состояние."""
+
+    @abstractmethod
+    async def adjust_stock(self, part_id: int, delta: int) -> PartDict:
+        """
+        Атомарно изменить количество на delta (без чтения строки перед записью).
+        PartNotFound / InsufficientStock, если количество ушло бы в минус.
+        """
+
+    @abstractmethod
+    async def adjust_stock_many(self, deltas: List[Tuple[int, int]]) -> List[PartDict]:
+        """
+        Применить пачку изменений [(part_id, delta), ...] одной транзакцией:
+        при первой ошибке не применяется ни одно. Возвращает состояние запчасти
+        после каждого изменения (в порядке deltas).
+        """
+
+    @abstractmethod
+    async def upsert_many(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[Tuple[str, int, bool]]:
+        """
+        Создать/обновить пачку запчастей по part_number (номера в пачке уникальны).
+        Возвращает [(part_number, id, создана_ли), ...].
+        """
+
+
+# ----------------------------------------------------------------------
+# ВЫБОР РЕАЛИЗАЦИИ ПО НАСТРОЙКЕ PARTS_BACKEND
+# ----------------------------------------------------------------------
+def get_repository(db: AsyncSession = Depends(get_db)) -> PartRepository:
+    """
+    Зависимость FastAPI: хранилище для текущего запроса.
+    Для memory сессия БД не используется (AsyncSession ленивая —
+    соединение из пула она не берёт, пока нет запросов).
+    """
+    return build_repository(db)
+
+
+@asynccontextmanager
+async def open_repository() -> AsyncIterator[PartRepository]:
+    """Хранилище вне HTTP-запроса (фоновые задачи, скрипты) со своей сессией."""
+    async with get_async_session_factory()() as session:
+        yield build_repository(session)
+
+
+def build_repository(db: AsyncSession) -> PartRepository:
+    """Реализация PartRepository по настройке PARTS_BACKEND поверх сессии db."""
+    # Импорты внутри функции: реализации сами импортируют этот модуль
+    from app.services.memory_repository import MemoryPartRepository, garage
+    from app.services.sql_repository import CorePartRepository, OrmPartRepository
+
+    settings = get_settings()
+    if settings.parts_backend == "memory":
+        repository: PartRepository = MemoryPartRepository(garage)
+    elif settings.parts_backend == "core":
+        repository = CorePartRepository(db)
+    else:
+        repository = OrmPartRepository(db)
+
+    if settings.group_commit_enabled and settings.parts_backend != "memory":
+        from app.services.group_commit import GroupCommitRepository, get_group_commit_writer
+
+        # Одиночные записи — общей транзакцией с записями параллельных запросов
+        repository = GroupCommitRepository(  # type: ignore[assignment]
+            repository, get_group_commit_writer()
+        )
+
+    if settings.profiling_enabled:
+        from app.core.profiling import ProfiledRepository
+
+        # Время в хранилище минус время SQL = «гидрация» (строки → словари)
+        return ProfiledRepository(repository)  # type: ignore[return-value]
+    return repository
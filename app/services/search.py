@@ -0,0 +1,63 @@
+"""
+РАЗБОР ПОИСКОВОГО ЗАПРОСА (GET /parts/search?q=...)
+
+Общие правила для всех хранилищ:
+1. Запрос режется на слова (буквы и цифры), регистр не важен.
+2. Каждое слово ищется как ПРЕФИКС слова в названии или номере:
+   «фильт» найдёт «фильтр», «OIL-0» найдёт «OIL-001».
+3. Русские окончания отрезаются (очень простой стемминг): «колодки»
+   превращается в префикс «колодк» и находит и «колодка», и «колодки».
+   PostgreSQL дополнительно приводит слова к основе словарём russian.
+4. Если запрос похож на начало каталожного номера (ABC-123), запчасти
+   с таким префиксом номера идут первыми.
+"""
+
+import re
+from typing import List, Optional
+
+# Слова: последовательности букв/цифр (дефис и пробелы — разделители)
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Начало каталожного номера формата ABC-123: «O», «OIL», «OIL-», «OIL-00»
+PART_NUMBER_PREFIX = re.compile(r"^[A-Z]{1,3}(-\d{0,3})?$")
+
+# Частые окончания русских существительных и прилагательных (длинные — первыми)
+RUSSIAN_ENDINGS = (
+    "ами", "ями", "ого", "его", "ому", "ему", "ыми", "ими",
+    "ая", "яя", "ое", "ее", "ые", "ие", "ой", "ей", "ий", "ый", "ов", "ев",
+    "ам", "ям", "ах", "ях", "ом", "ем",
+    "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+)
+MIN_STEM_LENGTH = 4  # короче не режем: «шина» → «шин» уже слишком общее
+MAX_WORDS = 8  # защита от очень длинных запросов
+
+
+def stem(word: str) -> str:
+    """Отрезает русское окончание, если остаётся хотя бы MIN_STEM_LENGTH букв."""
+    for ending in RUSSIAN_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[: -len(ending)]
+    return word
+
+
+def search_terms(query: str) -> List[str]:
+    """Запрос → префиксы слов в нижнем регистре: «Тормозные колодки» → [тормозн, колодк]."""
+    return [stem(word.casefold()) for word in WORD_PATTERN.findall(query)][:MAX_WORDS]
+
+
+def part_number_prefix(query: str) -> Optional[str]:
+    """Начало каталожного номера в верхнем регистре или None."""
+    candidate = query.strip().upper()
+    return candidate if PART_NUMBER_PREFIX.match(candidate) else None
+
+
+def fts5_match(terms: List[str]) -> str:
+    """
+    Выражение MATCH для SQLite FTS5: "колодк"* "тормозн"* (все слова, как префиксы).
+    Каждое слово в кавычках — спецсимволы FTS5 из запроса не интерпретируются.
+    """
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms: List[str]) -> str:
+    """Выражение для to_tsquery в PostgreSQL: колодк:* & тормозн:*."""
+    return " & ".join(f"{term}:*" for term in terms)
@@ -0,0 +1,634 @@
+"""
+ХРАНИЛИЩА ЗАПЧАСТЕЙ НА SQLAlchemy
+
+1. CorePartRepository - SQLAlchemy Core: запросы возвращают строки (Row),
+   ORM-объекты не создаются и не попадают в identity map. Все изменения —
+   одним запросом с RETURNING.
+2. OrmPartRepository - SQLAlchemy ORM: чтение и создание одной запчасти
+   через объекты PartDB (session.get/add).
+   Списки и массовые операции (страницы, upsert, экспорт, подсчёт, остатки)
+   наследуются из Core — для них ORM-объекты только лишняя работа: строки сразу
+   становятся словарями, без identity map и ORM-инструментирования.
+   Изменение (PUT/PATCH) тоже из Core: через ORM это было три запроса
+   (SELECT объекта, UPDATE, SELECT в refresh), а нужен один UPDATE ... RETURNING.
+   Удаление (DELETE) тоже из Core: ORM сначала читал объект, а потом удалял
+   "WHERE version = <прочитанная>" — если между ними строку изменили или
+   удалили, StaleDataError превращался в 412 даже без If-Match. Один
+   DELETE ... WHERE id [AND version] RETURNING отличает 404 от 412 сам.
+"""
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal, or_, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import utc_now
+from app.db.database import get_async_session_factory
+from app.db.models import PartDB, StockMovementDB
+from app.db.routing import same_reads
+from app.services import ledger
+from app.services.exceptions import (
+    DuplicatePartNumber,
+    InsufficientStock,
+    PartNotFound,
+    VersionConflict,
+)
+from app.services.filters import PartFilter
+from app.services.repository import (
+    MOVEMENT_FIELDS,
+    PART_FIELDS,
+    MovementDict,
+    PartDict,
+    PartRepository,
+)
+from app.services.search import fts5_match, part_number_prefix, search_terms, tsquery
+
+# Колонки таблицы в порядке PART_FIELDS
+PART_COLUMNS = tuple(PartDB.__table__.c[field] for field in PART_FIELDS)
+MOVEMENT_COLUMNS = tuple(StockMovementDB.__table__.c[field] for field in MOVEMENT_FIELDS)
+# Сколько запчастей сворачивать за одну транзакцию компакции
+COMPACTION_CHUNK_SIZE = 1000
+# Те же колонки для текстовых запросов поиска (FROM parts AS p)
+_SEARCH_COLUMNS = ", ".join(f"p.{field}" for field in PART_FIELDS)
+
+
+def filter_conditions(filters: PartFilter) -> List[Any]:
+    """PartFilter → список условий WHERE (применяются на стороне БД)."""
+    conditions = []
+    if filters.name is not None:
+        # ILIKE на PostgreSQL; на SQLite без учёта регистра сравнивается только латиница
+        conditions.append(PartDB.name.icontains(filters.name, autoescape=True))
+    if filters.part_number is not None:
+        # autoescape=True экранирует % и _ во вводе пользователя
+        conditions.append(
+            PartDB.part_number.startswith(filters.part_number, autoescape=True)
+        )
+    if filters.storage_location is not None:
+        conditions.append(PartDB.storage_location == filters.storage_location)
+    if filters.min_quantity is not None:
+        conditions.append(PartDB.quantity >= filters.min_quantity)
+    if filters.max_quantity is not None:
+        conditions.append(PartDB.quantity <= filters.max_quantity)
+    return conditions
+
+
+def dialect_insert(session: AsyncSession) -> Callable[..., Any]:
+    """
+    INSERT с поддержкой ON CONFLICT для текущей СУБД.
+    У PostgreSQL и SQLite синтаксис одинаковый, но конструкторы — разные.
+    """
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"INSERT ... ON CONFLICT не поддерживается для {dialect}")
+
+
+class CorePartRepository(PartRepository):
+    """Хранилище на SQLAlchemy Core поверх сессии запроса."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        session_factory: Optional[Callable[..., AsyncSession]] = None,
+    ) -> None:
+        self.session = session
+        # Для потокового экспорта: он работает уже после закрытия сессии запроса
+        self.session_factory = session_factory or get_async_session_factory()
+
+    # ------------------------------------------------------------------
+    # Чтение
+    # ------------------------------------------------------------------
+    async def _one(self, *conditions: Any) -> Optional[PartDict]:
+        row = (
+            (await self.session.execute(select(*PART_COLUMNS).where(*conditions)))
+            .mappings()
+            .first()
+        )
+        return dict(row) if row is not None else None
+
+    async def get(self, part_id: int) -> Optional[PartDict]:
+        return await self._one(PartDB.id == part_id)
+
+    async def get_by_part_number(self, part_number: str) -> Optional[PartDict]:
+        return await self._one(PartDB.part_number == part_number)
+
+    async def get_many(self, ids: List[int], part_numbers: List[str]) -> List[PartDict]:
+        conditions = []
+        if ids:
+            conditions.append(PartDB.id.in_(ids))  # по индексу первичного ключа
+        if part_numbers:
+            conditions.append(PartDB.part_number.in_(part_numbers))  # по UNIQUE-индексу
+        if not conditions:
+            return []
+        rows = await self.session.execute(select(*PART_COLUMNS).where(or_(*conditions)))
+        return [dict(row) for row in rows.mappings()]
+
+    async def list_page(
+        self, filters: PartFilter, after: Optional[int], limit: int
+    ) -> Tuple[List[PartDict], bool]:
+        conditions = filter_conditions(filters)
+        if after is not None:
+            # Keyset: WHERE id > :after ORDER BY id — работает по индексу PK,
+            # стоимость не зависит от того, насколько далеко пролистали
+            conditions.append(PartDB.id > after)
+        # limit + 1: «лишняя» строка говорит, что есть следующая страница
+        query = (
+            select(*PART_COLUMNS)
+            .where(*conditions)
+            .order_by(PartDB.id)
+            .limit(limit + 1)
+        )
+        rows = (await self.session.execute(query)).mappings().all()
+        return [dict(row) for row in rows[:limit]], len(rows) > limit
+
+    async def count(self, filters: PartFilter) -> int:
+        query = select(func.count()).select_from(PartDB).where(*filter_conditions(filters))
+        return (await self.session.execute(query)).scalar_one()
+
+    async def estimate_count(self) -> Optional[int]:
+        if self.session.bind.dialect.name == "postgresql":
+            # Статистика планировщика (обновляется ANALYZE/autovacuum) — O(1)
+            estimate = (
+                await self.session.execute(
+                    text(
+                        "SELECT reltuples::bigint FROM pg_class"
+                        " WHERE oid = 'parts'::regclass"
+                    )
+                )
+            ).scalar()
+            # -1 означает «таблица ещё ни разу не анализировалась»
+            return estimate if estimate is not None and estimate >= 0 else None
+
+        # SQLite: MAX(id) берётся из индекса первичного ключа за O(log n).
+        # Это верхняя граница (удалённые строки не вычитаются), но для оценки хватает.
+        return (await self.session.execute(select(func.max(PartDB.id)))).scalar() or 0
+
+    async def search(self, query: str, limit: int) -> List[PartDict]:
+        terms = search_terms(query)
+        prefix = part_number_prefix(query)
+        if not terms and prefix is None:
+            return []
+        if self.session.bind.dialect.name == "postgresql":
+            statement, params = self._postgres_search(terms, prefix)
+        else:
+            statement, params = self._sqlite_search(terms, prefix)
+        rows = (await self.session.execute(text(statement), {**params, "limit": limit}))
+        return [dict(row) for row in rows.mappings()]
+
+    @staticmethod
+    def _sqlite_search(terms: List[str], prefix: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Два источника кандидатов, объединённые UNION ALL:
+        1. Индекс FTS5 parts_fts: MATCH по префиксам слов, bm25 — релевантность
+           (чем меньше, тем лучше; совпадение в номере весит вдвое больше).
+        2. Диапазон по уникальному индексу part_number: >= 'OIL-0' AND < 'OIL-0\\uffff'
+           (то же, что LIKE 'OIL-0%', но LIKE в SQLite индекс не использует).
+        """
+        branches, params = [], {}
+        if terms:
+            branches.append(
+                "SELECT rowid AS id, 1 AS by_number, bm25(parts_fts, 1.0, 2.0) AS score"
+                " FROM parts_fts WHERE parts_fts MATCH :match"
+            )
+            params["match"] = fts5_match(terms)
+        if prefix is not None:
+            branches.append(
+                "SELECT id, 0 AS by_number, 0.0 AS score FROM parts"
+                " WHERE part_number >= :low AND part_number < :high"
+            )
+            params.update(low=prefix, high=prefix + "\uffff")
+        statement = (
+            # MATERIALIZED: иначе SQLite встраивает CTE в GROUP BY, а bm25()
+            # допустима только прямо в запросе к parts_fts
+            f"WITH hits AS MATERIALIZED ({' UNION ALL '.join(branches)}),"
+            " ranked AS (SELECT id, MIN(by_number) AS by_number, MIN(score) AS score"
+            " FROM hits GROUP BY id)"
+            f" SELECT {_SEARCH_COLUMNS} FROM ranked JOIN parts AS p ON p.id = ranked.id"
+            " ORDER BY ranked.by_number, ranked.score, p.id LIMIT :limit"
+        )
+        return statement, params
+
+    @staticmethod
+    def _postgres_search(terms: List[str], prefix: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Условия объединены через OR — каждое обслуживает свой индекс (BitmapOr):
+        search_vector @@ tsquery   - GIN по tsvector (слова с основами, префиксы :*)
+        :phrase <% name            - GIN pg_trgm: похожие слова, опечатки («колотки»)
+        part_number LIKE 'OIL-0%'  - индекс text_pattern_ops
+        Ранжирование: совпадение номера, затем ts_rank + word_similarity.
+        """
+        conditions, params = [], {"phrase": " ".join(terms), "prefix": f"{prefix or ''}%"}
+        rank = "0"
+        if terms:
+            conditions += [
+                "p.search_vector @@ to_tsquery('russian', :tsquery)",
+                ":phrase <% p.name",
+            ]
+            params["tsquery"] = tsquery(terms)
+            rank = (
+                "ts_rank(p.search_vector, to_tsquery('russian', :tsquery))"
+                " + word_similarity(:phrase, p.name)"
+            )
+        if prefix is not None:
+            conditions.append("p.part_number LIKE :prefix")
+        statement = (
+            f"SELECT {_SEARCH_COLUMNS} FROM parts AS p WHERE {' OR '.join(conditions)}"
+            f" ORDER BY (p.part_number LIKE :prefix) DESC, {rank} DESC, p.id"
+            " LIMIT :limit"
+        )
+        return statement, params
+
+    async def stats(
+        self, low_stock_threshold: int, per_location: int
+    ) -> Tuple[List[Dict[str, Any]], List[PartDict]]:
+        # 1. Места хранения: один проход GROUP BY, в приложение приходят
+        #    только строки-итоги (по одной на место хранения)
+        stock_value = func.coalesce(func.sum(PartDB.price * PartDB.quantity), 0.0)
+        locations = await self.session.execute(
+            select(
+                PartDB.storage_location,
+                func.count().label("part_count"),
+                func.coalesce(func.sum(PartDB.quantity), 0).label("total_quantity"),
+                func.count(PartDB.price).label("priced_parts"),
+                stock_value.label("stock_value"),
+            )
+            .group_by(PartDB.storage_location)
+            .order_by(stock_value.desc(), func.count().desc())
+        )
+        # 2. Заканчивающиеся: WHERE quantity <= :порог по индексу ix_parts_quantity,
+        #    ROW_NUMBER() нумерует их внутри каждого места хранения — берём первые per_location
+        ranked = (
+            select(
+                *PART_COLUMNS,
+                func.row_number()
+                .over(
+                    partition_by=PartDB.storage_location,
+                    order_by=(PartDB.quantity, PartDB.id),
+                )
+                .label("location_rank"),
+            )
+            .where(PartDB.quantity <= low_stock_threshold)
+            .subquery()
+        )
+        low_stock = await self.session.execute(
+            select(*(ranked.c[field] for field in PART_FIELDS))
+            .where(ranked.c.location_rank <= per_location)
+            .order_by(ranked.c.quantity, ranked.c.id)
+        )
+        return (
+            [dict(row) for row in locations.mappings()],
+            [dict(row) for row in low_stock.mappings()],
+        )
+
+    async def ping(self) -> None:
+        await self.session.execute(text("SELECT 1"))
+
+    # ------------------------------------------------------------------
+    # Журнал движений остатков
+    # ------------------------------------------------------------------
+    async def _record(self, movements: List[MovementDict]) -> None:
+        """Дописывает движения в журнал в текущей транзакции (один executemany)."""
+        if movements:
+            await self.session.execute(insert(StockMovementDB), movements)
+
+    async def list_movements(
+        self, part_id: int, before: Optional[int], limit: int
+    ) -> Tuple[List[MovementDict], bool]:
+        conditions = [StockMovementDB.part_id == part_id]
+        if before is not None:
+            conditions.append(StockMovementDB.id < before)
+        # Keyset от новых к старым по индексу (part_id, id)
+        query = (
+            select(*MOVEMENT_COLUMNS)
+            .where(*conditions)
+            .order_by(StockMovementDB.id.desc())
+            .limit(limit + 1)
+        )
+        rows = (await self.session.execute(query)).mappings().all()
+        return [dict(row) for row in rows[:limit]], len(rows) > limit
+
+    async def compact_movements(self, older_than: datetime) -> int:
+        movements = StockMovementDB.__table__
+        # Граница по id: всё, что записано до последнего «старого» движения
+        boundary = (
+            await self.session.execute(
+                select(func.max(movements.c.id)).where(movements.c.created_at < older_than)
+            )
+        ).scalar()
+        if boundary is None:
+            return 0
+        # Сворачивать есть что только у запчастей с двумя и более старыми строками
+        part_ids = (
+            await self.session.execute(
+                select(movements.c.part_id)
+                .where(movements.c.id <= boundary)
+                .group_by(movements.c.part_id)
+                .having(func.count() > 1)
+            )
+        ).scalars().all()
+
+        removed = 0
+        # Кусками по COMPACTION_CHUNK_SIZE запчастей: короткие транзакции
+        # не держат блокировки журнала, пока сворачиваются миллионы строк
+        for start in range(0, len(part_ids), COMPACTION_CHUNK_SIZE):
+            chunk = part_ids[start:start + COMPACTION_CHUNK_SIZE]
+            old = (movements.c.id <= boundary, movements.c.part_id.in_(chunk))
+            last_ids = select(func.max(movements.c.id)).where(*old).group_by(movements.c.part_id)
+            compacted = movements.alias("compacted")
+            total = (
+                select(func.sum(compacted.c.delta))
+                .where(compacted.c.part_id == movements.c.part_id, compacted.c.id <= boundary)
+                .scalar_subquery()
+            )
+            # 1. Последняя старая строка каждой запчасти становится снимком
+            await self.session.execute(
+                update(movements)
+                .where(movements.c.id.in_(last_ids))
+                .values(delta=total, kind=ledger.SNAPSHOT)
+            )
+            # 2. Остальные старые строки удаляются
+            result = await self.session.execute(
+                delete(movements).where(*old, movements.c.id.not_in(last_ids))
+            )
+            removed += result.rowcount
+            await self.session.commit()
+        return removed
+
+    async def iter_all(self, chunk_size: int) -> AsyncIterator[List[PartDict]]:
+        # Своя сессия, но читает оттуда же, что и сессия запроса (реплика для GET)
+        async with self.session_factory(**same_reads(self.session)) as session:
+            result = await session.stream(
+                select(*PART_COLUMNS)
+                .order_by(PartDB.id)
+                .execution_options(yield_per=chunk_size)
+                #                  └── курсор на стороне сервера, строки приходят пачками
+            )
+            async for rows in result.mappings().partitions():
+                yield [dict(row) for row in rows]
+
+    # ------------------------------------------------------------------
+    # Запись: один запрос с RETURNING вместо SELECT + UPDATE + SELECT
+    # ------------------------------------------------------------------
+    async def _commit(self) -> None:
+        """
+        Фиксация одиночной записи (create / update / delete / adjust_stock).
+        В режиме группового коммита (app/services/group_commit.py) _commit и
+        _rollback переопределены: запись остаётся в общей транзакции пачки.
+        """
+        await self.session.commit()
+
+    async def _rollback(self) -> None:
+        """Откат одиночной записи после ошибки (DuplicatePartNumber, PartNotFound, ...)."""
+        await self.session.rollback()
+
+    async def create(self, data: Dict[str, Any]) -> PartDict:
+        try:
+            row = (
+                (
+                    await self.session.execute(
+                        insert(PartDB).values(**data).returning(*PART_COLUMNS)
+                    )
+                )
+                .mappings()
+                .one()
+            )
+        except IntegrityError:
+            # Единственное ограничение, которое может нарушить клиент, — UNIQUE(part_number)
+            await self._rollback()
+            raise DuplicatePartNumber(data.get("part_number"))
+        quantity = row["quantity"] or 0
+        await self._record([ledger.movement(row["id"], quantity, quantity, ledger.CREATE)])
+        await self._commit()
+        return dict(row)
+
+    async def _missing_or_conflict(self, part_id: int) -> Exception:
+        """Запрос не задел ни одной строки: запчасти нет или версия не совпала?"""
+        exists = (
+            await self.session.execute(select(PartDB.id).where(PartDB.id == part_id))
+        ).first()
+        return VersionConflict(part_id) if exists else PartNotFound(part_id)
+
+    async def update(
+        self,
+        part_id: int,
+        data: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> PartDict:
+        # Один UPDATE ... RETURNING только по переданным колонкам (PATCH передаёт
+        # лишь изменённые поля, PUT — все). Без предварительного SELECT и без refresh.
+        conditions = [PartDB.id == part_id]
+        if expected_version is not None:
+            conditions.append(PartDB.version == expected_version)
+        if "quantity" in data:
+            # Остаток меняется — сначала запись в журнал. Прежний остаток читает сам
+            # INSERT ... SELECT (без отдельного запроса), FOR UPDATE в PostgreSQL
+            # блокирует строку до конца транзакции, чтобы delta была точной.
+            # Если UPDATE ниже не найдёт строку, откат уберёт и эту запись.
+            await self.session.execute(
+                insert(StockMovementDB).from_select(
+                    ["part_id", "delta", "quantity_after", "kind", "created_at"],
+                    select(
+                        PartDB.id,
+                        data["quantity"] - PartDB.quantity,
+                        literal(data["quantity"]),
+                        literal(ledger.UPDATE),
+                        literal(utc_now()),
+                    )
+                    .where(*conditions, PartDB.quantity != data["quantity"])
+                    .with_for_update(),
+                )
+            )
+        statement = (
+            update(PartDB)
+            .where(*conditions)
+            # версию строки (для ETag) увеличиваем сами — ORM здесь не участвует
+            .values(**data, version=PartDB.version + 1)
+            .returning(*PART_COLUMNS)
+        )
+        try:
+            row = (await self.session.execute(statement)).mappings().first()
+        except IntegrityError:
+            await self._rollback()
+            raise DuplicatePartNumber(data.get("part_number"))
+        if row is None:
+            error = await self._missing_or_conflict(part_id)
+            await self._rollback()
+            raise error
+        await self._commit()
+        return dict(row)
+
+    async def delete(
+        self, part_id: int, expected_version: Optional[int] = None
+    ) -> PartDict:
+        conditions = [PartDB.id == part_id]
+        if expected_version is not None:
+            conditions.append(PartDB.version == expected_version)
+        row = (
+            (
+                await self.session.execute(
+                    delete(PartDB).where(*conditions).returning(*PART_COLUMNS)
+                )
+            )
+            .mappings()
+            .first()
+        )
+        if row is None:
+            error = await self._missing_or_conflict(part_id)
+            await self._rollback()
+            raise error
+        quantity = row["quantity"] or 0
+        await self._record([ledger.movement(part_id, -quantity, 0, ledger.DELETE)])
+        await self._commit()
+        return dict(row)
+
+    # ------------------------------------------------------------------
+    # Остатки: UPDATE ... SET quantity = quantity + :delta прямо в БД.
+    # Нет чтения перед записью, поэтому два одновременных списания не теряют
+    # друг друга (строку блокирует сам UPDATE), а условие quantity + :delta >= 0
+    # проверяется в том же запросе — остаток не уходит в минус.
+    # ------------------------------------------------------------------
+    async def _apply_stock(self, part_id: int, delta: int) -> PartDict:
+        """Одно изменение остатка внутри текущей транзакции (без commit)."""
+        statement = (
+            update(PartDB)
+            .where(PartDB.id == part_id, PartDB.quantity + delta >= 0)
+            .values(quantity=PartDB.quantity + delta, version=PartDB.version + 1)
+            .returning(*PART_COLUMNS)
+        )
+        row = (await self.session.execute(statement)).mappings().first()
+        if row is not None:
+            return dict(row)
+        # Строку не задели: запчасти нет или остатка не хватает
+        available = (
+            await self.session.execute(select(PartDB.quantity).where(PartDB.id == part_id))
+        ).scalar()
+        if available is None:
+            raise PartNotFound(part_id)
+        raise InsufficientStock(part_id, available, delta)
+
+    async def adjust_stock(self, part_id: int, delta: int) -> PartDict:
+        try:
+            part = await self._apply_stock(part_id, delta)
+        except (PartNotFound, InsufficientStock):
+            await self._rollback()
+            raise
+        await self._record([ledger.movement(part_id, delta, part["quantity"], ledger.ADJUST)])
+        await self._commit()
+        return part
+
+    async def adjust_stock_many(self, deltas: List[Tuple[int, int]]) -> List[PartDict]:
+        # Строки блокируются в порядке id: два пакета с общими запчастями не
+        # возьмут блокировки крест-накрест (deadlock в PostgreSQL).
+        # Сортировка устойчивая — изменения одной запчасти идут в исходном порядке.
+        order = sorted(range(len(deltas)), key=lambda index: deltas[index][0])
+        results: List[Optional[PartDict]] = [None] * len(deltas)
+        try:
+            for index in order:
+                results[index] = await self._apply_stock(*deltas[index])
+        except (PartNotFound, InsufficientStock):
+            await self.session.rollback()  # откатываем всю пачку
+            raise
+        # Журнал — в порядке применения, одним executemany
+        await self._record(
+            [
+                # *deltas[index] — это (part_id, delta)
+                ledger.movement(*deltas[index], results[index]["quantity"], ledger.ADJUST)
+                for index in order
+            ]
+        )
+        await self.session.commit()  # одна транзакция (и один fsync) на пачку
+        return results
+
+    async def upsert_many(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[Tuple[str, int, bool]]:
+        part_numbers = [row["part_number"] for row in rows]
+
+        # 1. Какие part_number уже есть — чтобы отличить created от updated,
+        #    и их прежние остатки — для delta в журнале (FOR UPDATE в PostgreSQL)
+        result = await self.session.execute(
+            select(PartDB.part_number, PartDB.quantity)
+            .where(PartDB.part_number.in_(part_numbers))
+            .with_for_update()
+        )
+        existing = {part_number: quantity for part_number, quantity in result}
+
+        # 2. Один многострочный INSERT ... ON CONFLICT DO UPDATE на всю пачку
+        statement = dialect_insert(self.session)(PartDB).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[PartDB.part_number],
+            # excluded — строка, которую пытались вставить
+            set_={
+                column: getattr(statement.excluded, column)
+                for column in rows[0]
+                if column != "part_number"
+            }
+            # Core-запрос: версию строки (для ETag) увеличиваем сами
+            | {"version": PartDB.version + 1},
+        ).returning(PartDB.id, PartDB.part_number, PartDB.quantity)
+        # Порядок строк в RETURNING не гарантирован — сопоставляем по part_number
+        returned = {row.part_number: row for row in await self.session.execute(statement)}
+        ids = {part_number: row.id for part_number, row in returned.items()}
+        await self._record(
+            [
+                ledger.movement(
+                    row.id,
+                    (row.quantity or 0) - (existing.get(part_number) or 0),
+                    row.quantity or 0,
+                    ledger.IMPORT if part_number in existing else ledger.CREATE,
+                )
+                for part_number, row in returned.items()
+                if part_number not in existing or row.quantity != existing[part_number]
+            ]
+        )
+        await self.session.commit()  # фиксируем пачку: результат по ней окончательный
+
+        return [
+            (part_number, ids[part_number], part_number not in existing)
+            for part_number in part_numbers
+        ]
+
+
+class OrmPartRepository(CorePartRepository):
+    """
+    Хранилище на SQLAlchemy ORM: одиночные операции через объекты PartDB.
+    update() и delete() — одним запросом с RETURNING из CorePartRepository.
+    """
+
+    async def get(self, part_id: int) -> Optional[PartDict]:
+        # session.get() сначала смотрит в identity map сессии, потом в БД
+        part = await self.session.get(PartDB, part_id)
+        return part.to_dict() if part is not None else None
+
+    async def get_by_part_number(self, part_number: str) -> Optional[PartDict]:
+        part = (
+            await self.session.execute(
+                select(PartDB).where(PartDB.part_number == part_number)
+            )
+        ).scalar_one_or_none()
+        return part.to_dict() if part is not None else None
+
+    async def create(self, data: Dict[str, Any]) -> PartDict:
+        # 1. Создаём объект модели: PartDB(**data) = PartDB(name=..., part_number=..., ...)
+        db_part = PartDB(**data)
+        # 2. Добавляем в сессию (пока только в памяти, SQL ещё не выполнен)
+        self.session.add(db_part)
+        try:
+            # 3. Отправляем INSERT INTO parts ... (await — не блокируем event loop);
+            #    после flush у объекта есть id, назначенный базой
+            await self.session.flush()
+        except IntegrityError:
+            await self.session.rollback()
+            raise DuplicatePartNumber(data.get("part_number"))
+        # 4. Начальный остаток — в журнал, в той же транзакции
+        quantity = db_part.quantity or 0
+        await self._record([ledger.movement(db_part.id, quantity, quantity, ledger.CREATE)])
+        # 5. Фиксируем. refresh() (лишний SELECT) не нужен: id пришёл при flush,
+        #    значения по умолчанию (quantity, version) ORM подставил сам
+        await self.session.commit()
+        return db_part.to_dict()
@@ -0,0 +1,256 @@
+"""
+СВОДКА ПО СКЛАДУ (GET /parts/stats)
+
+Назначение: стоимость склада (price * quantity), разбивка по местам хранения и
+список заканчивающихся запчастей. Раньше для этого пришлось бы вытянуть в
+приложение всю таблицу. Теперь всё считает БД (см. PartRepository.stats):
+    места хранения - GROUP BY storage_location: COUNT, SUM(quantity), SUM(price * quantity)
+    заканчивается  - WHERE quantity <= :порог (по индексу ix_parts_quantity),
+                     ROW_NUMBER() OVER (PARTITION BY storage_location ORDER BY quantity)
+                     — не больше N самых «пустых» запчастей на каждое место хранения
+Итоги по складу складываются из строк мест хранения — отдельный запрос не нужен.
+
+КЭШ (StatsCache)
+Агрегаты — это полный проход по таблице, поэтому сводка кэшируется на
+STATS_CACHE_TTL секунд. Между пересчётами её поправляют сами записи:
+    создание / удаление / приход и списание - сдвиг счётчиков нужного места хранения
+        (старое и новое состояние известны: delta и строка из RETURNING);
+    PUT / PATCH / POST /parts/bulk - старые значения неизвестны → сводка сбрасывается
+        и пересчитывается при следующем запросе.
+Запчасть, которая была или стала «заканчивающейся», тоже сбрасывает сводку:
+список по окну ROW_NUMBER сдвигом счётчиков не поправить.
+
+Кэш у каждого процесса свой: изменения, сделанные другим воркером, становятся
+видны не позже чем через STATS_CACHE_TTL.
+
+Число запчастей для GET /health берётся отсюда же (part_count): COUNT(*) по
+всей таблице выполняется не чаще раза в TTL, а не на каждую проверку.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.clock import utc_now
+from app.core.config import get_settings
+from app.services.filters import PartFilter
+from app.services.repository import PartDict, PartRepository
+
+# Строка сводки по месту хранения (см. PartRepository.stats)
+LocationStats = Dict[str, Any]
+LOCATION_COUNTERS = ("part_count", "total_quantity", "priced_parts", "stock_value")
+
+# Сколько разных (порог, на_место) держать в кэше одновременно
+MAX_SNAPSHOTS = 16
+
+
+def summarize(locations: List[LocationStats]) -> Dict[str, Any]:
+    """Итоги по складу — сумма строк мест хранения."""
+    return {
+        counter: sum(location[counter] for location in locations)
+        for counter in LOCATION_COUNTERS
+    }
+
+
+def _sort_locations(locations: List[LocationStats]) -> None:
+    # Сначала самые «дорогие» места хранения, при равенстве — по числу запчастей
+    # и по имени (порядок не должен зависеть от того, пересчитана сводка или поправлена)
+    locations.sort(
+        key=lambda location: (
+            -location["stock_value"],
+            -location["part_count"],
+            location["storage_location"] is None,
+            location["storage_location"] or "",
+        )
+    )
+
+
+@dataclass
+class StatsSnapshot:
+    """Посчитанная сводка для одного порога и лимита на место хранения."""
+
+    locations: List[LocationStats]
+    low_stock: List[PartDict]
+    computed_at: datetime  # когда сводку целиком посчитала БД
+    expires: float  # time.monotonic(), после которого нужен пересчёт
+
+    def shift(self, part: PartDict, quantity_delta: int, part_delta: int) -> None:
+        """Поправить счётчики места хранения запчасти part."""
+        location = next(
+            (
+                location
+                for location in self.locations
+                if location["storage_location"] == part["storage_location"]
+            ),
+            None,
+        )
+        if location is None:
+            location = {"storage_location": part["storage_location"]}
+            location.update(dict.fromkeys(LOCATION_COUNTERS, 0))
+            self.locations.append(location)
+
+        location["part_count"] += part_delta
+        location["total_quantity"] += quantity_delta
+        if part["price"] is not None:
+            location["priced_parts"] += part_delta
+            location["stock_value"] += quantity_delta * part["price"]
+        if location["part_count"] == 0:
+            self.locations.remove(location)
+        _sort_locations(self.locations)
+
+
+class StatsCache:
+    """
+    Сводки по складу с TTL, которые поправляются при записи.
+    Один экземпляр на процесс (get_stats_cache); всё работает в одном event loop,
+    поэтому между await состояние меняет только текущая корутина.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._snapshots: Dict[Tuple[int, int], StatsSnapshot] = {}
+        self._count: Optional[int] = None
+        self._count_expires = 0.0
+        # Номер «поколения» данных: растёт при каждой записи. Если за время
+        # пересчёта прошла запись, результат может её не учитывать — не кэшируем его.
+        self._generation = 0
+        # Одновременные запросы сводки ждут один пересчёт, а не запускают свои
+        self._lock = asyncio.Lock()
+        self.recomputes = 0
+        self.hits = 0
+
+    # ------------------------------------------------------------------
+    # Чтение
+    # ------------------------------------------------------------------
+    async def get(
+        self, repository: PartRepository, threshold: int, per_location: int
+    ) -> Dict[str, Any]:
+        key = (threshold, per_location)
+        snapshot = self._fresh(key)
+        if snapshot is None:
+            async with self._lock:
+                snapshot = self._fresh(key)  # пока ждали, мог посчитать другой запрос
+                if snapshot is None:
+                    snapshot = await self._compute(repository, key)
+                else:
+                    self.hits += 1
+        else:
+            self.hits += 1
+        summary = summarize(snapshot.locations)
+        return {
+            "summary": {**summary, "stock_value": round(summary["stock_value"], 2)},
+            # копии: снимок продолжит меняться, пока ответ ещё сериализуется
+            "locations": [
+                {
+                    **location,
+                    "stock_value": round(location["stock_value"], 2),
+                    "value_share": (
+                        round(location["stock_value"] / summary["stock_value"], 4)
+                        if summary["stock_value"]
+                        else None
+                    ),
+                }
+                for location in snapshot.locations
+            ],
+            "low_stock": {
+                "threshold": threshold,
+                "per_location": per_location,
+                "parts": snapshot.low_stock,
+            },
+            "computed_at": snapshot.computed_at,
+        }
+
+    async def part_count(self, repository: PartRepository) -> int:
+        """Число запчастей из кэша; COUNT(*) — не чаще раза в TTL."""
+        if self._count is None or self._count_expires <= time.monotonic():
+            generation = self._generation
+            count = await repository.count(PartFilter())
+            if generation != self._generation:
+                return count
+            self._count, self._count_expires = count, time.monotonic() + self.ttl
+        return self._count
+
+    def _fresh(self, key: Tuple[int, int]) -> Optional[StatsSnapshot]:
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.expires > time.monotonic():
+            return snapshot
+        return None
+
+    async def _compute(
+        self, repository: PartRepository, key: Tuple[int, int]
+    ) -> StatsSnapshot:
+        generation = self._generation
+        locations, low_stock = await repository.stats(*key)
+        self.recomputes += 1
+        _sort_locations(locations)
+        snapshot = StatsSnapshot(locations, low_stock, utc_now(), time.monotonic() + self.ttl)
+        if generation == self._generation:
+            self._snapshots.pop(key, None)
+            if len(self._snapshots) >= MAX_SNAPSHOTS:
+                # Вытесняем самую старую сводку (dict хранит порядок вставки)
+                del self._snapshots[next(iter(self._snapshots))]
+            self._snapshots[key] = snapshot
+            self._count = summarize(locations)["part_count"]
+            self._count_expires = snapshot.expires
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Поправки при записи (вызываются обработчиками после успешной записи)
+    # ------------------------------------------------------------------
+    def part_created(self, part: PartDict) -> None:
+        self._shift(part, part["quantity"], 1)
+
+    def part_deleted(self, part: PartDict) -> None:
+        self._shift(part, -part["quantity"], -1)
+
+    def stock_adjusted(self, part: PartDict, delta: int) -> None:
+        """part — состояние после изменения, delta — на сколько изменилось количество."""
+        self._shift(part, delta, 0)
+
+    def part_updated(self) -> None:
+        """PUT/PATCH: прежние значения неизвестны — сводки пересчитаются."""
+        self._generation += 1
+        self._snapshots.clear()
+
+    def parts_imported(self, created: int) -> None:
+        """POST /parts/bulk: created — сколько запчастей создано (остальные обновлены)."""
+        self.part_updated()
+        if self._count is not None:
+            self._count += created
+
+    def _shift(self, part: PartDict, quantity_delta: int, part_delta: int) -> None:
+        self._generation += 1
+        if self._count is not None:
+            self._count += part_delta
+        for (threshold, per_location), snapshot in list(self._snapshots.items()):
+            if part["quantity"] <= threshold or any(
+                item["id"] == part["id"] for item in snapshot.low_stock
+            ):
+                del self._snapshots[(threshold, per_location)]
+                continue
+            snapshot.shift(part, quantity_delta, part_delta)
+
+    def info(self) -> Dict[str, Any]:
+        """Состояние кэша сводок (для GET /health)."""
+        return {
+            "ttl": self.ttl,
+            "snapshots": len(self._snapshots),
+            "hits": self.hits,
+            "recomputes": self.recomputes,
+        }
+
+
+# ----------------------------------------------------------------------
+# ЕДИНСТВЕННЫЙ ЭКЗЕМПЛЯР НА ПРОЦЕСС
+# ----------------------------------------------------------------------
+_stats_cache: Optional[StatsCache] = None
+
+
+def get_stats_cache() -> StatsCache:
+    """Зависимость FastAPI: общий для всех запросов кэш сводок по складу."""
+    global _stats_cache
+    if _stats_cache is None:
+        _stats_cache = StatsCache(get_settings().stats_cache_ttl)
+    return _stats_cache
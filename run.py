@@ -5,6 +5,9 @@
 Главная точка входа в приложение Garage API
 Запуск: python run.py
 
+Режим разработки: один процесс и перезагрузка при изменении кода.
+Для продакшена — python serve.py (несколько воркеров, uvloop, корректная остановка).
+
 💡 Преимущества этого подхода:
 
     ✅ Запуск из любой директории (если в корне проекта)
@@ -0,0 +1,165 @@
+# scripts/benchmark_json.py
+"""
+Бенчмарк сериализации ответа со списком запчастей (по умолчанию 10 000 строк)
+
+Сравнивает прежний путь ответа GET /parts с новым:
+
+Гидрация (чтение из SQLite в памяти):
+    orm_objects   - select(PartDB): ORM-объекты + to_dict() (как было)
+    core_rows     - select(колонки): строки → словари, без ORM-объектов
+
+Кодирование в JSON уже прочитанных словарей:
+    jsonable+json     - jsonable_encoder + json.dumps (путь JSONResponse по умолчанию)
+    model+jsonable    - PartResponse.model_validate на каждую строку + jsonable_encoder
+                        + json.dumps (путь response_model в старых версиях FastAPI)
+    jsonable+orjson   - jsonable_encoder + orjson (FastJSONResponse)
+    type_adapter      - PART_PAGE_ADAPTER.validate_python + dump_json (новый путь)
+
+Запуск:
+    python scripts/benchmark_json.py
+    python scripts/benchmark_json.py --rows 50000 --repeat 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.responses import json_dumps  # noqa: E402
+from app.db.models import Base, PartDB  # noqa: E402
+from app.schemas.part import PART_PAGE_ADAPTER, PartResponse  # noqa: E402
+from app.services.sql_repository import PART_COLUMNS  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Запускает function repeat раз (после одного прогрева), время в мс."""
+    function()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "best_ms": round(min(timings), 2),
+        "median_ms": round(statistics.median(timings), 2),
+    }
+
+
+def seed(rows: int) -> Any:
+    engine = create_engine("sqlite://")  # база в памяти
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(PartDB),
+            [
+                {
+                    "name": f"Масляный фильтр {index}",
+                    # формат AAA-000, как требует PartResponse
+                    "part_number": "{}{}{}-{:03d}".format(
+                        *(chr(65 + index // 1000 // 26**power % 26) for power in (2, 1, 0)),
+                        index % 1000,
+                    ),
+                    "quantity": index % 50,
+                    "storage_location": "Стеллаж A1" if index % 2 else None,
+                    "price": index * 1.5 if index % 3 else None,
+                }
+                for index in range(rows)
+            ],
+        )
+    return engine
+
+
+def print_table(title: str, results: Dict[str, Dict[str, float]], baseline: str) -> None:
+    print(f"\n{title}")
+    base = results[baseline]["median_ms"]
+    for name, result in results.items():
+        speedup = base / result["median_ms"] if result["median_ms"] else float("inf")
+        result["speedup"] = round(speedup, 2)
+        print(
+            f"   {name:<18} median={result['median_ms']:>9.2f} ms"
+            f"  best={result['best_ms']:>9.2f} ms  x{speedup:.2f}"
+        )
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", help="Записать результат в JSON-файл")
+    args = parser.parse_args(argv)
+
+    print(f"⚡ Сериализация списка из {args.rows} запчастей")
+    print("=" * 40)
+    engine = seed(args.rows)
+
+    # 1. Гидрация: ORM-объекты против строк Core
+    def orm_objects() -> List[Dict[str, Any]]:
+        with Session(engine) as session:
+            return [part.to_dict() for part in session.scalars(select(PartDB))]
+
+    def core_rows() -> List[Dict[str, Any]]:
+        with engine.connect() as connection:
+            return [dict(row) for row in connection.execute(select(*PART_COLUMNS)).mappings()]
+
+    hydration = {
+        "orm_objects": measure(orm_objects, args.repeat),
+        "core_rows": measure(core_rows, args.repeat),
+    }
+    print_table("Гидрация (SQLite в памяти → словари):", hydration, "orm_objects")
+
+    # 2. Кодирование страницы в JSON
+    parts = core_rows()
+    page = {"total": len(parts), "parts": parts, "next_after": None}
+
+    def jsonable_json() -> bytes:
+        content = jsonable_encoder(page)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def model_jsonable() -> bytes:
+        models = [PartResponse.model_validate(part) for part in parts]
+        content = jsonable_encoder({**page, "parts": models})
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def jsonable_orjson() -> bytes:
+        return json_dumps(jsonable_encoder(page))
+
+    def type_adapter() -> bytes:
+        return PART_PAGE_ADAPTER.dump_json(PART_PAGE_ADAPTER.validate_python(page))
+
+    # Все варианты должны давать один и тот же JSON
+    # (у PartResponse другой порядок ключей, поэтому сравниваем разобранный JSON)
+    reference = json.loads(jsonable_json())
+    for variant in (model_jsonable, jsonable_orjson, type_adapter):
+        assert json.loads(variant()) == reference, variant.__name__
+
+    encoding = {
+        "jsonable+json": measure(jsonable_json, args.repeat),
+        "model+jsonable": measure(model_jsonable, args.repeat),
+        "jsonable+orjson": measure(jsonable_orjson, args.repeat),
+        "type_adapter": measure(type_adapter, args.repeat),
+    }
+    print_table("Кодирование страницы в JSON:", encoding, "jsonable+json")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(
+                {"rows": args.rows, "hydration": hydration, "encoding": encoding},
+                output,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"\n📝 Результат записан в {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# scripts/check_read_your_writes.py
+"""
+Проверка маршрутизации на реплики (DATABASE_REPLICA_URLS) и read-your-writes
+
+Приложение запускается в этом процессе (TestClient) с основной базой и одной
+«репликой» — двумя временными файлами SQLite. В реплике есть запчасть-метка,
+которой нет в основной базе: по ней видно, откуда прочитан ответ.
+
+Проверяется:
+    - КАЖДЫЙ маршрут с записью (POST/PUT/PATCH/DELETE роутера /parts, кроме
+      помеченных @read_only_route) возвращает cookie db_primary — в том числе
+      обработчики, которые сами создают Response; маршрут, которого нет в
+      списке ниже, — тоже ошибка (новую запись нужно добавить в проверку);
+    - GET и POST /parts/lookup читают с реплики и cookie не ставят;
+    - с cookie db_primary или заголовком X-Read-Consistency: primary чтение
+      идёт с основного сервера;
+    - GET /parts/{part_id}: прочитанное с реплики в кэш не попадает, а с cookie
+      db_primary кэш не читается (устаревшая запись в кэше не отдаётся).
+
+Запуск (из корня проекта):
+    python -m scripts.check_read_your_writes
+
+Код выхода 0 — всё в порядке, 1 — есть ошибки.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MARKER = {"name": "Только в реплике", "part_number": "REP-001", "quantity": 1}
+
+# (метод, шаблон пути) → запрос: функция от клиента и id запчасти-образца
+WRITES: Dict[Tuple[str, str], Callable[[Any, int], Any]] = {
+    ("POST", "/parts/"): lambda client, part_id: client.post(
+        "/parts/", json={"name": "Свеча", "part_number": "SPK-001", "quantity": 4}
+    ),
+    ("POST", "/parts/bulk"): lambda client, part_id: client.post(
+        "/parts/bulk", json=[{"name": "Ремень", "part_number": "BLT-001", "quantity": 2}]
+    ),
+    ("PUT", "/parts/{part_id}"): lambda client, part_id: client.put(
+        f"/parts/{part_id}", json={"name": "Фильтр", "part_number": "OIL-001", "quantity": 7}
+    ),
+    ("PATCH", "/parts/{part_id}"): lambda client, part_id: client.patch(
+        f"/parts/{part_id}", json={"quantity": 8}
+    ),
+    ("POST", "/parts/{part_id}/stock"): lambda client, part_id: client.post(
+        f"/parts/{part_id}/stock", json={"delta": 1}
+    ),
+    ("POST", "/parts/stock"): lambda client, part_id: client.post(
+        "/parts/stock", json={"items": [{"part_id": part_id, "delta": 1}]}
+    ),
+    # DELETE — последний маршрут роутера: образец удаляется в конце
+    ("DELETE", "/parts/{part_id}"): lambda client, part_id: client.delete(f"/parts/{part_id}"),
+}
+
+
+def prepare(directory: str) -> Tuple[str, str]:
+    """Основная база со схемой и копия-«реплика» с запчастью-меткой."""
+    from sqlalchemy import create_engine
+
+    from app.db.models import Base
+
+    primary = os.path.join(directory, "primary.db")
+    replica = os.path.join(directory, "replica.db")
+    engine = create_engine(f"sqlite:///{primary}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    shutil.copyfile(primary, replica)
+    with sqlite3.connect(replica) as connection:
+        connection.execute(
+            "INSERT INTO parts (name, part_number, quantity, version) VALUES (?, ?, ?, 1)",
+            (MARKER["name"], MARKER["part_number"], MARKER["quantity"]),
+        )
+    return primary, replica
+
+
+def write_routes() -> List[Tuple[str, str]]:
+    """(метод, путь) всех маршрутов роутера /parts с записью, кроме @read_only_route."""
+    from app.api.parts import router
+    from app.db.database import READ_ONLY_ROUTE, SAFE_METHODS
+
+    routes = []
+    for route in router.routes:
+        if getattr(route.endpoint, READ_ONLY_ROUTE, False):
+            continue
+        methods = getattr(route, "methods", None) or ()  # у WebSocket методов нет
+        routes.extend((method, route.path) for method in methods if method not in SAFE_METHODS)
+    return routes
+
+
+def main() -> int:
+    print("🔎 Проверка read-your-writes (реплики для чтения)")
+    print("=" * 40)
+    errors: List[str] = []
+
+    def check(ok: bool, message: str) -> None:
+        print(f"{'✅' if ok else '❌'} {message}")
+        if not ok:
+            errors.append(message)
+
+    with tempfile.TemporaryDirectory() as directory:
+        primary, replica = prepare(directory)
+        # Настройки читаются при создании приложения — задаём их до этого
+        os.environ["DATABASE_URL"] = f"sqlite:///{primary}"
+        os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{replica}"
+
+        from fastapi.testclient import TestClient
+
+        from app.db.database import PRIMARY_COOKIE, READ_CONSISTENCY_HEADER
+        from app.main import app
+        from app.services.cache import get_part_cache
+
+        with TestClient(app) as client:
+
+            def from_replica(**kwargs: Any) -> bool:
+                response = client.post(
+                    "/parts/lookup", json={"part_numbers": [MARKER["part_number"]]}, **kwargs
+                )
+                return response.status_code == 200 and not response.json()["missing_part_numbers"]
+
+            # Чтение: с реплики, без cookie
+            response = client.get("/parts/", params={"search": MARKER["part_number"]})
+            check(
+                PRIMARY_COOKIE not in response.cookies
+                and MARKER["part_number"] in response.text,
+                "GET /parts/ — с реплики, без cookie",
+            )
+            response = client.post(
+                "/parts/lookup", json={"part_numbers": [MARKER["part_number"]]}
+            )
+            check(
+                PRIMARY_COOKIE not in response.cookies and from_replica(),
+                "POST /parts/lookup (@read_only_route) — с реплики, без cookie",
+            )
+            check(
+                not from_replica(headers={READ_CONSISTENCY_HEADER: "primary"}),
+                "X-Read-Consistency: primary — чтение с основного",
+            )
+
+            # GET /parts/{part_id} с реплики — ответ есть, а в кэше его нет
+            cache = get_part_cache()
+            response = client.get("/parts/1")
+            check(
+                response.status_code == 200
+                and response.json()["part_number"] == MARKER["part_number"]
+                and client.portal.call(cache.get_by_id, 1) is None,
+                "GET /parts/{part_id} с реплики — в кэш не кладётся",
+            )
+
+            # Запись: cookie в ответе каждого маршрута
+            part_id = client.post(
+                "/parts/", json={"name": "Фильтр", "part_number": "OIL-001", "quantity": 5}
+            ).json()["id"]
+            routes = write_routes()
+            check(len(routes) >= len(WRITES), f"маршрутов с записью: {len(routes)}")
+            for method, path in routes:
+                request = WRITES.get((method, path))
+                if request is None:
+                    check(False, f"{method} {path} — нет в WRITES этой проверки")
+                    continue
+                client.cookies.clear()
+                response = request(client, part_id)
+                check(
+                    response.status_code < 400 and PRIMARY_COOKIE in response.cookies,
+                    f"{method} {path} — {response.status_code}, cookie {PRIMARY_COOKIE}",
+                )
+
+            # После записи клиент (с cookie) читает с основного
+            check(
+                PRIMARY_COOKIE in client.cookies and not from_replica(),
+                "после записи — чтение с основного",
+            )
+
+            # С cookie — мимо кэша: устаревшая копия (как в кэше другого
+            # воркера, до которого не дошла инвалидация) не отдаётся
+            part = client.post(
+                "/parts/", json={"name": "Фильтр", "part_number": "OIL-002", "quantity": 5}
+            ).json()
+            generation = client.portal.call(cache.generation, part["id"])
+            client.portal.call(cache.put, {**part, "quantity": 0}, generation)
+            response = client.get(f"/parts/{part['id']}")
+            check(
+                PRIMARY_COOKIE in client.cookies
+                and response.status_code == 200
+                and response.json()["quantity"] == 5,
+                "GET /parts/{part_id} с cookie — с основного, мимо кэша",
+            )
+
+    print(f"\n{'✅ Всё в порядке' if not errors else f'❌ Ошибок: {len(errors)}'}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+# scripts/check_repositories.py
+"""
+Общие проверки контракта PartRepository для всех реализаций
+(ORM, Core и Garage в памяти). Каждая проверка запускается на пустом
+хранилище каждого вида; SQL-хранилища работают с временной базой SQLite.
+
+Запуск (из корня проекта):
+    python -m scripts.check_repositories
+
+Код выхода 0 — все хранилища ведут себя одинаково, 1 — есть расхождения.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.clock import utc_now  # noqa: E402
+from app.db.models import Base  # noqa: E402
+from app.services.exceptions import (  # noqa: E402
+    DuplicatePartNumber,
+    InsufficientStock,
+    PartNotFound,
+    VersionConflict,
+)
+from app.services.filters import PartFilter  # noqa: E402
+from app.services.garage import Garage  # noqa: E402
+from app.services.memory_repository import MemoryPartRepository  # noqa: E402
+from app.services.repository import PART_FIELDS, PartRepository  # noqa: E402
+from app.services.sql_repository import (  # noqa: E402
+    CorePartRepository,
+    OrmPartRepository,
+)
+
+OIL = {"name": "Масляный фильтр", "part_number": "OIL-001", "quantity": 5}
+AIR = {"name": "Воздушный фильтр", "part_number": "AIR-002", "quantity": 3}
+
+
+async def expect_error(error_type: type, action: Awaitable) -> None:
+    try:
+        await action
+    except error_type:
+        return
+    raise AssertionError(f"ожидалась ошибка {error_type.__name__}")
+
+
+# ----------------------------------------------------------------------
+# ПРОВЕРКИ (каждая получает пустое хранилище)
+# ----------------------------------------------------------------------
+async def check_create_and_get(repo: PartRepository) -> None:
+    created = await repo.create(OIL)
+    assert tuple(created) == PART_FIELDS, created
+    assert created["version"] == 1 and created["quantity"] == 5
+    assert await repo.get(created["id"]) == created
+    assert await repo.get_by_part_number("OIL-001") == created
+    assert await repo.get(created["id"] + 100) is None
+    assert await repo.get_by_part_number("NOPE") is None
+
+
+async def check_get_many(repo: PartRepository) -> None:
+    oil = await repo.create(OIL)
+    other = await repo.create(AIR)
+    assert await repo.get_many([], []) == []
+    found = await repo.get_many([oil["id"], 999], ["AIR-002", "OIL-001", "NOP-000"])
+    assert sorted(part["id"] for part in found) == [oil["id"], other["id"]]
+    assert next(part for part in found if part["id"] == oil["id"]) == oil
+
+
+async def check_duplicate_part_number(repo: PartRepository) -> None:
+    await repo.create(OIL)
+    await expect_error(DuplicatePartNumber, repo.create({**OIL, "name": "Другой"}))
+    other = await repo.create(AIR)
+    # Смена номера на занятый — тоже DuplicatePartNumber, запчасть не меняется
+    await expect_error(DuplicatePartNumber, repo.update(other["id"], OIL))
+    assert await repo.get(other["id"]) == other
+
+
+async def check_update_versions(repo: PartRepository) -> None:
+    created = await repo.create(OIL)
+    part_id = created["id"]
+    updated = await repo.update(part_id, {**OIL, "quantity": 7}, expected_version=1)
+    assert updated["quantity"] == 7 and updated["version"] == 2, updated
+    # Устаревшая версия из If-Match — конфликт, данные не меняются
+    await expect_error(VersionConflict, repo.update(part_id, OIL, expected_version=1))
+    assert (await repo.get(part_id))["quantity"] == 7
+    # Без expected_version — обновление без проверки
+    assert (await repo.update(part_id, OIL))["version"] == 3
+    await expect_error(PartNotFound, repo.update(part_id + 100, OIL))
+
+
+async def check_delete(repo: PartRepository) -> None:
+    created = await repo.create(OIL)
+    part_id = created["id"]
+    await expect_error(VersionConflict, repo.delete(part_id, expected_version=5))
+    assert await repo.delete(part_id, expected_version=1) == created
+    assert await repo.get(part_id) is None
+    await expect_error(PartNotFound, repo.delete(part_id))
+    # id удалённой запчасти не достаётся новой: иначе совпали бы ETag "<id>-1"
+    assert (await repo.create(OIL))["id"] != part_id
+
+
+async def check_pages_and_filters(repo: PartRepository) -> None:
+    ids = [
+        (await repo.create({"name": f"Bolt {i}", "part_number": f"P-{i:03}", "quantity": i}))["id"]
+        for i in range(10)
+    ]
+    page, has_more = await repo.list_page(PartFilter(), None, 4)
+    assert [part["id"] for part in page] == ids[:4] and has_more
+    page, has_more = await repo.list_page(PartFilter(), ids[7], 4)
+    assert [part["id"] for part in page] == ids[8:] and not has_more
+
+    filters = PartFilter(min_quantity=3, max_quantity=6)
+    page, _ = await repo.list_page(filters, None, 100)
+    assert [part["quantity"] for part in page] == [3, 4, 5, 6]
+    assert await repo.count(filters) == 4
+    assert await repo.count(PartFilter(part_number="P-00")) == 10
+    # Латиница: SQLite сравнивает без учёта регистра только ASCII
+    assert await repo.count(PartFilter(name="bolt 1")) == 1
+    assert await repo.count(PartFilter()) == 10
+    assert (await repo.estimate_count()) >= 10
+
+
+async def check_iter_all(repo: PartRepository) -> None:
+    for i in range(5):
+        await repo.create({"name": "Шина", "part_number": f"TIR-{i}", "quantity": 1})
+    chunks = [chunk async for chunk in repo.iter_all(2)]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    ids = [part["id"] for chunk in chunks for part in chunk]
+    assert ids == sorted(ids)
+
+
+async def check_upsert_many(repo: PartRepository) -> None:
+    existing = await repo.create(OIL)
+    results = await repo.upsert_many([{**OIL, "quantity": 9}, AIR])
+    assert results[0] == ("OIL-001", existing["id"], False), results
+    assert results[1][0] == "AIR-002" and results[1][2] is True
+    updated = await repo.get(existing["id"])
+    assert updated["quantity"] == 9 and updated["version"] == 2
+
+
+async def check_search(repo: PartRepository) -> None:
+    await repo.create(OIL)
+    await repo.create(AIR)
+    brake = await repo.create(
+        {"name": "Тормозные колодки", "part_number": "BRK-001", "quantity": 4}
+    )
+    found = [part["part_number"] for part in await repo.search("фильтры", 10)]
+    assert sorted(found) == ["AIR-002", "OIL-001"], found
+    # Префикс номера — первым, даже если слова совпали и у других запчастей
+    found = [part["part_number"] for part in await repo.search("OIL-0", 10)]
+    assert found[0] == "OIL-001", found
+    assert [part["id"] for part in await repo.search("колодка", 10)] == [brake["id"]]
+    assert await repo.search("масляный", 1) and await repo.search('"*-', 10) == []
+    # Индекс следует за изменениями и удалениями
+    await repo.update(brake["id"], {"name": "Тормозной диск"})
+    assert await repo.search("колодки", 10) == []
+    assert [part["id"] for part in await repo.search("диск", 10)] == [brake["id"]]
+    await repo.delete(brake["id"])
+    assert await repo.search("диск", 10) == []
+
+
+async def check_adjust_stock(repo: PartRepository) -> None:
+    oil = await repo.create(OIL)  # quantity 5
+    air = await repo.create(AIR)  # quantity 3
+    part = await repo.adjust_stock(oil["id"], -5)
+    assert part["quantity"] == 0 and part["version"] == 2, part
+    await expect_error(InsufficientStock, repo.adjust_stock(oil["id"], -1))
+    await expect_error(PartNotFound, repo.adjust_stock(10_000, 1))
+
+    results = await repo.adjust_stock_many([(air["id"], -2), (oil["id"], 4), (air["id"], -1)])
+    assert [part["quantity"] for part in results] == [1, 4, 0], results
+    # Пачка с ошибкой не применяется целиком
+    await expect_error(
+        InsufficientStock, repo.adjust_stock_many([(oil["id"], -4), (air["id"], -1)])
+    )
+    assert (await repo.get(oil["id"]))["quantity"] == 4
+
+
+async def check_movements(repo: PartRepository) -> None:
+    part = await repo.create(OIL)  # quantity 5
+    await repo.adjust_stock(part["id"], -2)
+    await repo.adjust_stock_many([(part["id"], 1)])
+    await repo.update(part["id"], {"quantity": 10})
+    await repo.update(part["id"], {"name": "Фильтр"})  # quantity не менялось — без записи
+    await repo.upsert_many([{**OIL, "quantity": 7}])
+
+    movements, has_more = await repo.list_movements(part["id"], None, 10)
+    assert [m["kind"] for m in movements] == ["import", "update", "adjust", "adjust", "create"]
+    assert [m["delta"] for m in movements] == [-3, 6, 1, -2, 5] and not has_more
+    assert movements[0]["quantity_after"] == 7
+    # Сумма журнала = материализованный остаток
+    assert sum(m["delta"] for m in movements) == (await repo.get(part["id"]))["quantity"]
+
+    page, has_more = await repo.list_movements(part["id"], None, 2)
+    assert has_more and [m["id"] for m in page] == [m["id"] for m in movements[:2]]
+    page, _ = await repo.list_movements(part["id"], page[-1]["id"], 10)
+    assert [m["id"] for m in page] == [m["id"] for m in movements[2:]]
+
+    # Компакция: всё старое сворачивается в один снимок с тем же итогом
+    assert await repo.compact_movements(utc_now() + timedelta(seconds=1)) == 4
+    (snapshot,), _ = await repo.list_movements(part["id"], None, 10)
+    assert snapshot["kind"] == "snapshot" and snapshot["delta"] == 7
+    assert snapshot["id"] == movements[0]["id"] and snapshot["quantity_after"] == 7
+
+    # История переживает удаление запчасти
+    await repo.delete(part["id"])
+    movements, _ = await repo.list_movements(part["id"], None, 10)
+    assert [(m["kind"], m["delta"]) for m in movements] == [("delete", -7), ("snapshot", 7)]
+    # ...и не достаётся новой запчасти (id не используются повторно)
+    other = await repo.create(AIR)
+    movements, _ = await repo.list_movements(other["id"], None, 10)
+    assert [(m["kind"], m["delta"]) for m in movements] == [("create", 3)]
+
+
+async def check_stats(repo: PartRepository) -> None:
+    rows = [  # (номер, количество, место, цена)
+        ("OIL-001", 2, "A1", 10.0),
+        ("SPK-001", 1, "A1", None),
+        ("BRK-001", 0, "A1", 5.0),
+        ("BLT-001", 40, "B2", 2.5),
+        ("LMP-001", 3, None, None),
+    ]
+    for part_number, quantity, location, price in rows:
+        await repo.create(
+            {
+                "name": "Запчасть",
+                "part_number": part_number,
+                "quantity": quantity,
+                "storage_location": location,
+                "price": price,
+            }
+        )
+    await repo.ping()
+
+    locations, low_stock = await repo.stats(3, 2)
+    by_location = {location["storage_location"]: location for location in locations}
+    assert by_location["A1"] == {
+        "storage_location": "A1", "part_count": 3, "total_quantity": 3,
+        "priced_parts": 2, "stock_value": 20.0,
+    }
+    assert by_location["B2"]["stock_value"] == 100.0 and by_location[None]["part_count"] == 1
+    assert [location["storage_location"] for location in locations][0] == "B2"
+    # ROW_NUMBER по месту хранения: из A1 — только две самые «пустые»
+    assert [part["part_number"] for part in low_stock] == ["BRK-001", "SPK-001", "LMP-001"]
+
+
+CHECKS: List[Callable[[PartRepository], Awaitable[None]]] = [
+    check_create_and_get,
+    check_get_many,
+    check_duplicate_part_number,
+    check_update_versions,
+    check_delete,
+    check_pages_and_filters,
+    check_iter_all,
+    check_upsert_many,
+    check_search,
+    check_adjust_stock,
+    check_movements,
+    check_stats,
+]
+
+
+# ----------------------------------------------------------------------
+# ЗАПУСК ПРОВЕРОК ДЛЯ КАЖДОГО ХРАНИЛИЩА
+# ----------------------------------------------------------------------
+async def run_sql(repository_class: type, check: Callable, directory: str) -> None:
+    path = os.path.join(directory, f"{repository_class.__name__}-{check.__name__}.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        bind=engine, autoflush=False, expire_on_commit=False
+    )
+    try:
+        async with session_factory() as session:
+            await check(repository_class(session, session_factory))
+    finally:
+        await engine.dispose()
+
+
+async def main() -> int:
+    print("🔎 Проверка контракта PartRepository")
+    print("=" * 40)
+    failures: Dict[str, List[str]] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "memory": lambda check: check(MemoryPartRepository(Garage())),
+            "core": lambda check: run_sql(CorePartRepository, check, directory),
+            "orm": lambda check: run_sql(OrmPartRepository, check, directory),
+        }
+        for backend, run in backends.items():
+            for check in CHECKS:
+                try:
+                    await run(check)
+                except Exception as error:  # noqa: BLE001 — собираем все расхождения
+                    failures.setdefault(backend, []).append(
+                        f"{check.__name__}: {type(error).__name__}: {error}"
+                    )
+            status = "❌" if backend in failures else "✅"
+            print(f"{status} {backend}: {len(CHECKS) - len(failures.get(backend, []))}/{len(CHECKS)}")
+            for failure in failures.get(backend, []):
+                print(f"   {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,56 @@
+# scripts/compact_ledger.py
+"""
+Компакция журнала движений остатков (stock_movements)
+
+Сворачивает движения старше N дней в снимки (см. app/services/ledger.py).
+Удобно запускать по расписанию (cron, systemd timer, CronJob в Kubernetes),
+когда приложение работает в нескольких воркерах.
+
+Запуск (из корня проекта, с теми же DATABASE_URL/PARTS_BACKEND, что у приложения):
+    python -m scripts.compact_ledger
+    python -m scripts.compact_ledger --older-than-days 7
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import timedelta
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import get_settings  # noqa: E402
+from app.db.database import dispose_engines  # noqa: E402
+from app.services.ledger import compact_once  # noqa: E402
+
+
+async def compact(retention: timedelta) -> int:
+    try:
+        return await compact_once(retention)
+    finally:
+        await dispose_engines()  # закрываем соединения до остановки event loop
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--older-than-days",
+        type=float,
+        default=get_settings().ledger_retention_days,
+        help="Сворачивать движения старше N дней (по умолчанию LEDGER_RETENTION_DAYS)",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    removed = asyncio.run(compact(timedelta(days=args.older_than_days)))
+    print(
+        f"🧹 Свёрнуто движений старше {args.older_than_days:g} дн.: удалено {removed} строк"
+        f" за {time.perf_counter() - started:.1f} с"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# scripts/import_parts.py
+"""
+Загрузка каталога поставщика (CSV / NDJSON) напрямую в БД
+
+Файл любого размера читается потоком, строки проверяются схемой PartCreate
+в пуле процессов, а запись идёт через временную таблицу: COPY в PostgreSQL,
+executemany в SQLite — и одно слияние INSERT ... ON CONFLICT в конце
+(подробно — app/services/catalog_import.py). Существующие part_number
+обновляются, новые создаются; при ошибке в БД не меняется ничего.
+
+Отклонённые строки (номер строки, исходные данные, ошибки) пишутся в
+NDJSON-отчёт, по умолчанию <файл>.rejected.ndjson.
+
+Запуск (из корня проекта, с тем же DATABASE_URL, что у приложения):
+    python -m scripts.import_parts catalog.csv
+    python -m scripts.import_parts export.csv --delimiter ";" --encoding cp1251
+    python -m scripts.import_parts feed.ndjson --workers 4
+    python -m scripts.import_parts catalog.csv --dry-run   # только проверка
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.catalog_import import (  # noqa: E402
+    CHUNK_SIZE,
+    FORMATS,
+    CatalogImportError,
+    ImportReport,
+    detect_format,
+    import_catalog,
+    read_rows,
+)
+
+SHOW_REJECTED = 5  # сколько отклонённых строк показать в консоли
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class Progress:
+    """Строка прогресса в stderr, не чаще раза в interval секунд."""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self._shown = 0.0
+
+    def __call__(self, report: ImportReport) -> None:
+        now = time.perf_counter()
+        if now - self._shown < self.interval:
+            return
+        self._shown = now
+        sys.stderr.write(
+            f"\r📥 строк: {report.rows:,} ({report.rows_per_second:,.0f}/с),"
+            f" отклонено: {report.rejected:,}   "
+        )
+        sys.stderr.flush()
+
+
+class RejectedReport:
+    """NDJSON-файл отклонённых строк; создаётся при первой такой строке."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.sample: List[Dict[str, Any]] = []
+        self._file: Optional[TextIO] = None
+
+    def __call__(self, rejected: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(json.dumps(rejected, ensure_ascii=False, default=str) + "\n")
+        if len(self.sample) < SHOW_REJECTED:
+            self.sample.append(rejected)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="Файл каталога (.csv, .ndjson / .jsonl)")
+    parser.add_argument("--format", choices=FORMATS, help="По умолчанию — по расширению")
+    parser.add_argument("--encoding", default="utf-8-sig", help="Кодировка (Excel: cp1251)")
+    parser.add_argument("--delimiter", help="Разделитель CSV (по умолчанию угадывается)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(available_cpus() - 1, 0),
+        help="Процессов проверки (0 — в этом процессе; по умолчанию ядер − 1)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Строк в пачке")
+    parser.add_argument("--rejects", help="Отчёт об отклонённых строках (NDJSON)")
+    parser.add_argument("--dry-run", action="store_true", help="Только проверить файл")
+    args = parser.parse_args(argv)
+
+    rejects = RejectedReport(args.rejects or f"{args.path}.rejected.ndjson")
+    engine = None
+    if not args.dry_run:
+        from app.db.database import get_engine
+
+        engine = get_engine()
+
+    print(f"📦 Загрузка {args.path} (проверка: процессов {args.workers or 'нет'})")
+    try:
+        with open(args.path, encoding=args.encoding, newline="") as stream:
+            header, rows = read_rows(
+                stream, args.format or detect_format(args.path), args.delimiter
+            )
+            report = import_catalog(
+                header,
+                rows,
+                engine,
+                args.workers,
+                args.chunk_size,
+                on_rejected=rejects,
+                on_progress=Progress(),
+            )
+    except CatalogImportError as error:
+        print(f"\n❌ {error}")
+        return 1
+    finally:
+        rejects.close()
+        if engine is not None:
+            engine.dispose()
+    sys.stderr.write("\n")
+
+    print(
+        f"✅ Строк: {report.rows:,} за {report.seconds:.1f} с"
+        f" ({report.rows_per_second:,.0f} строк/с)"
+    )
+    if not args.dry_run:
+        print(
+            f"   создано: {report.created:,}, обновлено: {report.updated:,},"
+            f" без изменений: {report.unchanged:,}, повторы номера: {report.duplicates:,}"
+        )
+    if report.rejected:
+        print(f"⚠️  Отклонено строк: {report.rejected:,} — отчёт: {rejects.path}")
+        for rejected in rejects.sample:
+            messages = "; ".join(
+                f"{'.'.join(map(str, error.get('loc', ()))) or 'строка'}: {error['msg']}"
+                for error in rejected["errors"]
+            )
+            print(f"   строка {rejected['line']}: {messages}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# scripts/importtime_report.py
+"""
+Время холодного старта: отчёт по python -X importtime и проверка бюджета
+
+Каждый замер — новый процесс Python (`python -X importtime -c "import app.main"`),
+поэтому учитывается всё, что платит автомасштабируемый контейнер или CLI-задача
+при старте. Из вывода importtime берётся лучший из --repeat запусков (меньше всего
+шума от соседей по машине).
+
+Отчёт:
+    - общее время импорта каждого модуля из --module;
+    - собственное время по пакетам верхнего уровня (fastapi, sqlalchemy, app, ...);
+    - самые дорогие модули по собственному времени.
+
+Бюджет (код возврата 1, если нарушен — можно запускать в CI):
+    - --budget-ms: общее время импорта модуля не больше бюджета;
+    - --forbid: модули, которые при импорте загружаться не должны (драйверы БД
+      импортируются только при создании движка — см. app/db/database.py).
+      Эта проверка не зависит от скорости машины.
+
+Запуск:
+    python scripts/importtime_report.py
+    python scripts/importtime_report.py --module app.main --module scripts.compact_ledger
+    python scripts/importtime_report.py --budget-ms 800 --repeat 10 --output importtime.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Что проверяется по умолчанию
+DEFAULT_MODULES = ["app.main", "app.db.init_db", "scripts.compact_ledger"]
+DEFAULT_BUDGET_MS = 1500.0
+# Драйверы БД и клиент Redis — только по требованию, не при импорте
+DEFAULT_FORBIDDEN = ["aiosqlite", "asyncpg", "psycopg2", "redis"]
+
+# import time:       self [us] |  cumulative | imported package
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# модуль → (собственное время, общее время) в микросекундах
+Timings = Dict[str, Tuple[int, int]]
+
+
+def measure_once(module: str) -> Timings:
+    """Один запуск python -X importtime в новом процессе."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": ROOT},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} завершился с ошибкой:\n{result.stderr[-2000:]}")
+    timings: Timings = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, _, name = match.groups()
+            timings[name] = (int(own), int(cumulative))
+    return timings
+
+
+def measure(module: str, repeat: int) -> Timings:
+    """Лучший из repeat запусков (по общему времени модуля)."""
+    runs = [measure_once(module) for _ in range(repeat)]
+    return min(runs, key=lambda timings: timings[module][1])
+
+
+def by_package(timings: Timings) -> List[Tuple[str, float]]:
+    """Собственное время, сложенное по пакетам верхнего уровня, мс."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, (own, _) in timings.items():
+        totals[name.split(".")[0]] += own
+    return sorted(((name, own / 1000) for name, own in totals.items()), key=lambda x: -x[1])
+
+
+def report(
+    module: str, timings: Timings, budget_ms: float, forbidden: List[str], top: int
+) -> Dict[str, object]:
+    total_ms = timings[module][1] / 1000
+    loaded_forbidden = sorted(
+        name for name in timings if name.split(".")[0] in forbidden and "." not in name
+    )
+    ok = total_ms <= budget_ms and not loaded_forbidden
+
+    print(f"\n{'✅' if ok else '❌'} import {module}: {total_ms:.1f} мс (бюджет {budget_ms:g} мс)")
+    print("   По пакетам (собственное время):")
+    packages = by_package(timings)
+    for name, own_ms in packages[:top]:
+        print(f"      {name:<28} {own_ms:>8.1f} мс")
+    print("   Самые дорогие модули (собственное время):")
+    slowest = sorted(timings.items(), key=lambda item: -item[1][0])[:top]
+    for name, (own, cumulative) in slowest:
+        print(f"      {name:<40} {own / 1000:>8.1f} мс  (всего {cumulative / 1000:.1f})")
+    if loaded_forbidden:
+        print(f"   ⚠️  Загружены при импорте: {', '.join(loaded_forbidden)}")
+
+    return {
+        "module": module,
+        "total_ms": round(total_ms, 1),
+        "budget_ms": budget_ms,
+        "forbidden_loaded": loaded_forbidden,
+        "packages_ms": {name: round(own_ms, 1) for name, own_ms in packages},
+        "ok": ok,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--module", action="append", help="Модуль для замера (можно несколько)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Запусков на модуль")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument(
+        "--forbid",
+        action="append",
+        help=f"Пакет, который нельзя загружать при импорте (по умолчанию {DEFAULT_FORBIDDEN})",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Строк в каждой таблице")
+    parser.add_argument("--output", help="Записать результат в JSON-файл")
+    args = parser.parse_args(argv)
+
+    modules = args.module or DEFAULT_MODULES
+    forbidden = args.forbid or DEFAULT_FORBIDDEN
+
+    print(f"⏱️  Время импорта (лучший из {args.repeat} запусков)")
+    print("=" * 40)
+    results = [
+        report(module, measure(module, args.repeat), args.budget_ms, forbidden, args.top)
+        for module in modules
+    ]
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, ensure_ascii=False, indent=2)
+        print(f"\n📝 Результат записан в {args.output}")
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Продакшен-запуск Garage API: несколько процессов-воркеров uvicorn
+
+Запуск:
+    python serve.py                    # воркеров по числу ядер, порт 8000
+    python serve.py --workers 4 --port 8080
+    WEB_CONCURRENCY=4 python serve.py  # то же через окружение (Docker, PaaS)
+
+Для разработки (один процесс, перезагрузка при изменении кода) — python run.py.
+
+Чем отличается от run.py:
+    - Воркеры. Один процесс Python выполняет код на одном ядре (GIL), поэтому
+      сериализация JSON, валидация и прочая работа CPU упирается в одно ядро.
+      Здесь запускается N процессов (по умолчанию — по числу доступных ядер),
+      входящие соединения распределяет между ними ядро ОС (общий сокет).
+    - uvloop и httptools (если установлены, см. requirements.txt) — event loop
+      и разбор HTTP на C вместо asyncio и h11 на чистом Python.
+    - Без reload: наблюдатель за файлами в продакшене не нужен.
+    - Корректная остановка: по SIGTERM (docker stop, Kubernetes) главный процесс
+      передаёт сигнал воркерам; каждый перестаёт принимать соединения,
+      дожидается начатых запросов (не дольше GRACEFUL_SHUTDOWN_TIMEOUT секунд),
+      выполняет завершение lifespan (закрывает пул соединений) и выходит.
+
+Движок БД и пул соединений у каждого воркера свои: воркер — новый процесс
+(spawn), который импортирует приложение сам, поэтому соединения не наследуются
+от главного процесса. Главный процесс приложение не импортирует вовсе.
+⚠️ Соединений с БД будет до WEB_CONCURRENCY × (DB_POOL_SIZE + DB_MAX_OVERFLOW) —
+   это должно помещаться в max_connections PostgreSQL.
+
+Кэши в памяти (запчасти, сводка по складу) и лента изменений (GET /parts/events)
+тоже у каждого воркера свои: подписчик ленты видит записи только своего воркера.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from typing import List, Optional
+
+# Добавляем корневую папку в Python path для корректных импортов (как в run.py)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import uvicorn  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402 — без движка БД, только окружение
+
+
+def available_cpus() -> int:
+    """Ядра, доступные процессу (учитывает taskset/cpuset контейнера, если ОС умеет)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Продакшен-запуск Garage API")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.server_workers,
+        help="Число воркеров (0 — по числу ядер; WEB_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=settings.server_graceful_timeout,
+        help="Сколько секунд ждать начатые запросы после SIGTERM",
+    )
+    parser.add_argument(
+        "--access-log", action="store_true", help="Писать строку в журнал на каждый запрос"
+    )
+    args = parser.parse_args(argv)
+
+    workers = args.workers if args.workers > 0 else available_cpus()
+    # На Windows uvloop нет — тогда стандартный asyncio
+    loop = "uvloop" if installed("uvloop") else "asyncio"
+    http = "httptools" if installed("httptools") else "h11"
+    print(
+        f"🚀 Garage API на {args.host}:{args.port}: воркеров {workers}, "
+        f"event loop {loop}, HTTP {http}"
+    )
+
+    uvicorn.run(
+        "app.main:app",  # строкой: каждый воркер импортирует приложение сам
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        lifespan="on",  # прогрев и закрытие пула (app/main.py) обязательны
+        timeout_graceful_shutdown=args.graceful_timeout,
+        # Журнал каждого запроса при нескольких тысячах RPS — заметная доля CPU;
+        # для мониторинга есть GET /metrics (PROFILING_ENABLED=true)
+        access_log=args.access_log,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())